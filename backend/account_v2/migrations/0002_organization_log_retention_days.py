@@ -0,0 +1,22 @@
+# Generated by Django 4.2.1 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("account_v2", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organization",
+            name="log_retention_days",
+            field=models.PositiveIntegerField(
+                blank=True,
+                db_comment="Days execution logs are kept in the database before being archived, defaults to EXECUTION_LOG_RETENTION_DAYS",
+                null=True,
+            ),
+        ),
+    ]
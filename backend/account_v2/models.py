@@ -41,6 +41,14 @@ class Organization(models.Model):
         default=-1,
         db_comment="token limit set in case of frition less onbaoarded org",
     )
+    log_retention_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        db_comment=(
+            "Days execution logs are kept in the database before being "
+            "archived, defaults to EXECUTION_LOG_RETENTION_DAYS"
+        ),
+    )
 
     class Meta:
         verbose_name = "Organization"
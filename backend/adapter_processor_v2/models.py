@@ -6,12 +6,15 @@ from typing import Any
 from account_v2.models import User
 from cryptography.fernet import Fernet, InvalidToken
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from tenant_account_v2.models import OrganizationMember
 from unstract.sdk.adapters.adapterkit import Adapterkit
 from unstract.sdk.adapters.enums import AdapterTypes
 from unstract.sdk.adapters.exceptions import AdapterError
+from utils.cache_service import CacheService
 from utils.exceptions import InvalidEncryptionKey
 from utils.models.base_model import BaseModel
 from utils.models.organization_mixin import (
@@ -19,6 +22,8 @@ from utils.models.organization_mixin import (
     DefaultOrganizationMixin,
 )
 
+from unstract.core.constants import AdapterInstanceEvent
+
 logger = logging.getLogger(__name__)
 
 ADAPTER_NAME_SIZE = 128
@@ -167,6 +172,27 @@ class AdapterInstance(DefaultOrganizationMixin, BaseModel):
         return 0
 
 
+# Executed every time an AdapterInstance is saved or deleted
+@receiver(post_save, sender=AdapterInstance)
+@receiver(post_delete, sender=AdapterInstance)
+def invalidate_cached_adapter_config(sender, instance, **kwargs):
+    """Signal to have services caching the adapter's config drop it."""
+    adapter_instance_id = str(instance.id)
+
+    def publish() -> None:
+        try:
+            CacheService.publish(
+                AdapterInstanceEvent.INVALIDATION_CHANNEL, adapter_instance_id
+            )
+        except Exception as e:
+            logger.warning(
+                f"Error publishing invalidation of adapter {adapter_instance_id}: {e}"
+            )
+
+    # Configs fetched before the commit would still be the old ones
+    transaction.on_commit(publish)
+
+
 class UserDefaultAdapter(BaseModel):
     organization_member = models.OneToOneField(
         OrganizationMember,
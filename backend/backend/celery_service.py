@@ -6,10 +6,12 @@ import os
 from pprint import pformat
 
 from celery import Celery
+from celery.signals import worker_process_shutdown
 from utils.constants import ExecutionLogConstants
 
 from backend.celery_task import TaskRegistry
 from backend.settings.base import LOGGING
+from unstract.core.pubsub_helper import LogPublisher
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +38,13 @@ logger.debug(
     f"Celery Configuration:\n" f"{pformat(app.conf.table(with_defaults=True))}"
 )
 
+
+@worker_process_shutdown.connect
+def flush_log_publisher(**kwargs) -> None:
+    """Deliver queued logs, prefork children exit without running atexit."""
+    LogPublisher.flush()
+
+
 # Define the queues to purge when the Celery broker is restarted.
 queues_to_purge = [ExecutionLogConstants.CELERY_QUEUE_NAME]
 with app.connection() as connection:
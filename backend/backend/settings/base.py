@@ -128,10 +128,47 @@ ENABLE_LOG_HISTORY = get_required_setting("ENABLE_LOG_HISTORY")
 LOG_HISTORY_CONSUMER_INTERVAL = int(
     get_required_setting("LOG_HISTORY_CONSUMER_INTERVAL", "60")
 )
-LOGS_BATCH_LIMIT = int(get_required_setting("LOGS_BATCH_LIMIT", "30"))
+LOGS_BATCH_LIMIT = int(get_required_setting("LOGS_BATCH_LIMIT", "1000"))
+LOGS_DRAIN_THRESHOLD = int(os.environ.get("LOGS_DRAIN_THRESHOLD", 1000))
+LOGS_DRAIN_MAX_SECONDS = int(
+    os.environ.get("LOGS_DRAIN_MAX_SECONDS", LOG_HISTORY_CONSUMER_INTERVAL)
+)
+# Execution logs older than this are moved to zstd compressed JSONL archives
+# in the permanent file storage, unless an organization overrides it.
+# 0 keeps them in the database
+EXECUTION_LOG_RETENTION_DAYS = int(os.environ.get("EXECUTION_LOG_RETENTION_DAYS", 90))
+EXECUTION_LOG_ARCHIVE_INTERVAL = int(
+    os.environ.get("EXECUTION_LOG_ARCHIVE_INTERVAL", 3600)
+)
+# Executions archived per organization and run
+EXECUTION_LOG_ARCHIVE_BATCH_SIZE = int(
+    os.environ.get("EXECUTION_LOG_ARCHIVE_BATCH_SIZE", 500)
+)
+EXECUTION_LOG_ARCHIVE_PATH = os.environ.get(
+    "EXECUTION_LOG_ARCHIVE_PATH", "unstract/execution-logs"
+)
 LOGS_EXPIRATION_TIME_IN_SECOND = int(
     get_required_setting("LOGS_EXPIRATION_TIME_IN_SECOND", "86400")
 )
+# Log websocket events of a session are emitted in batches, every
+# LOG_EVENTS_FLUSH_INTERVAL_MS or once LOG_EVENTS_MAX_BATCH_SIZE are buffered
+LOG_EVENTS_COALESCE = CommonUtils.str_to_bool(
+    os.environ.get("LOG_EVENTS_COALESCE", "True")
+)
+LOG_EVENTS_FLUSH_INTERVAL_MS = int(os.environ.get("LOG_EVENTS_FLUSH_INTERVAL_MS", 200))
+LOG_EVENTS_MAX_BATCH_SIZE = int(os.environ.get("LOG_EVENTS_MAX_BATCH_SIZE", 100))
+# DEBUG log events emitted per second and session, the rest are dropped
+LOG_EVENTS_DEBUG_RATE_LIMIT = int(os.environ.get("LOG_EVENTS_DEBUG_RATE_LIMIT", 20))
+# Most recent logs kept per session for the logs view
+SESSION_LOGS_MAX_ENTRIES = int(os.environ.get("SESSION_LOGS_MAX_ENTRIES", 1000))
+
+# Runs filesystem and database destination writes on a worker pool so that
+# they don't hold up the next file's tool execution
+DESTINATION_ASYNC_WRITES = CommonUtils.str_to_bool(
+    os.environ.get("DESTINATION_ASYNC_WRITES", "False")
+)
+DESTINATION_WRITE_WORKERS = int(os.environ.get("DESTINATION_WRITE_WORKERS", 2))
+DESTINATION_WRITE_MAX_BACKLOG = int(os.environ.get("DESTINATION_WRITE_MAX_BACKLOG", 10))
 
 INDEXING_FLAG_TTL = int(get_required_setting("INDEXING_FLAG_TTL"))
 NOTIFICATION_TIMEOUT = int(get_required_setting("NOTIFICATION_TIMEOUT", "5"))
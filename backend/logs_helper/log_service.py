@@ -6,14 +6,16 @@ class LogService:
     def remove_logs_on_logout(session_id: str) -> None:
 
         if session_id:
-            key_pattern = f"{LogService.generate_redis_key(session_id=session_id)}*"
-
-            # Delete keys matching the pattern
-            CacheService.clear_cache(key_pattern=key_pattern)
+            CacheService.delete_a_key(
+                LogService.generate_redis_key(session_id=session_id)
+            )
 
     @staticmethod
     def generate_redis_key(session_id):
-        """Generate a Redis key for logs based on the provided session_id.
+        """Generate the Redis key of the logs list of a session.
+
+        Logs are appended to the list oldest first, by the log publisher
+        and by `LogsHelperViewSet.store_log`.
 
         Parameters:
         session_id (str): The session identifier to include in the Redis key.
@@ -1,7 +1,7 @@
 from django.urls import path
 from rest_framework.urlpatterns import format_suffix_patterns
 
-from .views import LogsHelperViewSet
+from .views import LogsHelperViewSet, log_history_metrics
 
 logs_helper = LogsHelperViewSet.as_view({"get": "get_logs", "post": "store_log"})
 
@@ -12,5 +12,10 @@ urlpatterns = format_suffix_patterns(
             logs_helper,
             name="logs-helper",
         ),
+        path(
+            "history/metrics/",
+            log_history_metrics,
+            name="log-history-metrics",
+        ),
     ]
 )
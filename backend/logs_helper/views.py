@@ -1,14 +1,14 @@
 import json
 import logging
-from datetime import datetime, timezone
 
 from django.conf import settings
 from django.http import HttpRequest
 from rest_framework import status, viewsets
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
 from utils.cache_service import CacheService
 from utils.user_session import UserSessionUtils
+from workflow_manager.workflow_v2.execution_log_utils import get_log_history_metrics
 
 from .log_service import LogService
 from .serializers import StoreLogMessagesSerializer
@@ -24,23 +24,11 @@ class LogsHelperViewSet(viewsets.ModelViewSet):
         # Extract the session ID
         session_id: str = UserSessionUtils.get_session_id(request=request)
 
-        # Construct the Redis key pattern to match keys
-        # associated with the session ID
+        # Logs of the session are kept in a single list, oldest first
         redis_key = LogService.generate_redis_key(session_id=session_id)
+        logs = [json.loads(log) for log in CacheService.lrange(redis_key, 0, -1)]
 
-        # Retrieve keys matching the pattern
-        keys = CacheService.get_all_keys(f"{redis_key}*")
-
-        # Retrieve values corresponding to the keys and sort them by timestamp
-        logs = []
-        for key in keys:
-            log_data = CacheService.get_key(key)
-            logs.append(log_data)
-
-        # Sort logs based on timestamp
-        sorted_logs = sorted(logs, key=lambda x: float(x["timestamp"]))
-
-        return Response({"data": sorted_logs}, status=status.HTTP_200_OK)
+        return Response({"data": logs}, status=status.HTTP_200_OK)
 
     # This API will be triggered whenever a notification message
     # pops up in the UI.
@@ -56,13 +44,20 @@ class LogsHelperViewSet(viewsets.ModelViewSet):
 
         # Extract the log message from the validated data
         log: str = serializer.validated_data.get("log")
-        log_data = json.loads(log)
-        timestamp = datetime.now(timezone.utc).timestamp()
-
-        redis_key = (
-            f"{LogService.generate_redis_key(session_id=session_id)}:{timestamp}"
+        # Validates the message before it's stored
+        json.loads(log)
+
+        CacheService.rpush_capped(
+            LogService.generate_redis_key(session_id=session_id),
+            [log],
+            max_length=settings.SESSION_LOGS_MAX_ENTRIES,
+            expire=logs_expiry,
         )
 
-        CacheService.set_key(redis_key, log_data, logs_expiry)
-
         return Response({"message": "Successfully stored the message in redis"})
+
+
+@api_view(["GET"])
+def log_history_metrics(request: HttpRequest) -> Response:
+    """Backlog and ingestion lag of the execution log history consumer."""
+    return Response(get_log_history_metrics(), status=status.HTTP_200_OK)
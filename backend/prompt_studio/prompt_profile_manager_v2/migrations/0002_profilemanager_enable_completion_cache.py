@@ -0,0 +1,21 @@
+# Generated by Django 4.2.1 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prompt_profile_manager_v2", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profilemanager",
+            name="enable_completion_cache",
+            field=models.BooleanField(
+                db_comment="Reuse LLM completions of identical prompts and context",
+                default=False,
+            ),
+        ),
+    ]
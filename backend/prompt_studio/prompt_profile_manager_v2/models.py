@@ -93,6 +93,10 @@ class ProfileManager(BaseModel):
         default=False,
         db_comment="Default LLM Profile used for summarizing",
     )
+    enable_completion_cache = models.BooleanField(
+        default=False,
+        db_comment="Reuse LLM completions of identical prompts and context",
+    )
 
     class Meta:
         verbose_name = "Profile Manager"
@@ -63,6 +63,7 @@ class ToolStudioPromptKeys:
     SYNONYMS = "synonyms"
     OUTPUTS = "outputs"
     SECTION = "section"
+    ENABLE_COMPLETION_CACHE = "enable-completion-cache"
     DEFAULT = "default"
     REINDEX = "reindex"
     EMBEDDING_SUFFIX = "embedding_suffix"
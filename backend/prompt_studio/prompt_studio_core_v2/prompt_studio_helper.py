@@ -59,10 +59,12 @@ from unstract.sdk.file_storage.constants import StorageType
 from unstract.sdk.file_storage.env_helper import EnvHelper
 from unstract.sdk.index import Index
 from unstract.sdk.prompt import PromptTool
+from utils.cache_service import CacheService
 from utils.file_storage.constants import FileStorageKeys
 from utils.file_storage.helpers.prompt_studio_file_helper import PromptStudioFileHelper
 from utils.local_context import StateStore
 
+from unstract.core.constants import DocumentIndexEvent
 from unstract.core.pubsub_helper import LogPublisher
 
 CHOICES_JSON = "/static/select_choices.json"
@@ -798,6 +800,9 @@ class PromptStudioHelper:
         output[TSPKeys.SIMILARITY_TOP_K] = profile_manager.similarity_top_k
         output[TSPKeys.SECTION] = profile_manager.section
         output[TSPKeys.X2TEXT_ADAPTER] = x2text
+        output[TSPKeys.ENABLE_COMPLETION_CACHE] = (
+            profile_manager.enable_completion_cache
+        )
         # Eval settings for the prompt
         output[TSPKeys.EVAL_SETTINGS] = {}
         output[TSPKeys.EVAL_SETTINGS][TSPKeys.EVAL_SETTINGS_EVALUATE] = prompt.evaluate
@@ -1013,6 +1018,11 @@ class PromptStudioHelper:
             DocumentIndexingService.mark_document_indexed(
                 org_id=org_id, user_id=user_id, doc_id_key=doc_id_key, doc_id=doc_id
             )
+            # Context retrieved from the previous index is stale now
+            try:
+                CacheService.publish(DocumentIndexEvent.INVALIDATION_CHANNEL, doc_id)
+            except Exception as e:
+                logger.warning(f"Error publishing re-index of {doc_id}: {e}")
             return {"status": IndexingStatus.COMPLETED_STATUS.value, "output": doc_id}
         except (IndexingError, IndexingAPIError, SdkError) as e:
             logger.error(f"Indexing failed : {e} ", stack_info=True, exc_info=True)
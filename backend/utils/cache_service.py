@@ -3,8 +3,18 @@ from typing import Any, Optional
 from django.conf import settings
 from django.core.cache import cache
 from django_redis import get_redis_connection
+from redis.lock import Lock
 
 redis_cache = get_redis_connection("default")
+_decr_or_delete = redis_cache.register_script(
+    """
+    local count = redis.call("DECR", KEYS[1])
+    if count <= 0 then
+        redis.call("DEL", KEYS[1])
+    end
+    return count
+    """
+)
 
 
 class CacheService:
@@ -28,15 +38,13 @@ class CacheService:
             expire,
         )
 
-    @staticmethod
-    def get_all_keys(key_pattern: str) -> Any:
-        keys = redis_cache.keys(key_pattern)
-        # Ensure all keys are strings
-        return [key.decode("utf-8") if isinstance(key, bytes) else key for key in keys]
-
     @staticmethod
     def clear_cache(key_pattern: str) -> Any:
-        """Delete keys in bulk based on the key pattern."""
+        """Delete keys in bulk based on the key pattern.
+
+        Matching keys are found with incremental `SCAN`s, avoid it on hot
+        paths all the same.
+        """
         cache.delete_pattern(key_pattern)
 
     @staticmethod
@@ -63,14 +71,51 @@ class CacheService:
         key: str = f"{user_id}|organizations"
         return cache.delete(key)
 
+    @staticmethod
+    def publish(channel: str, message: str) -> None:
+        redis_cache.publish(channel, message)
+
     @staticmethod
     def rpush(key: str, value: str) -> None:
         redis_cache.rpush(key, value)
 
+    @staticmethod
+    def rpush_capped(key: str, values: list[str], max_length: int, expire: int) -> None:
+        """Append to a list keeping only its last `max_length` values.
+
+        The expiry is renewed on every append.
+        """
+        pipeline = redis_cache.pipeline(transaction=False)
+        pipeline.rpush(key, *values)
+        pipeline.ltrim(key, -max_length, -1)
+        pipeline.expire(key, expire)
+        pipeline.execute()
+
     @staticmethod
     def lpop(key: str) -> Any:
         return redis_cache.lpop(key)
 
+    @staticmethod
+    def lpop_batch(key: str, count: int) -> list[Any]:
+        """Pop up to `count` values from the head of a list at once.
+
+        Read and trimmed in a transaction rather than with the count of
+        LPOP, which needs Redis 6.2.
+        """
+        pipeline = redis_cache.pipeline(transaction=True)
+        pipeline.lrange(key, 0, count - 1)
+        pipeline.ltrim(key, count, -1)
+        values, _ = pipeline.execute()
+        return list(values)
+
+    @staticmethod
+    def llen(key: str) -> int:
+        return int(redis_cache.llen(key))
+
+    @staticmethod
+    def lindex(key: str, index: int) -> Any:
+        return redis_cache.lindex(key, index)
+
     @staticmethod
     def lrem(key: str, value: str) -> None:
         redis_cache.lrem(key, value)
@@ -79,6 +124,25 @@ class CacheService:
     def lrange(key, start_index, end_index) -> list[Any]:
         return redis_cache.lrange(key, start_index, end_index)
 
+    @staticmethod
+    def incr(key: str) -> int:
+        return int(redis_cache.incr(key))
+
+    @staticmethod
+    def decr_or_delete(key: str) -> int:
+        """Decrement a counter, deleting it once it drops to zero.
+
+        Both happen in one script, a concurrent `incr` either sees the
+        counter before the decrement or starts a new one from zero.
+        """
+        return int(_decr_or_delete(keys=[key]))
+
+    @staticmethod
+    def lock(key: str, timeout: int) -> Lock:
+        """Lock shared by all processes, released after `timeout` seconds
+        at the latest."""
+        return redis_cache.lock(key, timeout=timeout)
+
     @staticmethod
     def remove_all_session_keys(
         user_id: Optional[str] = None,
@@ -56,6 +56,21 @@ class ExecutionLogConstants:
             consumers.
         LOG_QUEUE_NAME (str): The name of the queue to store log history.
         LOGS_BATCH_LIMIT (str): The maximum number of logs to store in a batch.
+        LOGS_DRAIN_THRESHOLD (int): Consumers keep storing batches while more
+            logs than this are queued.
+        LOGS_DRAIN_MAX_SECONDS (int): The longest a consumer keeps draining.
+        STATS_KEY (str): The cache key of the stats of the last consumer run.
+        PARTITIONS_CHECKED_KEY (str): Set for a day once the execution log
+            partitions of the coming months have been created.
+        RETENTION_DAYS (int): Days execution logs are kept in the database,
+            unless the organization overrides it.
+        ARCHIVE_INTERVAL (int): The interval (in seconds) between log
+            archivers.
+        ARCHIVE_BATCH_SIZE (int): Executions archived per organization and run.
+        ARCHIVE_PATH (str): Path of the log archives in the permanent storage.
+        ARCHIVE_PERIODIC_TASK_NAME (str): The name of the Celery periodic task
+            to schedule log archivers.
+        ARCHIVE_TASK (str): The name of the Celery task archiving logs.
         CELERY_QUEUE_NAME (str): The name of the Celery queue to schedule log
             history consumers.
         PERIODIC_TASK_NAME (str): The name of the Celery periodic task to schedule
@@ -66,7 +81,17 @@ class ExecutionLogConstants:
     IS_ENABLED: bool = CommonUtils.str_to_bool(settings.ENABLE_LOG_HISTORY)
     CONSUMER_INTERVAL: int = settings.LOG_HISTORY_CONSUMER_INTERVAL
     LOGS_BATCH_LIMIT: int = settings.LOGS_BATCH_LIMIT
+    LOGS_DRAIN_THRESHOLD: int = settings.LOGS_DRAIN_THRESHOLD
+    LOGS_DRAIN_MAX_SECONDS: int = settings.LOGS_DRAIN_MAX_SECONDS
     LOG_QUEUE_NAME: str = "log_history_queue"
     CELERY_QUEUE_NAME = "celery_periodic_logs"
     PERIODIC_TASK_NAME_V2 = "workflow_log_history_v2"
     TASK_V2 = "consume_log_history"
+    STATS_KEY = "log_history_consumer_stats"
+    PARTITIONS_CHECKED_KEY = "execution_log_partitions_checked"
+    RETENTION_DAYS: int = settings.EXECUTION_LOG_RETENTION_DAYS
+    ARCHIVE_INTERVAL: int = settings.EXECUTION_LOG_ARCHIVE_INTERVAL
+    ARCHIVE_BATCH_SIZE: int = settings.EXECUTION_LOG_ARCHIVE_BATCH_SIZE
+    ARCHIVE_PATH: str = settings.EXECUTION_LOG_ARCHIVE_PATH
+    ARCHIVE_PERIODIC_TASK_NAME = "workflow_log_archive"
+    ARCHIVE_TASK = "archive_execution_logs"
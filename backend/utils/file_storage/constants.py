@@ -14,3 +14,4 @@ class FileStorageType(Enum):
 class FileStorageConstants:
     PROMPT_STUDIO_FILE_PATH = "PROMPT_STUDIO_FILE_PATH"
     REMOTE_PROMPT_STUDIO_FILE_PATH = "REMOTE_PROMPT_STUDIO_FILE_PATH"
+    REMOTE_REVIEW_QUEUE_FILE_PATH = "REMOTE_REVIEW_QUEUE_FILE_PATH"
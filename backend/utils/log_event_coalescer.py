@@ -0,0 +1,123 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Optional
+
+from celery.signals import worker_process_shutdown
+
+logger = logging.getLogger(__name__)
+
+EmitFunction = Callable[[str, str, list[dict[str, Any]]], None]
+
+
+class LogEventCoalescer:
+    """Buffers websocket log events per room and emits them in batches.
+
+    Messages of a room and event are emitted together, in order, every
+    `flush_interval` seconds or as soon as `max_batch_size` of them are
+    buffered. DEBUG messages of a room beyond `debug_rate_limit` per second
+    are dropped, the UI can't keep up with them anyway.
+    """
+
+    def __init__(
+        self,
+        emit: EmitFunction,
+        flush_interval: float,
+        max_batch_size: int,
+        debug_rate_limit: int,
+    ) -> None:
+        self.emit = emit
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.debug_rate_limit = debug_rate_limit
+        self._lock = threading.Lock()
+        # Held while emitting, so batches of a room can't overtake each other
+        self._flush_lock = threading.Lock()
+        self._buffers: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        # Room -> (second, DEBUG messages let through in that second)
+        self._debug_counts: dict[str, tuple[int, int]] = {}
+        self._dropped = 0
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def _ensure_thread(self) -> None:
+        # Threads don't survive the fork of a celery worker process
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        if self._pid != os.getpid():
+            self._buffers.clear()
+            self._debug_counts.clear()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(
+            target=self._run, name="log-event-coalescer", daemon=True
+        )
+        self._thread.start()
+
+    def _is_rate_limited(self, room: str, message: dict[str, Any]) -> bool:
+        if message.get("level") != "DEBUG":
+            return False
+        second = int(time.monotonic())
+        started, count = self._debug_counts.get(room, (second, 0))
+        if started != second:
+            count = 0
+        if count >= self.debug_rate_limit:
+            self._dropped += 1
+            return True
+        self._debug_counts[room] = (second, count + 1)
+        return False
+
+    def add(self, room: str, event: str, message: dict[str, Any]) -> None:
+        """Buffer a message to be emitted to a room."""
+        with self._lock:
+            self._ensure_thread()
+            if self._is_rate_limited(room, message):
+                return
+            buffer = self._buffers.setdefault((room, event), [])
+            buffer.append(message)
+            if len(buffer) < self.max_batch_size:
+                return
+        self.flush()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> None:
+        """Emit all buffered messages."""
+        with self._flush_lock:
+            with self._lock:
+                buffers, self._buffers = self._buffers, {}
+                dropped, self._dropped = self._dropped, 0
+                # Counts of past seconds would be reset on the next DEBUG anyway
+                second = int(time.monotonic())
+                self._debug_counts = {
+                    room: counts
+                    for room, counts in self._debug_counts.items()
+                    if counts[0] == second
+                }
+            if dropped:
+                logger.warning(f"Dropped {dropped} DEBUG log events, rate limited")
+            for (room, event), messages in buffers.items():
+                self._emit(room, event, messages)
+
+    def _emit(self, room: str, event: str, messages: list[dict[str, Any]]) -> None:
+        try:
+            self.emit(room, event, messages)
+        except Exception as e:
+            logger.error(f"Error emitting {len(messages)} log events: {e}")
+
+
+def create_coalescer(emit: EmitFunction, **kwargs: Any) -> LogEventCoalescer:
+    coalescer = LogEventCoalescer(emit, **kwargs)
+    atexit.register(coalescer.flush)
+
+    # Prefork children of celery exit without running atexit handlers
+    def flush_on_shutdown(**_: Any) -> None:
+        coalescer.flush()
+
+    worker_process_shutdown.connect(flush_on_shutdown, weak=False)
+    return coalescer
@@ -11,6 +11,7 @@ from django.core.wsgi import WSGIHandler
 from unstract.workflow_execution.enums import LogType
 from utils.constants import ExecutionLogConstants
 from utils.dto import LogDataDTO
+from utils.log_event_coalescer import create_coalescer
 
 from unstract.core.constants import LogFieldName
 
@@ -162,6 +163,28 @@ def _emit_websocket_event(room: str, event: str, data: dict[str, Any]) -> None:
         logger.error(f"Error emitting WebSocket event: {e}")
 
 
+def _emit_websocket_events(
+    room: str, event: str, messages: list[dict[str, Any]]
+) -> None:
+    """Emit a batch of messages as a single websocket event.
+
+    The payload's `data` is the list of messages, in order.
+    """
+    logger.debug(f"[{os.getpid()}] Push {len(messages)} websocket events: {event}")
+    sio.emit(event, data={"data": messages}, room=room)
+
+
+# Set when websocket events are coalesced into batches
+coalescer = None
+if settings.LOG_EVENTS_COALESCE:
+    coalescer = create_coalescer(
+        _emit_websocket_events,
+        flush_interval=settings.LOG_EVENTS_FLUSH_INTERVAL_MS / 1000,
+        max_batch_size=settings.LOG_EVENTS_MAX_BATCH_SIZE,
+        debug_rate_limit=settings.LOG_EVENTS_DEBUG_RATE_LIMIT,
+    )
+
+
 def handle_user_logs(room: str, event: str, message: dict[str, Any]) -> None:
     """Handle user logs from applications
     Args:
@@ -173,7 +196,10 @@ def handle_user_logs(room: str, event: str, message: dict[str, Any]) -> None:
         return
 
     _store_execution_log(message)
-    _emit_websocket_event(room, event, message)
+    if coalescer:
+        coalescer.add(room, event, message)
+    else:
+        _emit_websocket_event(room, event, message)
 
 
 def start_server(django_app: WSGIHandler, namespace: str) -> WSGIHandler:
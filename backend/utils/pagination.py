@@ -1,4 +1,4 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from utils.constants import Pagination
 
 
@@ -6,3 +6,14 @@ class CustomPagination(PageNumberPagination):
     page_size = Pagination.PAGE_SIZE
     page_size_query_param = Pagination.PAGE_SIZE_QUERY_PARAM
     max_page_size = Pagination.MAX_PAGE_SIZE
+
+
+class CustomCursorPagination(CursorPagination):
+    """Keyset pagination, later pages cost as much as the first one.
+
+    Subclasses set `ordering`, which should be an indexed field.
+    """
+
+    page_size = Pagination.PAGE_SIZE
+    page_size_query_param = Pagination.PAGE_SIZE_QUERY_PARAM
+    max_page_size = Pagination.MAX_PAGE_SIZE
@@ -1,16 +1,13 @@
 import ast
-import base64
+import hashlib
 import json
 import logging
 import os
-from typing import Any, Optional, Union
+from typing import Any, Callable, Iterator, Optional
 
 from connector_v2.models import ConnectorInstance
 from plugins.workflow_manager.workflow_v2.utils import WorkflowUtil
-from rest_framework.exceptions import APIException
 from unstract.sdk.constants import ToolExecKey
-from unstract.sdk.tool.mime_types import EXT_MIME_MAP
-from unstract.workflow_execution.constants import ToolOutputType
 from utils.user_context import UserContext
 from workflow_manager.endpoint_v2.base_connector import BaseConnector
 from workflow_manager.endpoint_v2.constants import (
@@ -20,16 +17,23 @@ from workflow_manager.endpoint_v2.constants import (
     WorkflowFileType,
 )
 from workflow_manager.endpoint_v2.database_utils import DatabaseUtils
+from workflow_manager.endpoint_v2.destination_stage import (
+    DestinationWriteStage,
+    FailedDestinationWrite,
+)
 from workflow_manager.endpoint_v2.dto import FileHash
 from workflow_manager.endpoint_v2.exceptions import (
     DestinationConnectorNotConfigured,
     InvalidDestinationConnectionType,
-    InvalidToolOutputType,
     MissingDestinationConnectionType,
-    ToolOutputTypeMismatch,
 )
 from workflow_manager.endpoint_v2.models import WorkflowEndpoint
-from workflow_manager.endpoint_v2.queue_utils import QueueResult, QueueUtils
+from workflow_manager.endpoint_v2.queue_utils import (
+    QueueFileStore,
+    QueueResult,
+    QueueUtils,
+)
+from workflow_manager.endpoint_v2.tool_output import ToolOutputReader
 from workflow_manager.workflow_v2.enums import ExecutionStatus
 from workflow_manager.workflow_v2.execution import WorkflowExecutionServiceHelper
 from workflow_manager.workflow_v2.file_history_helper import FileHistoryHelper
@@ -60,11 +64,14 @@ class DestinationConnector(BaseConnector):
         workflow: Workflow,
         execution_id: str,
         execution_service: Optional[WorkflowExecutionServiceHelper] = None,
+        write_stage: Optional[DestinationWriteStage] = None,
     ) -> None:
         """Initialize a DestinationConnector object.
 
         Args:
             workflow (Workflow): _description_
+            write_stage (Optional[DestinationWriteStage]): Runs filesystem
+                and database writes asynchronously when given.
         """
         organization_id = UserContext.get_organization_identifier()
         super().__init__(workflow.id, execution_id, organization_id)
@@ -74,6 +81,8 @@ class DestinationConnector(BaseConnector):
         self.api_results: list[dict[str, Any]] = []
         self.queue_results: list[dict[str, Any]] = []
         self.execution_service = execution_service
+        self._output_reader: Optional[ToolOutputReader] = None
+        self.write_stage = write_stage
 
     def _get_endpoint_for_workflow(
         self,
@@ -141,6 +150,7 @@ class DestinationConnector(BaseConnector):
         workflow: Workflow,
         input_file_path: str,
         file_execution_id: str,
+        file_hash: Optional[str] = None,
     ) -> None:
         result = self.get_result()
         meta_data = self.get_metadata()
@@ -151,6 +161,7 @@ class DestinationConnector(BaseConnector):
             input_file_path=input_file_path,
             meta_data=meta_data,
             file_execution_id=file_execution_id,
+            file_hash=file_hash,
         )
 
     def handle_output(
@@ -164,6 +175,8 @@ class DestinationConnector(BaseConnector):
         file_execution_id: str = None,
     ) -> None:
         """Handle the output based on the connection type."""
+        # Output of the previous file must not be served for this one
+        self._output_reader = None
         connection_type = self.endpoint.connection_type
         result: Optional[str] = None
         metadata: Optional[str] = None
@@ -177,7 +190,20 @@ class DestinationConnector(BaseConnector):
             file_history = FileHistoryHelper.get_file_history(
                 workflow=workflow, cache_key=file_hash.file_hash
             )
+        create_file_history = use_file_history and not file_history
         if connection_type == WorkflowEndpoint.ConnectionType.FILESYSTEM:
+            if self.write_stage:
+                self._submit_write(
+                    file_name=file_name,
+                    file_hash=file_hash,
+                    workflow=workflow,
+                    file_execution_id=file_execution_id,
+                    create_file_history=create_file_history,
+                    write=self.copy_output_to_output_directory,
+                    # The next file's tool run reuses the execution directory
+                    output=list(self._read_output()),
+                )
+                return
             self.copy_output_to_output_directory()
         elif connection_type == WorkflowEndpoint.ConnectionType.DATABASE:
             result = self.get_result(file_history)
@@ -189,7 +215,24 @@ class DestinationConnector(BaseConnector):
                     workflow,
                     input_file_path,
                     file_execution_id,
+                    file_hash=file_hash.file_hash,
                 )
+            elif self.write_stage:
+                self._submit_write(
+                    file_name=file_name,
+                    file_hash=file_hash,
+                    workflow=workflow,
+                    file_execution_id=file_execution_id,
+                    create_file_history=create_file_history,
+                    result=result,
+                    write=self.insert_into_db,
+                    # Creates the table on the first write, and keeps rows in
+                    # the order of the files
+                    serial_key=self._get_table_key(),
+                    input_file_path=input_file_path,
+                    data=self.get_result(),
+                )
+                return
             else:
                 self.insert_into_db(input_file_path=input_file_path)
         elif connection_type == WorkflowEndpoint.ConnectionType.API:
@@ -204,13 +247,33 @@ class DestinationConnector(BaseConnector):
                 workflow,
                 input_file_path,
                 file_execution_id,
+                file_hash=file_hash.file_hash,
             )
+        self._complete_output(
+            file_name=file_name,
+            file_hash=file_hash,
+            workflow=workflow,
+            create_file_history=create_file_history,
+            result=result,
+            metadata=metadata,
+        )
+
+    def _complete_output(
+        self,
+        file_name: str,
+        file_hash: FileHash,
+        workflow: Workflow,
+        create_file_history: bool,
+        result: Optional[Any] = None,
+        metadata: Optional[str] = None,
+    ) -> None:
+        """Report a processed file and record it in the file history."""
         if self.execution_service:
             self.execution_service.publish_log(
                 message=f"File '{file_name}' processed successfully"
             )
 
-        if use_file_history and not file_history:
+        if create_file_history:
             FileHistoryHelper.create_file_history(
                 cache_key=file_hash.file_hash,
                 workflow=workflow,
@@ -220,8 +283,96 @@ class DestinationConnector(BaseConnector):
                 file_name=file_name,
             )
 
-    def copy_output_to_output_directory(self) -> None:
-        """Copy output to the destination directory."""
+    def _submit_write(
+        self,
+        file_name: str,
+        file_hash: FileHash,
+        workflow: Workflow,
+        file_execution_id: str,
+        create_file_history: bool,
+        write: Callable[..., None],
+        result: Optional[Any] = None,
+        serial_key: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Hand a destination write over to the write stage.
+
+        Everything the write needs from the execution directory has to be
+        read by the caller and passed in `kwargs`, since the next file's
+        tool run overwrites it. The file is reported and recorded in the
+        file history only once the write succeeded.
+        """
+
+        def write_and_complete() -> None:
+            write(**kwargs)
+            self._complete_output(
+                file_name=file_name,
+                file_hash=file_hash,
+                workflow=workflow,
+                create_file_history=create_file_history,
+                result=result,
+            )
+
+        self.write_stage.submit(
+            file_execution_id=file_execution_id,
+            file_name=file_name,
+            write=write_and_complete,
+            serial_key=serial_key,
+        )
+
+    def _get_table_key(self) -> str:
+        """Identifies the database table the destination writes to."""
+        connector_instance: ConnectorInstance = self.endpoint.connector_instance
+        table_name = self.endpoint.configuration.get(DestinationKey.TABLE)
+        return f"{connector_instance.id}:{table_name}"
+
+    def wait_for_pending_writes(self) -> list[FailedDestinationWrite]:
+        """Wait for the destination writes handed to the write stage.
+
+        Returns:
+            list[FailedDestinationWrite]: Writes that failed
+        """
+        if not self.write_stage:
+            return []
+        return self.write_stage.wait()
+
+    def shutdown_write_stage(self) -> None:
+        """Wait for pending destination writes and stop the write stage."""
+        if self.write_stage:
+            self.write_stage.shutdown()
+
+    def _read_output(self) -> Iterator[tuple[str, Optional[bytes]]]:
+        """Read the tool's output directory from the execution storage.
+
+        Yields:
+            tuple[str, Optional[bytes]]: Path relative to the output
+                directory, with the content of files and None for
+                directories. Directories come before their contents.
+        """
+        destination_volume_path = os.path.join(
+            self.execution_dir, ToolExecKey.OUTPUT_DIR
+        )
+        file_system = FileSystem(FileStorageType.WORKFLOW_EXECUTION)
+        fs = file_system.get_file_storage()
+        for root, dirs, files in fs.walk(str(destination_volume_path)):
+            relative_root = os.path.relpath(root, destination_volume_path)
+            for dir_name in dirs:
+                yield os.path.join(relative_root, dir_name), None
+            for file_name in files:
+                yield os.path.join(relative_root, file_name), fs.read(
+                    path=os.path.join(root, file_name), mode="rb"
+                )
+
+    def copy_output_to_output_directory(
+        self, output: Optional[list[tuple[str, Optional[bytes]]]] = None
+    ) -> None:
+        """Copy output to the destination directory.
+
+        Args:
+            output (Optional[list[tuple[str, Optional[bytes]]]]): Snapshot
+                of the output directory from `_read_output()`, read from the
+                execution storage file by file when not given.
+        """
         connector: ConnectorInstance = self.endpoint.connector_instance
         connector_settings: dict[str, Any] = connector.connector_metadata
         destination_configurations: dict[str, Any] = self.endpoint.configuration
@@ -237,42 +388,31 @@ class DestinationConnector(BaseConnector):
             input_dir=output_directory, root_path=root_path
         )
         logger.debug(f"destination output directory {output_directory}")
-        destination_volume_path = os.path.join(
-            self.execution_dir, ToolExecKey.OUTPUT_DIR
-        )
 
         try:
             destination_fs.create_dir_if_not_exists(input_dir=output_directory)
-            # Traverse local directory and create the same structure in the
-            # output_directory
-            file_system = FileSystem(FileStorageType.WORKFLOW_EXECUTION)
-            fs = file_system.get_file_storage()
-            dir_path = fs.walk(str(destination_volume_path))
-
-            for root, dirs, files in dir_path:
-                for dir_name in dirs:
-                    current_dir = os.path.join(
-                        output_directory,
-                        os.path.relpath(root, destination_volume_path),
-                        dir_name,
-                    )
-                    destination_fs.create_dir_if_not_exists(input_dir=current_dir)
-
-                for file_name in files:
-                    source_path = os.path.join(root, file_name)
-                    destination_path = os.path.join(
-                        output_directory,
-                        os.path.relpath(root, destination_volume_path),
-                        file_name,
-                    )
-                    destination_fs.upload_file_to_storage(
-                        source_path=source_path, destination_path=destination_path
-                    )
+            # Create the same structure in the output_directory
+            for relative_path, data in (
+                output if output is not None else self._read_output()
+            ):
+                destination_path = os.path.join(output_directory, relative_path)
+                if data is None:
+                    destination_fs.create_dir_if_not_exists(input_dir=destination_path)
+                    continue
+                destination_fs.get_fsspec_fs().write_bytes(
+                    os.path.normpath(destination_path), data
+                )
         except ConnectorError as e:
             raise UnstractFSException(core_err=e) from e
 
-    def insert_into_db(self, input_file_path: str) -> None:
-        """Insert data into the database."""
+    def insert_into_db(self, input_file_path: str, data: Optional[Any] = None) -> None:
+        """Insert data into the database.
+
+        Args:
+            input_file_path (str): Path of the input file
+            data (Optional[Any]): Tool output to insert, read from the
+                execution storage when not given.
+        """
         connector_instance: ConnectorInstance = self.endpoint.connector_instance
         connector_settings: dict[str, Any] = connector_instance.metadata
         destination_configurations: dict[str, Any] = self.endpoint.configuration
@@ -294,7 +434,8 @@ class DestinationConnector(BaseConnector):
         execution_id_name = str(
             destination_configurations.get(DestinationKey.EXECUTION_ID, "execution_id")
         )
-        data = self.get_result()
+        if data is None:
+            data = self.get_result()
         # If data is None, don't execute CREATE or INSERT query
         if not data:
             return
@@ -303,7 +444,8 @@ class DestinationConnector(BaseConnector):
         # Tool text-extractor returns data in the form of string.
         # Don't pop out metadata in this case.
         if isinstance(data, dict):
-            data.pop("metadata", None)
+            # Copy since the parsed output is shared for the whole file
+            data = {key: value for key, value in data.items() if key != "metadata"}
         values = DatabaseUtils.get_columns_and_values(
             column_mode_str=column_mode,
             data=data,
@@ -432,37 +574,7 @@ class DestinationConnector(BaseConnector):
         """
         if file_history and file_history.result:
             return self.parse_string(file_history.result)
-        output_file = os.path.join(self.execution_dir, WorkflowFileType.INFILE)
-        metadata: dict[str, Any] = self.get_workflow_metadata()
-        output_type = self.get_output_type(metadata)
-        result: Union[dict[str, Any], str] = ""
-        file_system = FileSystem(FileStorageType.WORKFLOW_EXECUTION)
-        file_storage = file_system.get_file_storage()
-        try:
-            # TODO: SDK handles validation; consider removing here.
-            file_type = file_storage.mime_type(path=output_file)
-            if output_type == ToolOutputType.JSON:
-                if file_type != EXT_MIME_MAP[ToolOutputType.JSON.lower()]:
-                    msg = f"Expected tool output type: JSON, got: '{file_type}'"
-                    logger.error(msg)
-                    raise ToolOutputTypeMismatch(detail=msg)
-                file_content = file_storage.read(output_file, mode="r")
-                result = json.loads(file_content)
-            elif output_type == ToolOutputType.TXT:
-                if file_type == EXT_MIME_MAP[ToolOutputType.JSON.lower()]:
-                    msg = f"Expected tool output type: TXT, got: '{file_type}'"
-                    logger.error(msg)
-                    raise ToolOutputTypeMismatch(detail=msg)
-                file_content = file_storage.read(output_file, mode="r")
-                result = file_content.encode("utf-8").decode("unicode-escape")
-            else:
-                raise InvalidToolOutputType()
-        except (FileNotFoundError, json.JSONDecodeError) as err:
-            msg = f"Error while getting result from the tool: {err}"
-            logger.error(msg)
-            raise APIException(detail=msg)
-
-        return result
+        return self.get_output_reader().result
 
     def get_metadata(
         self, file_history: Optional[FileHistory] = None
@@ -474,9 +586,20 @@ class DestinationConnector(BaseConnector):
         """
         if file_history and file_history.metadata:
             return self.parse_string(file_history.metadata)
-        metadata: dict[str, Any] = self.get_workflow_metadata()
+        return self.get_output_reader().metadata
 
-        return metadata
+    def get_output_reader(self) -> ToolOutputReader:
+        """Get the reader caching the tool output of the current file.
+
+        Returns:
+            ToolOutputReader: Reader for the output and metadata files.
+        """
+        if self._output_reader is None:
+            self._output_reader = ToolOutputReader(
+                file_handler=self,
+                output_file=os.path.join(self.execution_dir, WorkflowFileType.INFILE),
+            )
+        return self._output_reader
 
     def delete_execution_directory(self) -> None:
         """Delete the execution directory.
@@ -565,11 +688,14 @@ class DestinationConnector(BaseConnector):
         input_file_path: Optional[str] = None,
         meta_data: Optional[dict[str, Any]] = None,
         file_execution_id: str = None,
+        file_hash: Optional[str] = None,
     ) -> None:
         """Handle the Manual Review QUEUE result.
 
-        This method is responsible for pushing the input file and result to
-        review queue.
+        This method is responsible for pushing the result to review queue.
+        The input file is not embedded in the queue entry, it is copied to
+        permanent storage under its content hash and only that path is
+        enqueued. Reviewers fetch the content through `QueueFileStore`.
         Args:
             file_name (str): The name of the file.
             workflow (Workflow): The workflow object containing
@@ -582,6 +708,8 @@ class DestinationConnector(BaseConnector):
             meta_data (Optional[dict[str, Any]], optional):
                 A dictionary containing additional
                 metadata related to the file. Defaults to None.
+            file_hash (Optional[str], optional): SHA-256 of the input file
+                content, computed from the file when not given.
 
         Returns:
             None
@@ -594,27 +722,45 @@ class DestinationConnector(BaseConnector):
         source_fs = self.get_fsspec(
             settings=connector_settings, connector_id=connector.connector_id
         )
-        with source_fs.open(input_file_path, "rb") as remote_file:
-            whisper_hash = None
-            file_content = remote_file.read()
-            # Convert file content to a base64 encoded string
-            file_content_base64 = base64.b64encode(file_content).decode("utf-8")
-            q_name = f"review_queue_{self.organization_id}_{workflow.id}"
-            if meta_data:
-                whisper_hash = meta_data.get("whisper-hash")
-            else:
-                whisper_hash = None
+
+        def read_input_file() -> bytes:
+            with source_fs.open(input_file_path, "rb") as remote_file:
+                file_content: bytes = remote_file.read()
+            return file_content
+
+        file_content: Optional[bytes] = None
+        if not file_hash:
+            file_content = read_input_file()
+            file_hash = hashlib.sha256(file_content).hexdigest()
+        file_path = QueueFileStore.get_file_path(
+            organization_id=self.organization_id,
+            workflow_id=str(workflow.id),
+            file_hash=file_hash,
+            file_name=file_name,
+        )
+        QueueFileStore.store(
+            file_path=file_path,
+            read_content=lambda: file_content or read_input_file(),
+        )
+        q_name = f"review_queue_{self.organization_id}_{workflow.id}"
+        whisper_hash = meta_data.get("whisper-hash") if meta_data else None
+        try:
             queue_result = QueueResult(
                 file=file_name,
                 status=QueueResultStatus.SUCCESS,
                 result=result,
                 workflow_id=str(self.workflow_id),
-                file_content=file_content_base64,
                 whisper_hash=whisper_hash,
                 file_execution_id=file_execution_id,
+                file_path=file_path,
+                file_hash=file_hash,
             ).to_dict()
             # Convert the result dictionary to a JSON string
             queue_result_json = json.dumps(queue_result)
             conn = QueueUtils.get_queue_inst()
             # Enqueue the JSON string
             conn.enqueue(queue_name=q_name, message=queue_result_json)
+        except Exception:
+            # No entry references the stored copy
+            QueueFileStore.release(file_path)
+            raise
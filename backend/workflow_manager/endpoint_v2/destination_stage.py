@@ -0,0 +1,117 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_for_futures
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from django.db import close_old_connections
+from utils.constants import Account
+from utils.local_context import StateStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FailedDestinationWrite:
+    file_execution_id: str
+    file_name: str
+    error: str
+
+
+class DestinationWriteStage:
+    """Runs destination writes on a worker pool, off the tool execution path.
+
+    Writes are submitted once the tool output of a file has been read, so
+    the next file's tool run does not wait for slow destinations. The
+    backlog is bounded: `submit` blocks while `max_backlog` writes are
+    pending, which keeps tool execution from running arbitrarily far ahead
+    of the destination.
+
+    Writes submitted with the same `serial_key` run one at a time, in the
+    order they were submitted, e.g. the inserts into a database table.
+    """
+
+    def __init__(self, max_workers: int, max_backlog: int) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="destination-write"
+        )
+        self._backlog = threading.BoundedSemaphore(max(max_backlog, 1))
+        self._pending: list[tuple[str, str, Future]] = []
+        # Last write submitted for each serial key
+        self._serial_tails: dict[str, Future] = {}
+        self._organization_id = StateStore.get(Account.ORGANIZATION_ID)
+
+    def submit(
+        self,
+        file_execution_id: str,
+        file_name: str,
+        write: Callable[..., None],
+        serial_key: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Queue a destination write for a file.
+
+        Args:
+            file_execution_id (str): Id of the file's WorkflowFileExecution
+            file_name (str): Name of the file, used for reporting
+            write (Callable[..., None]): Performs the write
+            serial_key (Optional[str]): Writes sharing the key run one after
+                the other, in submission order
+            kwargs: Arguments for `write`
+        """
+        self._backlog.acquire()
+        previous = self._serial_tails.get(serial_key) if serial_key else None
+        try:
+            future = self._executor.submit(self._run, write, previous, **kwargs)
+        except Exception:
+            self._backlog.release()
+            raise
+        future.add_done_callback(lambda _: self._backlog.release())
+        if serial_key:
+            self._serial_tails[serial_key] = future
+        self._pending.append((file_execution_id, file_name, future))
+
+    def _run(
+        self, write: Callable[..., None], previous: Optional[Future], **kwargs: Any
+    ) -> None:
+        if previous:
+            # Submitted earlier, so it was picked up by a worker already
+            wait_for_futures([previous])
+        StateStore.set(Account.ORGANIZATION_ID, self._organization_id)
+        try:
+            write(**kwargs)
+        finally:
+            close_old_connections()
+
+    def wait(self) -> list[FailedDestinationWrite]:
+        """Wait for all outstanding writes and collect the failed ones.
+
+        Returns:
+            list[FailedDestinationWrite]: Writes that raised an error
+        """
+        failed: list[FailedDestinationWrite] = []
+        pending, self._pending = self._pending, []
+        self._serial_tails = {}
+        for file_execution_id, file_name, future in pending:
+            error: Optional[BaseException] = future.exception()
+            if error is None:
+                continue
+            logger.error(
+                f"Destination write failed for file '{file_name}': {error}",
+                exc_info=error,
+            )
+            failed.append(
+                FailedDestinationWrite(
+                    file_execution_id=file_execution_id,
+                    file_name=file_name,
+                    error=f"Error processing output of file '{file_name}'. {error}",
+                )
+            )
+        return failed
+
+    def shutdown(self) -> list[FailedDestinationWrite]:
+        """Wait for outstanding writes and stop the worker pool."""
+        failed = self.wait()
+        self._executor.shutdown(wait=True)
+        return failed
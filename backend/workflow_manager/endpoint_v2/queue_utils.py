@@ -1,13 +1,23 @@
+import base64
 import logging
+import os
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Optional
+from pathlib import Path
+from typing import Any, Callable, Optional
 
+from redis.lock import Lock
+from unstract.sdk.file_storage import FileStorage
+from unstract.sdk.file_storage.constants import StorageType
+from unstract.sdk.file_storage.env_helper import EnvHelper
+from utils.cache_service import CacheService
 from utils.constants import Common
+from utils.file_storage.constants import FileStorageConstants, FileStorageKeys
 from workflow_manager.endpoint_v2.exceptions import UnstractQueueException
 
 from unstract.connectors.queues import connectors as queue_connectors
 from unstract.connectors.queues.unstract_queue import UnstractQueue
+from unstract.core.utilities import UnstractUtils
 
 logger = logging.getLogger(__name__)
 
@@ -37,9 +47,11 @@ class QueueResult:
     status: QueueResultStatus
     result: Any
     workflow_id: str
-    file_content: str
+    file_content: Optional[str] = None
     whisper_hash: Optional[str] = None
     file_execution_id: Optional[str] = None
+    file_path: Optional[str] = None
+    file_hash: Optional[str] = None
 
     def to_dict(self) -> Any:
         return {
@@ -50,4 +62,130 @@ class QueueResult:
             "workflow_id": self.workflow_id,
             "file_content": self.file_content,
             "file_execution_id": self.file_execution_id,
+            "file_path": self.file_path,
+            "file_hash": self.file_hash,
         }
+
+
+class QueueFileStore:
+    """Content addressed storage for files referenced by review queue entries.
+
+    Queue entries carry only the path of the stored copy. Files are keyed by
+    their content hash so re-queueing the same document does not upload it
+    again, and a reference count kept in Redis makes sure the copy is removed
+    only once the last entry pointing at it is dequeued.
+    """
+
+    REF_COUNT_KEY_PREFIX = "review_queue_file_ref"
+    # Seconds a file's lock is held at most, covers uploading the file
+    LOCK_TIMEOUT = 300
+
+    @staticmethod
+    def _get_storage() -> FileStorage:
+        return EnvHelper.get_storage(
+            storage_type=StorageType.PERMANENT,
+            env_name=FileStorageKeys.PERMANENT_REMOTE_STORAGE,
+        )
+
+    @classmethod
+    def _ref_count_key(cls, file_path: str) -> str:
+        return f"{cls.REF_COUNT_KEY_PREFIX}:{file_path}"
+
+    @staticmethod
+    def get_file_path(
+        organization_id: str, workflow_id: str, file_hash: str, file_name: str
+    ) -> str:
+        """Path of the content addressed copy of a queued file.
+
+        Args:
+            organization_id (str): Organization the workflow belongs to
+            workflow_id (str): Workflow whose review queue holds the file
+            file_hash (str): SHA-256 of the file content
+            file_name (str): Original file name, used only for its extension
+
+        Returns:
+            str: Path of the file in permanent storage
+        """
+        base_path = UnstractUtils.get_env(
+            env_key=FileStorageConstants.REMOTE_REVIEW_QUEUE_FILE_PATH,
+            default="unstract/review-queue",
+        )
+        _, extension = os.path.splitext(file_name)
+        return str(
+            Path(base_path)
+            / organization_id
+            / str(workflow_id)
+            / f"{file_hash}{extension.lower()}"
+        )
+
+    @classmethod
+    def _lock(cls, file_path: str) -> Lock:
+        # Serializes writing and removing the copy of a file
+        return CacheService.lock(
+            f"{cls.REF_COUNT_KEY_PREFIX}_lock:{file_path}", timeout=cls.LOCK_TIMEOUT
+        )
+
+    @classmethod
+    def store(cls, file_path: str, read_content: Callable[[], bytes]) -> None:
+        """Store a file for a queue entry, reusing an existing copy if any.
+
+        Args:
+            file_path (str): Content addressed path from `get_file_path`
+            read_content (Callable[[], bytes]): Reads the file content, only
+                called when no copy is stored yet
+        """
+        file_storage = cls._get_storage()
+        with cls._lock(file_path):
+            # Referenced before writing, a concurrent release can't remove
+            # the copy from under this entry
+            ref_count_key = cls._ref_count_key(file_path)
+            CacheService.incr(ref_count_key)
+            try:
+                if not file_storage.exists(file_path):
+                    file_storage.write(path=file_path, mode="wb", data=read_content())
+            except Exception:
+                CacheService.decr_or_delete(ref_count_key)
+                raise
+
+    @classmethod
+    def read(cls, file_path: str) -> bytes:
+        """Fetch the content of a queued file."""
+        file_content: bytes = cls._get_storage().read(path=file_path, mode="rb")
+        return file_content
+
+    @classmethod
+    def release(cls, file_path: str) -> None:
+        """Drop a reference to a queued file and delete it if unreferenced."""
+        with cls._lock(file_path):
+            if CacheService.decr_or_delete(cls._ref_count_key(file_path)) > 0:
+                return
+            file_storage = cls._get_storage()
+            if file_storage.exists(file_path):
+                file_storage.rm(file_path)
+
+    @classmethod
+    def get_file_content(cls, queue_result: dict[str, Any]) -> Optional[str]:
+        """Base64 content of the file referenced by a queue entry.
+
+        Entries enqueued before files were stored by reference carry the
+        content inline, which is returned as is.
+
+        Args:
+            queue_result (dict[str, Any]): Deserialized queue entry
+
+        Returns:
+            Optional[str]: Base64 encoded file content
+        """
+        if queue_result.get("file_content"):
+            return queue_result["file_content"]
+        file_path = queue_result.get("file_path")
+        if not file_path:
+            return None
+        return base64.b64encode(cls.read(file_path)).decode("utf-8")
+
+    @classmethod
+    def release_for_result(cls, queue_result: dict[str, Any]) -> None:
+        """Clean up the stored file of a dequeued queue entry."""
+        file_path = queue_result.get("file_path")
+        if file_path:
+            cls.release(file_path)
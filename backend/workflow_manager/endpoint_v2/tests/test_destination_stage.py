@@ -0,0 +1,163 @@
+import threading
+import time
+from contextlib import ExitStack
+from unittest import mock
+
+import pytest  # type: ignore
+from workflow_manager.endpoint_v2.destination_stage import DestinationWriteStage
+from workflow_manager.workflow_v2.enums import ExecutionStatus
+from workflow_manager.workflow_v2.workflow_helper import WorkflowHelper
+
+
+@pytest.fixture
+def write_stage():
+    with mock.patch(
+        "workflow_manager.endpoint_v2.destination_stage.close_old_connections"
+    ):
+        stage = DestinationWriteStage(max_workers=4, max_backlog=8)
+        yield stage
+        stage.shutdown()
+
+
+def test_serial_writes_keep_order(write_stage):
+    """Test writes to the same table run one at a time, in file order, so
+    the first one creates the table before the others insert."""
+    tables: set[str] = set()
+    rows: list[int] = []
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def insert(row: int) -> None:
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        if "output" not in tables:
+            # Widens the window for a concurrent write to race the creation
+            time.sleep(0.05)
+            tables.add("output")
+        # Later files finish faster, they would overtake unordered writes
+        time.sleep(0.01 * (5 - row))
+        rows.append(row)
+        with lock:
+            running -= 1
+
+    for row in range(5):
+        write_stage.submit(
+            file_execution_id=str(row),
+            file_name=f"file-{row}",
+            write=insert,
+            serial_key="connector:output",
+            row=row,
+        )
+
+    assert write_stage.wait() == []
+    assert rows == [0, 1, 2, 3, 4]
+    assert max_running == 1
+
+
+def test_unkeyed_writes_run_concurrently(write_stage):
+    """Test writes without a serial key don't wait for each other."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    for index in range(2):
+        write_stage.submit(
+            file_execution_id=str(index),
+            file_name=f"file-{index}",
+            write=barrier.wait,
+        )
+
+    assert write_stage.wait() == []
+
+
+def test_failed_write_does_not_block_serial_writes(write_stage):
+    """Test a failed write is reported and the next ones of its key run."""
+    rows: list[int] = []
+
+    def insert(row: int) -> None:
+        if row == 0:
+            raise ValueError("table is locked")
+        rows.append(row)
+
+    for row in range(3):
+        write_stage.submit(
+            file_execution_id=str(row),
+            file_name=f"file-{row}",
+            write=insert,
+            serial_key="connector:output",
+            row=row,
+        )
+
+    failed = write_stage.wait()
+
+    assert rows == [1, 2]
+    assert [write.file_execution_id for write in failed] == ["0"]
+    assert "table is locked" in failed[0].error
+
+
+def test_failed_writes_correct_file_counts(write_stage):
+    """Test files whose destination write failed are counted as failed and
+    their file execution is marked as errored."""
+
+    def write(row: int) -> None:
+        if row == 1:
+            raise ValueError("connection reset")
+
+    destination = mock.MagicMock()
+    destination.wait_for_pending_writes.side_effect = write_stage.wait
+
+    def process_file(destination, file_hash, workflow_file_execution, **kwargs):
+        # The destination write is handed over, the file counts as processed
+        write_stage.submit(
+            file_execution_id=str(workflow_file_execution.id),
+            file_name=file_hash.file_name,
+            write=write,
+            row=file_hash.row,
+        )
+        return None
+
+    file_executions = {row: mock.MagicMock(id=row) for row in range(3)}
+    input_files = {
+        f"file-{row}": mock.MagicMock(file_name=f"file-{row}", row=row)
+        for row in range(3)
+    }
+    execution_service = mock.MagicMock()
+    helper = "workflow_manager.workflow_v2.workflow_helper"
+    with ExitStack() as stack:
+        workflow_util = stack.enter_context(mock.patch(f"{helper}.WorkflowUtil"))
+        stack.enter_context(
+            mock.patch.object(
+                WorkflowHelper,
+                "_get_or_create_workflow_execution_file",
+                side_effect=lambda file_hash, **_: file_executions[file_hash.row],
+            )
+        )
+        stack.enter_context(
+            mock.patch.object(WorkflowHelper, "_process_file", side_effect=process_file)
+        )
+        get_file_execution = stack.enter_context(
+            mock.patch(f"{helper}.WorkflowFileExecution.objects.get")
+        )
+        workflow_util.add_file_destination_filehash.side_effect = (
+            lambda _, __, file_hash: file_hash
+        )
+        get_file_execution.side_effect = lambda id: file_executions[int(id)]
+        WorkflowHelper.process_input_files(
+            workflow=mock.MagicMock(),
+            source=mock.MagicMock(),
+            destination=destination,
+            execution_service=execution_service,
+            single_step=False,
+            input_files=input_files,
+        )
+
+    execution_service.publish_final_workflow_logs.assert_called_once_with(
+        total_files=3, successful_files=2, failed_files=1
+    )
+    failed_execution = file_executions[1]
+    failed_execution.update_status.assert_called_with(
+        status=ExecutionStatus.ERROR,
+        execution_error="Error processing output of file 'file-1'. connection reset",
+    )
+    execution_service.update_execution.assert_called_with(ExecutionStatus.COMPLETED)
@@ -0,0 +1,103 @@
+import json
+import logging
+from typing import Any, Optional, Union
+
+from rest_framework.exceptions import APIException
+from unstract.sdk.file_storage import FileStorage
+from unstract.workflow_execution.constants import ToolOutputType
+from unstract.workflow_execution.execution_file_handler import ExecutionFileHandler
+from workflow_manager.endpoint_v2.exceptions import (
+    InvalidToolOutputType,
+    ToolOutputTypeMismatch,
+)
+
+from unstract.filesystem import FileStorageType, FileSystem
+
+logger = logging.getLogger(__name__)
+
+
+class ToolOutputReader:
+    """Reads the output of the last tool for a single file.
+
+    The output file and the workflow metadata are fetched from the execution
+    storage at most once and the parsed objects are kept for the lifetime of
+    the reader. The output is validated against the output type declared by
+    the tool instead of sniffing its MIME type, which would cost an extra
+    remote read.
+    """
+
+    def __init__(self, file_handler: ExecutionFileHandler, output_file: str) -> None:
+        self.file_handler = file_handler
+        self.output_file = output_file
+        self._file_storage: Optional[FileStorage] = None
+        self._metadata: Optional[dict[str, Any]] = None
+        self._result: Optional[Union[dict[str, Any], str]] = None
+
+    @property
+    def file_storage(self) -> FileStorage:
+        if self._file_storage is None:
+            file_system = FileSystem(FileStorageType.WORKFLOW_EXECUTION)
+            self._file_storage = file_system.get_file_storage()
+        return self._file_storage
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        """Workflow metadata written for the file being processed."""
+        if self._metadata is None:
+            self._metadata = self.file_handler.get_workflow_metadata()
+        return self._metadata
+
+    @property
+    def output_type(self) -> str:
+        return self.file_handler.get_output_type(self.metadata)
+
+    @property
+    def result(self) -> Union[dict[str, Any], str]:
+        """Parsed output of the tool.
+
+        Raises:
+            ToolOutputTypeMismatch: If the output does not match the type
+                declared by the tool
+            InvalidToolOutputType: If the declared type is not supported
+            APIException: If the output could not be read
+        """
+        if self._result is None:
+            self._result = self._read_result()
+        return self._result
+
+    def _read_result(self) -> Union[dict[str, Any], str]:
+        output_type = self.output_type
+        if output_type not in (ToolOutputType.JSON, ToolOutputType.TXT):
+            raise InvalidToolOutputType()
+        try:
+            file_content: str = self.file_storage.read(self.output_file, mode="r")
+        except FileNotFoundError as err:
+            msg = f"Error while getting result from the tool: {err}"
+            logger.error(msg)
+            raise APIException(detail=msg)
+
+        if output_type == ToolOutputType.JSON:
+            try:
+                return json.loads(file_content)
+            except json.JSONDecodeError as err:
+                msg = f"Expected tool output type: JSON, got invalid JSON: {err}"
+                logger.error(msg)
+                raise ToolOutputTypeMismatch(detail=msg)
+
+        if self._is_json(file_content):
+            msg = "Expected tool output type: TXT, got: 'JSON'"
+            logger.error(msg)
+            raise ToolOutputTypeMismatch(detail=msg)
+        return file_content.encode("utf-8").decode("unicode-escape")
+
+    @staticmethod
+    def _is_json(content: str) -> bool:
+        """Cheap check for a JSON object or array in a text output."""
+        stripped = content.lstrip()
+        if not stripped or stripped[0] not in "{[":
+            return False
+        try:
+            json.loads(stripped)
+        except json.JSONDecodeError:
+            return False
+        return True
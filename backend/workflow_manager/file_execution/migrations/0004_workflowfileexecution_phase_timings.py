@@ -0,0 +1,22 @@
+# Generated by Django 4.2.1 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("file_execution", "0003_alter_workflowfileexecution_status_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workflowfileexecution",
+            name="phase_timings",
+            field=models.JSONField(
+                blank=True,
+                db_comment="Seconds spent in each phase of the tool container runs",
+                null=True,
+            ),
+        ),
+    ]
@@ -91,6 +91,11 @@ class WorkflowFileExecution(BaseModel):
     execution_error = models.TextField(
         blank=True, null=True, db_comment="Error message if execution failed"
     )
+    phase_timings = models.JSONField(
+        null=True,
+        blank=True,
+        db_comment="Seconds spent in each phase of the tool container runs",
+    )
 
     # Custom manager
     objects = WorkflowFileExecutionManager()
@@ -134,6 +139,16 @@ class WorkflowFileExecution(BaseModel):
         self.execution_error = execution_error
         self.save()
 
+    def update_phase_timings(self, phase_timings: dict[str, float]) -> None:
+        """Stores the phase timings reported by the runner for the file.
+
+        Args:
+            phase_timings (dict[str, float]): Seconds spent in each phase of
+                the tool runs
+        """
+        self.phase_timings = phase_timings
+        self.save(update_fields=["phase_timings", "modified_at"])
+
     @property
     def pretty_file_size(self) -> str:
         """Convert file_size from bytes to human-readable format
@@ -37,7 +37,7 @@ class FileCentricExecutionSerializer(serializers.ModelSerializer):
             return obj.execution_error
 
         latest_log = (
-            obj.execution_logs.exclude(data__level__in=["DEBUG", "WARN"])
+            obj.execution_logs.exclude(level__in=["DEBUG", "WARN"])
             .order_by("-event_time")
             .first()
         )
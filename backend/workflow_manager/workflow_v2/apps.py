@@ -6,8 +6,12 @@ class WorkflowConfig(AppConfig):
     name = "workflow_manager.workflow_v2"
 
     def ready(self):
+        # Registers the archiver task
+        from workflow_manager.workflow_v2 import execution_log_archive  # noqa: F401
         from workflow_manager.workflow_v2.execution_log_utils import (
+            create_log_archiver_scheduler_if_not_exists,
             create_log_consumer_scheduler_if_not_exists,
         )
 
         create_log_consumer_scheduler_if_not_exists()
+        create_log_archiver_scheduler_if_not_exists()
@@ -362,7 +362,11 @@ class WorkflowExecutionServiceHelper(WorkflowExecutionService):
             f"file '{file_name}'"
         )
 
-        self.execute(file_execution_id, single_step)
+        try:
+            self.execute(file_execution_id, single_step)
+        finally:
+            if self.phase_timings:
+                workflow_file_execution.update_phase_timings(self.phase_timings)
         self.publish_log(f"Tool executed successfully for '{file_name}'")
         self._handle_execution_type(execution_type)
 
@@ -0,0 +1,230 @@
+"""Retention of execution logs.
+
+Logs of executions older than the retention window of their organization
+are written, one archive per execution, as zstd compressed JSONL to the
+permanent file storage, next to the counts of its logs by file execution
+and level. Archived executions are read from there by the
+execution logs API. Their rows are removed from the database by dropping
+monthly partitions once all of their logs are archived.
+"""
+
+import io
+import itertools
+import json
+import logging
+import os
+from collections import Counter
+from collections.abc import Iterator
+from datetime import timedelta
+from functools import cached_property
+from typing import Any, Optional
+
+import zstandard
+from account_v2.models import Organization
+from celery import shared_task
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.utils import timezone
+from unstract.sdk.file_storage.constants import StorageType
+from unstract.sdk.file_storage.env_helper import EnvHelper
+from utils.constants import ExecutionLogConstants
+from utils.file_storage.constants import FileStorageKeys
+from workflow_manager.workflow_v2.execution_log_partitions import (
+    drop_archived_partitions,
+    is_partitioned,
+)
+from workflow_manager.workflow_v2.models.execution import WorkflowExecution
+from workflow_manager.workflow_v2.models.execution_log import ExecutionLog
+from workflow_manager.workflow_v2.models.workflow import Workflow
+from workflow_manager.workflow_v2.serializers import WorkflowExecutionLogSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def _get_storage() -> Any:
+    return EnvHelper.get_storage(
+        storage_type=StorageType.PERMANENT,
+        env_name=FileStorageKeys.PERMANENT_REMOTE_STORAGE,
+    )
+
+
+def get_archive_path(organization_id: str, execution_id: str) -> str:
+    return os.path.join(
+        ExecutionLogConstants.ARCHIVE_PATH,
+        organization_id,
+        f"{execution_id}.jsonl.zst",
+    )
+
+
+def get_counts_path(organization_id: str, execution_id: str) -> str:
+    return os.path.join(
+        ExecutionLogConstants.ARCHIVE_PATH,
+        organization_id,
+        f"{execution_id}.counts.json",
+    )
+
+
+def archive_execution(organization_id: str, execution: WorkflowExecution) -> int:
+    """Write the logs of an execution to its archive and mark it archived.
+
+    Logs are stored as the execution logs API returns them, in order. Their
+    counts are stored alongside, so paging the archive needs no extra pass.
+
+    Returns:
+        int: Number of archived logs
+    """
+    logs = ExecutionLog.objects.filter(execution_id=execution.id).order_by("event_time")
+    buffer = io.BytesIO()
+    count = 0
+    counts: Counter[tuple[Any, Any]] = Counter()
+    compressor = zstandard.ZstdCompressor()
+    with compressor.stream_writer(buffer, closefd=False) as writer:
+        for log in logs.iterator():
+            data = WorkflowExecutionLogSerializer(log).data
+            line = json.dumps(data, cls=DjangoJSONEncoder)
+            writer.write(f"{line}\n".encode())
+            counts[(data.get("file_execution"), data.get("level"))] += 1
+            count += 1
+    if count:
+        path = get_archive_path(organization_id, str(execution.id))
+        storage = _get_storage()
+        storage.mkdir(os.path.dirname(path), create_parents=True)
+        storage.write(path=path, mode="wb", data=buffer.getvalue())
+        # Keyed like the logs, so the API's filters apply to them as well
+        entries = [
+            {"file_execution": file_execution, "level": level, "count": value}
+            for (file_execution, level), value in counts.items()
+        ]
+        storage.write(
+            path=get_counts_path(organization_id, str(execution.id)),
+            mode="w",
+            data=json.dumps(entries, cls=DjangoJSONEncoder),
+        )
+    execution.logs_archived = True
+    execution.save(update_fields=["logs_archived"])
+    return count
+
+
+class ArchivedLogs:
+    """Logs of an archived execution matching `filters`, in order.
+
+    Supports the `count()` and slicing Django's paginator needs. Counts are
+    read from the stored counts of the archive. A slice decompresses the
+    archive up to its end, keeping only the logs of the slice in memory.
+    """
+
+    def __init__(
+        self, execution: WorkflowExecution, filters: Optional[dict[str, Any]] = None
+    ) -> None:
+        self.execution = execution
+        self.filters = filters or {}
+        self._data: Optional[bytes] = None
+        self._count: Optional[int] = None
+
+    @cached_property
+    def _organization_id(self) -> Optional[str]:
+        workflow = Workflow._base_manager.filter(id=self.execution.workflow_id).first()
+        if not workflow or not workflow.organization:
+            return None
+        organization_id: str = workflow.organization.organization_id
+        return organization_id
+
+    def _load(self) -> bytes:
+        """Compressed archive, empty if the execution has none."""
+        organization_id = self._organization_id
+        if not organization_id:
+            return b""
+        path = get_archive_path(organization_id, str(self.execution.id))
+        storage = _get_storage()
+        if not storage.exists(path):
+            # Executions without logs have no archive
+            return b""
+        data: bytes = storage.read(path=path, mode="rb")
+        return data
+
+    def _load_count(self) -> Optional[int]:
+        """Count of the logs matching the filters, from the stored counts."""
+        organization_id = self._organization_id
+        if not organization_id:
+            return 0
+        path = get_counts_path(organization_id, str(self.execution.id))
+        storage = _get_storage()
+        if not storage.exists(path):
+            # Executions without logs have neither, else the logs are counted
+            return None
+        entries = json.loads(storage.read(path=path, mode="r"))
+        return sum(
+            entry["count"]
+            for entry in entries
+            if all(entry.get(key) == value for key, value in self.filters.items())
+        )
+
+    def _read(self) -> Iterator[dict[str, Any]]:
+        if self._data is None:
+            self._data = self._load()
+        if not self._data:
+            return
+        data = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(self._data))
+        for line in io.TextIOWrapper(data, encoding="utf-8"):
+            log = json.loads(line)
+            if all(log.get(key) == value for key, value in self.filters.items()):
+                yield log
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self._read()
+
+    def count(self) -> int:
+        if self._count is None:
+            count = self._load_count()
+            if count is None:
+                count = sum(1 for _ in self._read())
+            self._count = count
+        return self._count
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __getitem__(self, index: slice) -> list[dict[str, Any]]:
+        return list(itertools.islice(self._read(), index.start, index.stop))
+
+
+def _archive_organization(organization: Organization, retention_days: int) -> int:
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    workflow_ids = Workflow._base_manager.filter(organization=organization).values("id")
+    executions = WorkflowExecution.objects.filter(
+        workflow_id__in=workflow_ids,
+        created_at__lt=cutoff,
+        logs_archived=False,
+    ).order_by("created_at")[: ExecutionLogConstants.ARCHIVE_BATCH_SIZE]
+    with connection.cursor() as cursor:
+        partitioned = connection.vendor == "postgresql" and is_partitioned(cursor)
+    archived = 0
+    for execution in executions:
+        try:
+            archive_execution(organization.organization_id, execution)
+        except Exception as e:
+            logger.error(f"Error archiving logs of execution {execution.id}: {e}")
+            continue
+        if not partitioned:
+            # Rows of partitioned tables are dropped with their partition
+            ExecutionLog.objects.filter(execution_id=execution.id).delete()
+        archived += 1
+    return archived
+
+
+@shared_task(name=ExecutionLogConstants.ARCHIVE_TASK)
+def archive_execution_logs() -> None:
+    """Archive the logs of executions past the retention of their org."""
+    archived = 0
+    for organization in Organization.objects.all():
+        retention_days = organization.log_retention_days
+        if retention_days is None:
+            retention_days = ExecutionLogConstants.RETENTION_DAYS
+        if retention_days <= 0:
+            continue
+        archived += _archive_organization(organization, retention_days)
+    # Partitions of the current month still receive logs
+    dropped = drop_archived_partitions(before=timezone.now())
+    logger.info(
+        f"Archived logs of {archived} executions, dropped partitions: {dropped}"
+    )
@@ -0,0 +1,174 @@
+"""Monthly partitions of the `execution_log` table.
+
+The table is range partitioned on `event_time` with one partition per
+month, e.g. `execution_log_y2025m03`, and a default partition for rows
+outside of them. Partitions are created ahead of time by the log history
+consumer, old months can be detached or dropped as a whole.
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from django.db import DatabaseError, connection
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "execution_log"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+# Months after the current one to have partitions for
+MONTHS_AHEAD = 2
+PARTITION_NAME_PATTERN = re.compile(rf"^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def _month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def _next_month(value: datetime) -> datetime:
+    return _month_start(value.replace(day=28) + timedelta(days=4))
+
+
+def _months_ahead(value: datetime, months: int) -> datetime:
+    for _ in range(months):
+        value = _next_month(value)
+    return value
+
+
+def get_partition_name(month: datetime) -> str:
+    return f"{PARENT_TABLE}_y{month.year}m{month.month:02d}"
+
+
+def is_partitioned(cursor: Any) -> bool:
+    cursor.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = %s::regclass)",
+        [PARENT_TABLE],
+    )
+    return bool(cursor.fetchone()[0])
+
+
+def create_monthly_partitions(cursor: Any, start: datetime, end: datetime) -> None:
+    """Create the missing partitions of the months from `start` to `end`.
+
+    Fails if the default partition already holds rows of a created month.
+    """
+    month = _month_start(start)
+    while month <= end:
+        next_month = _next_month(month)
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {get_partition_name(month)} "
+            f"PARTITION OF {PARENT_TABLE} FOR VALUES FROM (%s) TO (%s)",
+            [month, next_month],
+        )
+        month = next_month
+
+
+def partition_table(cursor: Any) -> None:
+    """Convert `execution_log` into a partitioned table, keeping its rows.
+
+    Postgres requires the partition key in the primary key, which becomes
+    (id, event_time). Indexes and foreign keys are recreated as they were.
+    """
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = %s "
+        "AND indexname NOT IN (SELECT conname FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype IN ('p', 'u'))",
+        [PARENT_TABLE, PARENT_TABLE],
+    )
+    index_definitions = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [PARENT_TABLE],
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute(
+        "SELECT conname FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'p'",
+        [PARENT_TABLE],
+    )
+    primary_key = cursor.fetchone()[0]
+    cursor.execute(f"SELECT min(event_time) FROM {PARENT_TABLE}")
+    now = datetime.now(timezone.utc)
+    oldest = cursor.fetchone()[0] or now
+
+    unpartitioned = f"{PARENT_TABLE}_unpartitioned"
+    cursor.execute(f"ALTER TABLE {PARENT_TABLE} RENAME TO {unpartitioned}")
+    # Frees the name of the primary key for the partitioned table
+    cursor.execute(f'ALTER INDEX "{primary_key}" RENAME TO {unpartitioned}_pkey')
+    cursor.execute(
+        f"CREATE TABLE {PARENT_TABLE} ("
+        f"LIKE {unpartitioned} INCLUDING DEFAULTS INCLUDING COMMENTS, "
+        f'CONSTRAINT "{primary_key}" PRIMARY KEY (id, event_time)'
+        ") PARTITION BY RANGE (event_time)"
+    )
+    cursor.execute(
+        f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"
+    )
+    create_monthly_partitions(cursor, oldest, _months_ahead(now, MONTHS_AHEAD))
+    cursor.execute(f"INSERT INTO {PARENT_TABLE} SELECT * FROM {unpartitioned}")
+    cursor.execute(f"DROP TABLE {unpartitioned}")
+    for index_definition in index_definitions:
+        cursor.execute(index_definition)
+    for name, definition in foreign_keys:
+        cursor.execute(
+            f'ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT "{name}" {definition}'
+        )
+
+
+def ensure_partitions() -> None:
+    """Create the partitions of the current and next `MONTHS_AHEAD` months."""
+    if connection.vendor != "postgresql":
+        return
+    now = datetime.now(timezone.utc)
+    try:
+        with connection.cursor() as cursor:
+            if is_partitioned(cursor):
+                create_monthly_partitions(cursor, now, _months_ahead(now, MONTHS_AHEAD))
+    except DatabaseError as e:
+        logger.error(f"Error creating {PARENT_TABLE} partitions: {e}")
+
+
+def drop_archived_partitions(before: datetime) -> list[str]:
+    """Drop the monthly partitions ending before `before` whose logs all
+    belong to executions with archived logs.
+
+    Dropping a partition is much cheaper than deleting its rows, and
+    leaves nothing to vacuum.
+
+    Returns:
+        list[str]: Names of the dropped partitions
+    """
+    if connection.vendor != "postgresql":
+        return []
+    dropped = []
+    with connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return []
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = %s::regclass",
+            [PARENT_TABLE],
+        )
+        for (name,) in cursor.fetchall():
+            match = PARTITION_NAME_PATTERN.match(name)
+            if not match:
+                continue
+            month = datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)
+            if _next_month(month) > before:
+                continue
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {name} log "
+                "JOIN workflow_execution execution "
+                "ON execution.id = log.execution_id "
+                "WHERE NOT execution.logs_archived)"
+            )
+            if cursor.fetchone()[0]:
+                continue
+            cursor.execute(f"DROP TABLE {name}")
+            dropped.append(name)
+    return dropped
@@ -1,30 +1,94 @@
 import logging
 import sys
+import time
 from collections import defaultdict
+from datetime import datetime
+from typing import Any, Optional
 
 from celery import shared_task
 from django.db import IntegrityError
 from django.db.utils import ProgrammingError
+from django.utils import timezone as dj_timezone
 from django_celery_beat.models import IntervalSchedule, PeriodicTask
 from utils.cache_service import CacheService
 from utils.constants import ExecutionLogConstants
 from utils.dto import LogDataDTO
 from workflow_manager.file_execution.models import WorkflowFileExecution
+from workflow_manager.workflow_v2.execution_log_partitions import ensure_partitions
 from workflow_manager.workflow_v2.models.execution_log import ExecutionLog
 
+from unstract.core.constants import LogFieldName
+
 logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True, name=ExecutionLogConstants.TASK_V2)
 def consume_log_history(self):
-    organization_logs = defaultdict(list)
+    """Store the queued execution logs in the database.
+
+    Logs are popped and inserted in batches of `LOGS_BATCH_LIMIT`. The run
+    keeps draining while more than `LOGS_DRAIN_THRESHOLD` logs are queued,
+    for at most `LOGS_DRAIN_MAX_SECONDS`, so that the queue doesn't grow
+    between runs under heavy executions.
+    """
+    if not CacheService.check_a_key_exist(ExecutionLogConstants.PARTITIONS_CHECKED_KEY):
+        ensure_partitions()
+        CacheService.set_key(
+            ExecutionLogConstants.PARTITIONS_CHECKED_KEY, True, expire=86400
+        )
+    started_at = time.monotonic()
     logs_count = 0
-
-    while logs_count < ExecutionLogConstants.LOGS_BATCH_LIMIT:
-        log = CacheService.lpop(ExecutionLogConstants.LOG_QUEUE_NAME)
-        if not log:
+    lag_seconds = 0.0
+    while True:
+        logs = CacheService.lpop_batch(
+            ExecutionLogConstants.LOG_QUEUE_NAME,
+            ExecutionLogConstants.LOGS_BATCH_LIMIT,
+        )
+        if not logs:
             break
-
+        stored, batch_lag = store_logs(logs)
+        logs_count += stored
+        lag_seconds = max(lag_seconds, batch_lag)
+        if len(logs) < ExecutionLogConstants.LOGS_BATCH_LIMIT:
+            break
+        elapsed = time.monotonic() - started_at
+        if elapsed >= ExecutionLogConstants.LOGS_DRAIN_MAX_SECONDS:
+            break
+        if (
+            CacheService.llen(ExecutionLogConstants.LOG_QUEUE_NAME)
+            <= ExecutionLogConstants.LOGS_DRAIN_THRESHOLD
+        ):
+            break
+    duration = time.monotonic() - started_at
+    logger.info(
+        f"Logs count: {logs_count}, took {duration:.2f}s, "
+        f"ingestion lag: {lag_seconds:.2f}s"
+    )
+    CacheService.set_key(
+        ExecutionLogConstants.STATS_KEY,
+        {
+            "finished_at": dj_timezone.now().isoformat(),
+            "logs_count": logs_count,
+            "duration_seconds": round(duration, 3),
+            "ingestion_lag_seconds": round(lag_seconds, 3),
+        },
+    )
+
+
+def store_logs(logs: list[Any]) -> tuple[int, float]:
+    """Store a batch of queued logs.
+
+    Args:
+        logs (list[Any]): Logs popped from the queue
+
+    Returns:
+        tuple[int, float]: Number of logs stored and the seconds since the
+            oldest of them was emitted
+    """
+    organization_logs = defaultdict(list)
+    logs_count = 0
+    oldest_event_time: Optional[datetime] = None
+    for log in logs:
         log_data = LogDataDTO.from_json(log)
         if not log_data:
             continue
@@ -33,6 +97,7 @@ def consume_log_history(self):
         execution_log = ExecutionLog(
             execution_id=log_data.execution_id,
             data=log_data.data,
+            level=log_data.data.get(LogFieldName.LEVEL),
             event_time=log_data.event_time,
         )
 
@@ -45,21 +110,68 @@ def consume_log_history(self):
         organization_id = log_data.organization_id
         organization_logs[organization_id].append(execution_log)
         logs_count += 1
-    logger.info(f"Logs count: {logs_count}")
-    for organization_id, logs in organization_logs.items():
-        store_to_db(organization_id, logs)
+        if oldest_event_time is None or log_data.event_time < oldest_event_time:
+            oldest_event_time = log_data.event_time
+    for organization_id, org_logs in organization_logs.items():
+        store_to_db(organization_id, org_logs)
+    if oldest_event_time is None:
+        return logs_count, 0.0
+    return logs_count, (dj_timezone.now() - oldest_event_time).total_seconds()
+
+
+def get_log_history_metrics() -> dict[str, Any]:
+    """Backlog of the log history queue and stats of the last consumer run.
+
+    Returns:
+        dict[str, Any]: `backlog` is the number of queued logs and
+            `oldest_log_age_seconds` how long the head of the queue has
+            been waiting
+    """
+    backlog = CacheService.llen(ExecutionLogConstants.LOG_QUEUE_NAME)
+    oldest_log_age = 0.0
+    head = CacheService.lindex(ExecutionLogConstants.LOG_QUEUE_NAME, 0)
+    log_data = LogDataDTO.from_json(head) if head else None
+    if log_data:
+        oldest_log_age = (dj_timezone.now() - log_data.event_time).total_seconds()
+    return {
+        "backlog": backlog,
+        "oldest_log_age_seconds": round(oldest_log_age, 3),
+        "last_run": CacheService.get_key(ExecutionLogConstants.STATS_KEY),
+    }
 
 
 def create_log_consumer_scheduler_if_not_exists() -> None:
+    _create_periodic_task_if_not_exists(
+        name=ExecutionLogConstants.PERIODIC_TASK_NAME_V2,
+        task_name=ExecutionLogConstants.TASK_V2,
+        every=ExecutionLogConstants.CONSUMER_INTERVAL,
+        enabled=ExecutionLogConstants.IS_ENABLED,
+        description="log consumer",
+    )
+
+
+def create_log_archiver_scheduler_if_not_exists() -> None:
+    _create_periodic_task_if_not_exists(
+        name=ExecutionLogConstants.ARCHIVE_PERIODIC_TASK_NAME,
+        task_name=ExecutionLogConstants.ARCHIVE_TASK,
+        every=ExecutionLogConstants.ARCHIVE_INTERVAL,
+        enabled=ExecutionLogConstants.RETENTION_DAYS > 0,
+        description="log archiver",
+    )
+
+
+def _create_periodic_task_if_not_exists(
+    name: str, task_name: str, every: int, enabled: bool, description: str
+) -> None:
     try:
         interval, _ = IntervalSchedule.objects.get_or_create(
-            every=ExecutionLogConstants.CONSUMER_INTERVAL,
+            every=every,
             period=IntervalSchedule.SECONDS,
         )
     except ProgrammingError as error:
         logger.warning(
             "ProgrammingError occurred while creating "
-            "log consumer scheduler. If you are currently running "
+            f"{description} scheduler. If you are currently running "
             "migrations for new environment, you can ignore this warning"
         )
         if all(arg not in sys.argv for arg in ("migrate", "makemigrations")):
@@ -68,36 +180,39 @@ def create_log_consumer_scheduler_if_not_exists() -> None:
     except IntervalSchedule.MultipleObjectsReturned as error:
         logger.error(f"Error occurred while getting interval schedule: {error}")
         interval = IntervalSchedule.objects.filter(
-            every=ExecutionLogConstants.CONSUMER_INTERVAL,
+            every=every,
             period=IntervalSchedule.SECONDS,
         ).first()
     try:
         # Create the scheduler
         task, created = PeriodicTask.objects.get_or_create(
-            name=ExecutionLogConstants.PERIODIC_TASK_NAME_V2,
-            task=ExecutionLogConstants.TASK_V2,
+            name=name,
+            task=task_name,
             defaults={
                 "interval": interval,
                 "queue": ExecutionLogConstants.CELERY_QUEUE_NAME,
-                "enabled": ExecutionLogConstants.IS_ENABLED,
+                "enabled": enabled,
             },
         )
         if not created:
-            task.enabled = ExecutionLogConstants.IS_ENABLED
+            task.enabled = enabled
             task.interval = interval
             task.queue = ExecutionLogConstants.CELERY_QUEUE_NAME
             task.save()
-            logger.info("Log consumer scheduler updated successfully.")
+            logger.info(f"{description.capitalize()} scheduler updated successfully.")
         else:
-            logger.info("Log consumer scheduler created successfully.")
+            logger.info(f"{description.capitalize()} scheduler created successfully.")
     except IntegrityError as error:
-        logger.error(f"Error occurred while creating log consumer scheduler: {error}")
+        logger.error(f"Error occurred while creating {description} scheduler: {error}")
 
 
 def store_to_db(organization_id: str, execution_logs: list[ExecutionLog]) -> None:
 
     # Store the log data in the database within tenant context
-    ExecutionLog.objects.bulk_create(objs=execution_logs, ignore_conflicts=True)
+    ExecutionLog.objects.bulk_create(
+        objs=execution_logs,
+        batch_size=ExecutionLogConstants.LOGS_BATCH_LIMIT,
+    )
 
 
 class ExecutionLogUtils:
@@ -1,16 +1,26 @@
 import logging
+from typing import Any
 
 from django.db.models.query import QuerySet
 from permissions.permission import IsOwner
 from rest_framework import viewsets
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework.versioning import URLPathVersioning
-from utils.pagination import CustomPagination
+from utils.pagination import CustomCursorPagination, CustomPagination
+from workflow_manager.workflow_v2.execution_log_archive import ArchivedLogs
+from workflow_manager.workflow_v2.models.execution import WorkflowExecution
 from workflow_manager.workflow_v2.models.execution_log import ExecutionLog
 from workflow_manager.workflow_v2.serializers import WorkflowExecutionLogSerializer
 
 logger = logging.getLogger(__name__)
 
 
+class ExecutionLogCursorPagination(CustomCursorPagination):
+    ordering = "event_time"
+
+
 class WorkflowExecutionLogViewSet(viewsets.ModelViewSet):
     versioning_class = URLPathVersioning
     permission_classes = [IsOwner]
@@ -18,8 +28,26 @@ class WorkflowExecutionLogViewSet(viewsets.ModelViewSet):
     pagination_class = CustomPagination
 
     EVENT_TIME_FIELD_ASC = "event_time"
+    PAGINATION_QUERY_PARAM = "pagination"
+    CURSOR_PAGINATION = "cursor"
 
-    def get_queryset(self) -> QuerySet:
+    @property
+    def paginator(self) -> BasePagination:
+        """Pages by number, unless `?pagination=cursor` is requested.
+
+        Numbered pages get slower the deeper they are, clients paging
+        through long executions should opt into cursors and follow the
+        `next` and `previous` links, which keep the opt-in.
+        """
+        if not hasattr(self, "_paginator"):
+            pagination = self.request.query_params.get(self.PAGINATION_QUERY_PARAM)
+            if pagination == self.CURSOR_PAGINATION:
+                self._paginator = ExecutionLogCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def _get_filters(self) -> dict[str, Any]:
         # Get the execution_id:pk from the URL path
         execution_id = self.kwargs.get("pk")
         filter_param = {"execution_id": execution_id}
@@ -32,9 +60,31 @@ class WorkflowExecutionLogViewSet(viewsets.ModelViewSet):
 
         log_level = self.request.query_params.get("log_level")
         if log_level:
-            filter_param["data__level"] = log_level.upper()
+            filter_param["level"] = log_level.upper()
+        return filter_param
 
-        queryset = ExecutionLog.objects.filter(**filter_param).order_by(
+    def get_queryset(self) -> QuerySet:
+        queryset = ExecutionLog.objects.filter(**self._get_filters()).order_by(
             self.EVENT_TIME_FIELD_ASC
         )
         return queryset
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        execution = WorkflowExecution.objects.filter(
+            id=self.kwargs.get("pk"), logs_archived=True
+        ).first()
+        if not execution:
+            return super().list(request, *args, **kwargs)
+
+        # Logs past the retention are read from the execution's archive
+        filters = self._get_filters()
+        archive_filters = {}
+        if "file_execution_id" in filters:
+            archive_filters["file_execution"] = filters["file_execution_id"]
+        if "level" in filters:
+            archive_filters["level"] = filters["level"]
+        logs = ArchivedLogs(execution, filters=archive_filters)
+        # Cursors only page querysets
+        self._paginator = CustomPagination()
+        page = self.paginate_queryset(logs)
+        return self.get_paginated_response(page)
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.1 on 2026-10-19 10:12
+
+from django.db import migrations, models
+from workflow_manager.workflow_v2.execution_log_partitions import (
+    is_partitioned,
+    partition_table,
+)
+
+
+def partition_execution_log(apps, schema_editor):
+    """Partition execution_log by month of event_time, keeping its rows."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            partition_table(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workflow_v2", "0008_workflowexecution_total_files_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="executionlog",
+            name="level",
+            field=models.CharField(
+                blank=True,
+                db_comment="Log level, copied from the data for filtering",
+                editable=False,
+                max_length=16,
+                null=True,
+            ),
+        ),
+        migrations.RunSQL(
+            "UPDATE execution_log SET level = data->>'level' WHERE level IS NULL",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        # Reverting keeps the table partitioned, which earlier migrations
+        # work with as well
+        migrations.RunPython(partition_execution_log, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="executionlog",
+            index=models.Index(
+                fields=["execution_id", "event_time"],
+                name="execution_l_executi_20ad62_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="executionlog",
+            index=models.Index(
+                fields=["execution_id", "level", "event_time"],
+                name="execution_l_executi_69876e_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.1 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workflow_v2", "0009_executionlog_level_and_partitioning"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workflowexecution",
+            name="logs_archived",
+            field=models.BooleanField(
+                db_comment="Whether the execution logs were moved to the log archive",
+                default=False,
+            ),
+        ),
+    ]
@@ -85,6 +85,10 @@ class WorkflowExecution(BaseModel):
         default=0, db_comment="execution time in seconds"
     )
     tags = models.ManyToManyField(Tag, related_name="workflow_executions", blank=True)
+    logs_archived = models.BooleanField(
+        default=False,
+        db_comment="Whether the execution logs were moved to the log archive",
+    )
 
     class Meta:
         verbose_name = "Workflow Execution"
@@ -22,6 +22,13 @@ class ExecutionLog(BaseModel):
         blank=True,
     )
     data = models.JSONField(db_comment="Execution log data")
+    level = models.CharField(
+        max_length=16,
+        null=True,
+        blank=True,
+        editable=False,
+        db_comment="Log level, copied from the data for filtering",
+    )
     event_time = models.DateTimeField(db_comment="Execution log event time")
 
     def __str__(self):
@@ -31,3 +38,9 @@ class ExecutionLog(BaseModel):
         verbose_name = "Execution Log"
         verbose_name_plural = "Execution Logs"
         db_table = "execution_log"
+        # The table is partitioned by month of event_time in the database,
+        # see execution_log_partitions
+        indexes = [
+            models.Index(fields=["execution_id", "event_time"]),
+            models.Index(fields=["execution_id", "level", "event_time"]),
+        ]
@@ -11,6 +11,7 @@ from celery import current_task
 from celery import exceptions as celery_exceptions
 from celery import shared_task
 from celery.result import AsyncResult
+from django.conf import settings
 from django.db import IntegrityError
 from pipeline_v2.models import Pipeline
 from pipeline_v2.pipeline_processor import PipelineProcessor
@@ -26,6 +27,7 @@ from utils.constants import Account
 from utils.local_context import StateStore
 from utils.user_context import UserContext
 from workflow_manager.endpoint_v2.destination import DestinationConnector
+from workflow_manager.endpoint_v2.destination_stage import DestinationWriteStage
 from workflow_manager.endpoint_v2.dto import FileHash
 from workflow_manager.endpoint_v2.models import WorkflowEndpoint
 from workflow_manager.endpoint_v2.source import SourceConnector
@@ -203,6 +205,19 @@ class WorkflowHelper:
                 execution_service.publish_log(
                     message=error_message, level=LogLevel.ERROR
                 )
+        # Files handed to the destination write stage are counted as successful
+        # above, correct that for the writes which failed
+        for failed_write in destination.wait_for_pending_writes():
+            successful_files -= 1
+            failed_files += 1
+            error_message = failed_write.error
+            workflow_execution_file = WorkflowFileExecution.objects.get(
+                id=failed_write.file_execution_id
+            )
+            workflow_execution_file.update_status(
+                status=ExecutionStatus.ERROR, execution_error=error_message
+            )
+            execution_service.publish_log(message=error_message, level=LogLevel.ERROR)
         # TODO: Store only generic WF errors here (concerning all failed files)
         # TODO: Review if we need partial success
         if failed_files and failed_files >= total_files:
@@ -331,10 +346,17 @@ class WorkflowHelper:
             execution_id=execution_id,
             execution_service=execution_service,
         )
+        write_stage = None
+        if settings.DESTINATION_ASYNC_WRITES:
+            write_stage = DestinationWriteStage(
+                max_workers=settings.DESTINATION_WRITE_WORKERS,
+                max_backlog=settings.DESTINATION_WRITE_MAX_BACKLOG,
+            )
         destination = DestinationConnector(
             workflow=workflow,
             execution_id=execution_id,
             execution_service=execution_service,
+            write_stage=write_stage,
         )
         # Validating endpoints
         source.validate()
@@ -377,6 +399,8 @@ class WorkflowHelper:
             )
             raise
         finally:
+            # Pending destination writes still read from the execution directory
+            destination.shutdown_write_stage()
             # TODO: Handle error gracefully during delete
             # Mark status as an ERROR correctly
             destination.delete_execution_directory()
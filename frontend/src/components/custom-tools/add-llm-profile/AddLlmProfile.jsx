@@ -1,6 +1,7 @@
 import { ArrowLeftOutlined, CaretRightOutlined } from "@ant-design/icons";
 import {
   Button,
+  Checkbox,
   Col,
   Collapse,
   Form,
@@ -91,6 +92,7 @@ function AddLlmProfile({
       retrieval_strategy: "simple",
       similarity_top_k: 3,
       section: "Default",
+      enable_completion_cache: false,
       prompt_studio_tool: details?.tool_id,
     });
 
@@ -137,6 +139,7 @@ function AddLlmProfile({
       retrieval_strategy: llmProfileDetails?.retrieval_strategy,
       similarity_top_k: llmProfileDetails?.similarity_top_k,
       section: llmProfileDetails?.section,
+      enable_completion_cache: llmProfileDetails?.enable_completion_cache,
       prompt_studio_tool: details?.tool_id,
     });
     setActiveKey(true);
@@ -284,6 +287,21 @@ function AddLlmProfile({
           >
             <Select options={[{ value: "Default" }]} />
           </Form.Item>
+          <Form.Item
+            name="enable_completion_cache"
+            valuePropName="checked"
+            validateStatus={
+              getBackendErrorDetail("enable_completion_cache", backendErrors)
+                ? "error"
+                : ""
+            }
+            help={getBackendErrorDetail(
+              "enable_completion_cache",
+              backendErrors
+            )}
+          >
+            <Checkbox>Reuse answers of unchanged prompts and context</Checkbox>
+          </Form.Item>
         </div>
       ),
     },
@@ -66,45 +66,54 @@ function SocketMessages() {
     [logMessagesThrottledUpdate]
   );
 
-  // Socket message handler
-  const onMessage = useCallback(
-    (data) => {
-      try {
-        let msg = data.data;
-
-        if (typeof msg === "string" || msg instanceof Uint8Array) {
-          msg =
-            typeof msg === "string"
-              ? JSON.parse(msg)
-              : JSON.parse(new TextDecoder().decode(msg));
-        }
+  // Handles a single message of a socket event
+  const processMessage = useCallback(
+    (msg) => {
+      if (typeof msg === "string" || msg instanceof Uint8Array) {
+        msg =
+          typeof msg === "string"
+            ? JSON.parse(msg)
+            : JSON.parse(new TextDecoder().decode(msg));
+      }
 
-        if (
-          (msg?.type === "LOG" || msg?.type === "COST") &&
-          msg?.service !== "prompt"
-        ) {
-          msg.message = msg?.log;
-          handleLogMessages(msg);
-        } else if (msg?.type === "UPDATE") {
-          pushStagedMessage(msg);
-        } else if (msg?.type === "LOG" && msg?.service === "prompt") {
-          handleLogMessages(msg);
-        }
+      if (
+        (msg?.type === "LOG" || msg?.type === "COST") &&
+        msg?.service !== "prompt"
+      ) {
+        msg.message = msg?.log;
+        handleLogMessages(msg);
+      } else if (msg?.type === "UPDATE") {
+        pushStagedMessage(msg);
+      } else if (msg?.type === "LOG" && msg?.service === "prompt") {
+        handleLogMessages(msg);
+      }
 
-        if (msg?.type === "LOG" && msg?.service === "usage") {
-          const remainingTokens =
-            msg?.max_token_count_set - msg?.added_token_count;
-          setLLMTokenUsage(Math.max(remainingTokens, 0));
-        }
-      } catch (err) {
-        setAlertDetails(
-          handleException(err, "Failed to process socket message")
-        );
+      if (msg?.type === "LOG" && msg?.service === "usage") {
+        const remainingTokens =
+          msg?.max_token_count_set - msg?.added_token_count;
+        setLLMTokenUsage(Math.max(remainingTokens, 0));
       }
     },
     [handleLogMessages, pushStagedMessage]
   );
 
+  // Socket message handler, events carry a single message or a batch of them
+  const onMessage = useCallback(
+    (data) => {
+      const messages = Array.isArray(data.data) ? data.data : [data.data];
+      messages.forEach((msg) => {
+        try {
+          processMessage(msg);
+        } catch (err) {
+          setAlertDetails(
+            handleException(err, "Failed to process socket message")
+          );
+        }
+      });
+    },
+    [processMessage]
+  );
+
   // Subscribe/unsubscribe to the socket channel
   useEffect(() => {
     if (!logId) return;
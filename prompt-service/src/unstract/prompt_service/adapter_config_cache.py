@@ -0,0 +1,109 @@
+import copy
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Optional
+
+from unstract.prompt_service.constants import PromptServiceContants as PSKeys
+from unstract.prompt_service.utils.invalidation_listener import InvalidationListener
+from unstract.sdk.adapter import ToolAdapter
+from unstract.sdk.helper import SdkHelper
+from unstract.sdk.tool.base import BaseTool
+
+from unstract.core.constants import AdapterInstanceEvent
+
+
+class AdapterConfigCache:
+    """Decrypted adapter configs fetched from the platform service.
+
+    Configs are cached per platform key, which scopes them to an
+    organization, for `ttl` seconds. The backend publishes the ids of
+    updated or deleted adapter instances, whose configs are dropped as
+    soon as the message arrives. Everything is dropped whenever the
+    subscription is lost, as invalidations could have been missed.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._configs: dict[tuple[str, str], tuple[float, dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, configs fetched across one are
+        # not cached as they could be stale already
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._listener = InvalidationListener(
+            channel=AdapterInstanceEvent.INVALIDATION_CHANNEL,
+            on_message=self.invalidate,
+            on_reset=self.clear,
+        )
+
+    def get(
+        self,
+        platform_key: str,
+        adapter_instance_id: str,
+        fetch: Callable[[], dict[str, Any]],
+    ) -> dict[str, Any]:
+        """Config of an adapter instance, fetched with `fetch` if not cached.
+
+        Returns a copy, adapters are free to modify it.
+        """
+        key = (platform_key, adapter_instance_id)
+        self._listener.ensure_started()
+        with self._lock:
+            entry = self._configs.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._hits += 1
+                return copy.deepcopy(entry[1])
+            self._misses += 1
+            generation = self._generation
+        config = fetch()
+        with self._lock:
+            if generation == self._generation:
+                self._configs[key] = (time.monotonic() + self.ttl, config)
+        return copy.deepcopy(config)
+
+    def invalidate(self, adapter_instance_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            for key in [key for key in self._configs if key[1] == adapter_instance_id]:
+                del self._configs[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._configs.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._configs),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+                "invalidations": self._invalidations,
+            }
+
+
+def enable_adapter_config_cache(cache: AdapterConfigCache) -> None:
+    """Serve the adapter configs the SDK fetches from `cache`.
+
+    Public adapters are configured through envs and are not cached.
+    """
+    get_adapter_config = ToolAdapter.get_adapter_config
+
+    def get_cached_adapter_config(
+        tool: BaseTool, adapter_instance_id: str
+    ) -> Optional[dict[str, Any]]:
+        if SdkHelper.is_public_adapter(adapter_id=adapter_instance_id):
+            return get_adapter_config(tool, adapter_instance_id)
+        return cache.get(
+            platform_key=tool.get_env_or_die(PSKeys.PLATFORM_SERVICE_API_KEY),
+            adapter_instance_id=adapter_instance_id,
+            fetch=lambda: get_adapter_config(tool, adapter_instance_id),
+        )
+
+    ToolAdapter.get_adapter_config = staticmethod(get_cached_adapter_config)
@@ -0,0 +1,126 @@
+import copy
+import threading
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
+
+from flask import current_app as app
+from llama_index.core import VectorStoreIndex
+from unstract.prompt_service.prompt_ide_base_tool import PromptServiceBaseTool
+from unstract.sdk.embedding import Embedding
+from unstract.sdk.llm import LLM
+from unstract.sdk.vector_db import VectorDB
+
+
+class AdapterRegistry:
+    """Adapters of a request, shared by the prompts using them.
+
+    Constructing an adapter fetches its config from the platform service and
+    initialises its client, which is done once per adapter instance instead
+    of once per prompt. Adapters are keyed by their usage kwargs as well,
+    so usage is attributed as if constructed per prompt. Prompts run
+    concurrently can share the registry.
+    """
+
+    def __init__(self, tool: PromptServiceBaseTool) -> None:
+        self.tool = tool
+        self._adapters: dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+        # Adapters are constructed under their key's lock only, so
+        # different adapters can be constructed concurrently
+        self._key_locks: defaultdict[tuple, threading.Lock] = defaultdict(
+            threading.Lock
+        )
+
+    def _get(self, key: tuple, create: Callable[[], Any]) -> Any:
+        with self._lock:
+            key_lock = self._key_locks[key]
+        with key_lock:
+            if key not in self._adapters:
+                self._adapters[key] = create()
+            return self._adapters[key]
+
+    @staticmethod
+    def _usage_key(usage_kwargs: dict[str, Any]) -> tuple:
+        return tuple(sorted(usage_kwargs.items()))
+
+    def get_llm(
+        self,
+        adapter_instance_id: str,
+        usage_kwargs: dict[str, Any],
+        capture_metrics: bool = False,
+    ) -> LLM:
+        """LLM of an adapter instance.
+
+        Returns a copy sharing the initialised LLM, with its own metrics.
+        """
+        key = (
+            LLM,
+            adapter_instance_id,
+            self._usage_key(usage_kwargs),
+            capture_metrics,
+        )
+        llm: LLM = self._get(
+            key,
+            lambda: LLM(
+                tool=self.tool,
+                adapter_instance_id=adapter_instance_id,
+                usage_kwargs=usage_kwargs.copy(),
+                capture_metrics=capture_metrics,
+            ),
+        )
+        prompt_llm = copy.copy(llm)
+        # Metrics are captured per prompt
+        prompt_llm._metrics = {}
+        return prompt_llm
+
+    def get_embedding(
+        self, adapter_instance_id: str, usage_kwargs: dict[str, Any]
+    ) -> Embedding:
+        key = (Embedding, adapter_instance_id, self._usage_key(usage_kwargs))
+        return self._get(
+            key,
+            lambda: Embedding(
+                tool=self.tool,
+                adapter_instance_id=adapter_instance_id,
+                usage_kwargs=usage_kwargs.copy(),
+            ),
+        )
+
+    def get_vector_db(
+        self,
+        adapter_instance_id: str,
+        embedding_instance_id: str,
+        usage_kwargs: dict[str, Any],
+    ) -> VectorDB:
+        """Vector DB of an adapter instance, using the embedding of
+        `embedding_instance_id`."""
+        key = (
+            VectorDB,
+            adapter_instance_id,
+            embedding_instance_id,
+            self._usage_key(usage_kwargs),
+        )
+        return self._get(
+            key,
+            lambda: VectorDB(
+                tool=self.tool,
+                adapter_instance_id=adapter_instance_id,
+                embedding=self.get_embedding(embedding_instance_id, usage_kwargs),
+            ),
+        )
+
+    def get_vector_store_index(self, vector_db: VectorDB) -> VectorStoreIndex:
+        return self._get(
+            (VectorStoreIndex, id(vector_db)), vector_db.get_vector_store_index
+        )
+
+    def close(self) -> None:
+        """Close the vector DBs of the request."""
+        for key, adapter in self._adapters.items():
+            if key[0] is not VectorDB:
+                continue
+            try:
+                adapter.close()
+            except Exception as e:
+                app.logger.warning(f"Error closing vector DB {key[1]}: {e}")
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from unstract.prompt_service.env_manager import EnvLoader
+from unstract.prompt_service.utils.redis_client import get_redis_client
+from unstract.sdk.llm import LLM
+
+logger = logging.getLogger(__name__)
+
+# Attributes of LLM clients which change their completions
+MODEL_PARAMS = (
+    "model",
+    "engine",
+    "deployment_name",
+    "temperature",
+    "max_tokens",
+    "top_p",
+    "seed",
+    "additional_kwargs",
+)
+
+
+class CompletionCache(ABC):
+    """Completions of LLMs, reused for identical requests.
+
+    Entries are keyed by the platform key of the organization, the LLM,
+    its parameters and the rendered prompt, which embeds the context, so
+    completions are never shared across organizations. Least recently used
+    entries are evicted once the cache is full. Errors of the cache are
+    logged and treated as misses, they never fail a prompt.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def get_key(llm: LLM, prompt: str, scope: str, **params: Any) -> str:
+        """Key of a completion of `prompt`.
+
+        Args:
+            llm (LLM): LLM completing the prompt
+            prompt (str): Rendered prompt
+            scope (str): Platform key of the organization the completion
+                belongs to
+            params (Any): Other arguments changing the completion
+        """
+        llm_instance = llm.get_llm()
+        model_params = {
+            name: getattr(llm_instance, name)
+            for name in MODEL_PARAMS
+            if getattr(llm_instance, name, None) is not None
+        }
+        data = json.dumps(
+            [scope, llm.get_class_name(), model_params, prompt, params],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        try:
+            completion = self._get(key)
+        except Exception as e:
+            logger.warning(f"Error reading cached completion: {e}")
+            completion = None
+        with self._lock:
+            if completion is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return completion
+
+    def set(self, key: str, completion: dict[str, Any]) -> None:
+        try:
+            self._set(key, completion)
+        except Exception as e:
+            logger.warning(f"Error caching completion: {e}")
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+            }
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def _set(self, key: str, completion: dict[str, Any]) -> None:
+        pass
+
+
+class RedisCompletionCache(CompletionCache):
+    """Completions in Redis, shared by all instances of the service.
+
+    Access times are tracked in a sorted set to evict the least recently
+    used entries beyond `max_entries`. Members of entries expired by their
+    TTL are pruned from it.
+    """
+
+    KEY_PREFIX = "completion_cache"
+    INDEX_KEY = f"{KEY_PREFIX}:index"
+
+    def __init__(self, max_entries: int, ttl: int) -> None:
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.redis = get_redis_client()
+
+    def _get(self, key: str) -> Optional[dict[str, Any]]:
+        pipeline = self.redis.pipeline()
+        pipeline.get(f"{self.KEY_PREFIX}:{key}")
+        pipeline.zadd(self.INDEX_KEY, {key: time.time()}, xx=True)
+        data, _ = pipeline.execute()
+        return json.loads(data) if data else None
+
+    def _set(self, key: str, completion: dict[str, Any]) -> None:
+        pipeline = self.redis.pipeline()
+        pipeline.set(f"{self.KEY_PREFIX}:{key}", json.dumps(completion), ex=self.ttl)
+        now = time.time()
+        pipeline.zadd(self.INDEX_KEY, {key: now})
+        # Entries not accessed within their TTL expired
+        pipeline.zremrangebyscore(self.INDEX_KEY, "-inf", now - self.ttl)
+        pipeline.zcard(self.INDEX_KEY)
+        size = pipeline.execute()[-1]
+        if size <= self.max_entries:
+            return
+        evicted = self.redis.zpopmin(self.INDEX_KEY, size - self.max_entries)
+        if evicted:
+            self.redis.delete(
+                *(f"{self.KEY_PREFIX}:{member.decode()}" for member, _ in evicted)
+            )
+
+
+class DiskCompletionCache(CompletionCache):
+    """Completions in files of a local directory, one per entry.
+
+    Reads touch the file, the least recently modified files are evicted
+    once the directory holds more than `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        super().__init__()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _get(self, key: str) -> Optional[dict[str, Any]]:
+        path = self._get_path(key)
+        try:
+            with open(path, encoding="utf-8") as file:
+                completion: dict[str, Any] = json.load(file)
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return completion
+
+    def _set(self, key: str, completion: dict[str, Any]) -> None:
+        path = self._get_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(completion, file)
+        os.replace(temp_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def create_completion_cache() -> Optional[CompletionCache]:
+    """Completion cache configured through the `COMPLETION_CACHE_*` envs."""
+    backend = EnvLoader.get_env_or_die("COMPLETION_CACHE_BACKEND", "none").lower()
+    if backend == "redis":
+        return RedisCompletionCache(
+            max_entries=int(
+                EnvLoader.get_env_or_die("COMPLETION_CACHE_MAX_ENTRIES", "10000")
+            ),
+            ttl=int(EnvLoader.get_env_or_die("COMPLETION_CACHE_TTL", "604800")),
+        )
+    if backend == "disk":
+        return DiskCompletionCache(
+            directory=EnvLoader.get_env_or_die(
+                "COMPLETION_CACHE_DIR", "/tmp/prompt-service/completion-cache"
+            ),
+            max_bytes=int(EnvLoader.get_env_or_die("COMPLETION_CACHE_MAX_MB", "512"))
+            * 1024
+            * 1024,
+        )
+    return None
+
+
+completion_cache = create_completion_cache()
@@ -79,6 +79,8 @@ class PromptServiceContants:
     LINE_ITEM = "line-item"
     LINE_NUMBERS = "line_numbers"
     WHISPER_HASH = "whisper_hash"
+    ENABLE_COMPLETION_CACHE = "enable-completion-cache"
+    COMPLETION_CACHE_HIT = "completion_cache_hit"
 
 
 class RunLevel(Enum):
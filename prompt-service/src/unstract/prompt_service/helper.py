@@ -5,7 +5,9 @@ from pathlib import Path
 from typing import Any, Optional
 
 from dotenv import load_dotenv
-from flask import Flask, current_app
+from flask import Flask, current_app, has_request_context, request
+from unstract.prompt_service.authentication_middleware import AuthenticationMiddleware
+from unstract.prompt_service.completion_cache import completion_cache
 from unstract.prompt_service.config import db
 from unstract.prompt_service.constants import (
     DBTableV2,
@@ -252,6 +254,7 @@ def construct_and_run_prompt(
         enable_highlight=enable_highlight,
         file_path=file_path,
         execution_source=execution_source,
+        enable_cache=output.get(PSKeys.ENABLE_COMPLETION_CACHE, False),
     )
 
 
@@ -294,9 +297,40 @@ def run_completion(
     enable_highlight: bool = False,
     file_path: str = "",
     execution_source: Optional[str] = None,
+    enable_cache: bool = False,
 ) -> str:
+    """Completes the prompt with the LLM.
+
+    With `enable_cache`, the completion is reused from the completion cache
+    for an identical prompt, LLM and highlighted file of the same
+    organization, if one is set up.
+    """
     logger: Logger = current_app.logger
     try:
+        cache_key = None
+        cached_completion = None
+        # Completions are only shared within the organization of the request
+        platform_key = (
+            AuthenticationMiddleware.get_token_from_auth_header(request)
+            if has_request_context()
+            else None
+        )
+        if enable_cache and completion_cache and platform_key:
+            cache_key = completion_cache.get_key(
+                llm=llm,
+                prompt=prompt,
+                scope=platform_key,
+                prompt_type=prompt_type,
+                highlighted_file=file_path if enable_highlight else None,
+            )
+            cached_completion = completion_cache.get(cache_key)
+        if cached_completion:
+            return _use_completion(
+                completion=cached_completion,
+                metadata=metadata,
+                prompt_key=prompt_key,
+                cache_hit=True,
+            )
         highlight_data_plugin: dict[str, Any] = plugins.get(
             PSKeys.HIGHLIGHT_DATA_PLUGIN, {}
         )
@@ -319,25 +353,26 @@ def run_completion(
                 fs_instance=fs_instance,
             ).run
 
-        completion = llm.complete(
+        llm_completion = llm.complete(
             prompt=prompt,
             process_text=highlight_data,
             extract_json=prompt_type.lower() != PSKeys.TEXT,
         )
-        answer: str = completion[PSKeys.RESPONSE].text
-        highlight_data = completion.get(PSKeys.HIGHLIGHT_DATA, [])
-        confidence_data = completion.get(PSKeys.CONFIDENCE_DATA)
-        line_numbers = completion.get(PSKeys.LINE_NUMBERS, [])
-        whisper_hash = completion.get(PSKeys.WHISPER_HASH, "")
-        if metadata is not None and prompt_key:
-            metadata.setdefault(PSKeys.HIGHLIGHT_DATA, {})[prompt_key] = highlight_data
-            metadata.setdefault(PSKeys.LINE_NUMBERS, {})[prompt_key] = line_numbers
-            metadata[PSKeys.WHISPER_HASH] = whisper_hash
-            if confidence_data:
-                metadata.setdefault(PSKeys.CONFIDENCE_DATA, {})[
-                    prompt_key
-                ] = confidence_data
-        return answer
+        completion = {
+            PSKeys.RESPONSE: llm_completion[PSKeys.RESPONSE].text,
+            PSKeys.HIGHLIGHT_DATA: llm_completion.get(PSKeys.HIGHLIGHT_DATA, []),
+            PSKeys.CONFIDENCE_DATA: llm_completion.get(PSKeys.CONFIDENCE_DATA),
+            PSKeys.LINE_NUMBERS: llm_completion.get(PSKeys.LINE_NUMBERS, []),
+            PSKeys.WHISPER_HASH: llm_completion.get(PSKeys.WHISPER_HASH, ""),
+        }
+        if cache_key:
+            completion_cache.set(cache_key, completion)
+        return _use_completion(
+            completion=completion,
+            metadata=metadata,
+            prompt_key=prompt_key,
+            cache_hit=False if cache_key else None,
+        )
     # TODO: Catch and handle specific exception here
     except SdkRateLimitError as e:
         raise RateLimitError(f"Rate limit error. {str(e)}") from e
@@ -347,6 +382,36 @@ def run_completion(
         raise APIError(str(e)) from e
 
 
+def _use_completion(
+    completion: dict[str, Any],
+    metadata: Optional[dict[str, Any]],
+    prompt_key: Optional[str],
+    cache_hit: Optional[bool],
+) -> str:
+    """Adds the details of a completion to the metadata of the prompt.
+
+    Returns:
+        str: Answer of the completion
+    """
+    if metadata is not None and prompt_key:
+        metadata.setdefault(PSKeys.HIGHLIGHT_DATA, {})[prompt_key] = completion[
+            PSKeys.HIGHLIGHT_DATA
+        ]
+        metadata.setdefault(PSKeys.LINE_NUMBERS, {})[prompt_key] = completion[
+            PSKeys.LINE_NUMBERS
+        ]
+        metadata[PSKeys.WHISPER_HASH] = completion[PSKeys.WHISPER_HASH]
+        if completion[PSKeys.CONFIDENCE_DATA]:
+            metadata.setdefault(PSKeys.CONFIDENCE_DATA, {})[prompt_key] = completion[
+                PSKeys.CONFIDENCE_DATA
+            ]
+        if cache_hit is not None:
+            # Lets users know the answer was reused
+            metadata.setdefault(PSKeys.COMPLETION_CACHE_HIT, {})[prompt_key] = cache_hit
+    answer: str = completion[PSKeys.RESPONSE]
+    return answer
+
+
 def extract_table(
     output: dict[str, Any],
     plugins: dict[str, dict[str, Any]],
@@ -1,14 +1,24 @@
 import time
 import traceback
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from json import JSONDecodeError
 from typing import Any, Optional
 
 from flask import json, jsonify, request
+from llama_index.core import VectorStoreIndex
 from llama_index.core.vector_stores import ExactMatchFilter, MetadataFilters
+from unstract.prompt_service.adapter_config_cache import (
+    AdapterConfigCache,
+    enable_adapter_config_cache,
+)
+from unstract.prompt_service.adapter_registry import AdapterRegistry
 from unstract.prompt_service.authentication_middleware import AuthenticationMiddleware
+from unstract.prompt_service.completion_cache import completion_cache
 from unstract.prompt_service.config import create_app, db
 from unstract.prompt_service.constants import PromptServiceContants as PSKeys
 from unstract.prompt_service.constants import RunLevel
+from unstract.prompt_service.env_manager import EnvLoader
 from unstract.prompt_service.exceptions import APIError, ErrorResponse, NoPayloadError
 from unstract.prompt_service.helper import (
     construct_and_run_prompt,
@@ -22,19 +32,32 @@ from unstract.prompt_service.helper import (
     run_completion,
 )
 from unstract.prompt_service.prompt_ide_base_tool import PromptServiceBaseTool
+from unstract.prompt_service.prompt_scheduler import PromptScheduler
+from unstract.prompt_service.retrieval_cache import RetrievalCache, retrieval_cache
+from unstract.prompt_service.type_coercion import local_type_coercion
 from unstract.prompt_service.utils.log import publish_log
 from unstract.prompt_service.variable_extractor.base import VariableExtractor
 from unstract.sdk.adapters.llm.no_op.src.no_op_custom_llm import NoOpCustomLLM
 from unstract.sdk.constants import LogLevel
-from unstract.sdk.embedding import Embedding
 from unstract.sdk.exceptions import SdkError
 from unstract.sdk.index import Index
 from unstract.sdk.llm import LLM
-from unstract.sdk.vector_db import VectorDB
 from werkzeug.exceptions import HTTPException
 
 USE_UNSTRACT_PROMPT = True
 MAX_RETRIES = 3
+# Prompts using the same LLM to run at once, 1 runs them one after another
+MAX_PARALLEL_PROMPTS_PER_LLM = int(
+    EnvLoader.get_env_or_die("MAX_PARALLEL_PROMPTS_PER_LLM", "1")
+)
+# Vector DB queries of the subquestions of a prompt to run at once
+MAX_PARALLEL_SUBQUESTION_RETRIEVALS = int(
+    EnvLoader.get_env_or_die("MAX_PARALLEL_SUBQUESTION_RETRIEVALS", "10")
+)
+# Seconds to cache adapter configs for, 0 disables caching
+ADAPTER_CONFIG_CACHE_TTL = int(
+    EnvLoader.get_env_or_die("ADAPTER_CONFIG_CACHE_TTL", "60")
+)
 
 NO_CONTEXT_ERROR = (
     "Couldn't fetch context from vector DB. "
@@ -46,6 +69,9 @@ NO_CONTEXT_ERROR = (
 app = create_app()
 # Load plugins
 plugin_loader(app)
+adapter_config_cache = AdapterConfigCache(ttl=ADAPTER_CONFIG_CACHE_TTL)
+if ADAPTER_CONFIG_CACHE_TTL > 0:
+    enable_adapter_config_cache(adapter_config_cache)
 
 
 @app.before_request
@@ -89,6 +115,17 @@ def health_check() -> str:
     return "OK"
 
 
+@app.route("/cache-stats", methods=["GET"], endpoint="cache_stats")
+def cache_stats() -> Any:
+    stats = {"adapter_config": adapter_config_cache.get_stats()}
+    if completion_cache:
+        stats["completion"] = completion_cache.get_stats()
+    if retrieval_cache:
+        stats["retrieval"] = retrieval_cache.get_stats()
+    stats["local_type_coercion"] = local_type_coercion.get_stats()
+    return jsonify(stats)
+
+
 @app.route(
     "/answer-prompt",
     endpoint="answer_prompt",
@@ -128,6 +165,9 @@ def prompt_processor() -> Any:
         RunLevel.RUN,
         f"Preparing to execute {len(prompts)} prompt(s)",
     )
+    # Prompts sharing adapter instances share their clients
+    util = PromptServiceBaseTool(platform_key=platform_key)
+    adapters = AdapterRegistry(tool=util)
     # TODO: Rename "output" to "prompt"
     for output in prompts:  # type:ignore
         variable_names.append(output[PSKeys.NAME])
@@ -135,11 +175,23 @@ def prompt_processor() -> Any:
             PSKeys.REQUIRED, None
         )
 
-    for output in prompts:  # type:ignore
+    def run_prompt(
+        output: dict[str, Any],
+        structured_output: dict[str, Any],
+        metadata: dict[str, Any],
+        metrics: dict[str, Any],
+    ) -> Optional[Any]:
+        """Runs a prompt, adding its results to the passed dicts.
+
+        Returns:
+            Optional[Any]: Response to end the request with, if any
+        """
         prompt_name = output[PSKeys.NAME]
         prompt_text = output[PSKeys.PROMPT]
         chunk_size = output[PSKeys.CHUNK_SIZE]
-        util = PromptServiceBaseTool(platform_key=platform_key)
+        enable_completion_cache = output.get(PSKeys.ENABLE_COMPLETION_CACHE, False)
+        # Whether the answer was converted to its type without the LLM
+        coerced_locally: Optional[bool] = None
         index = Index(tool=util, run_id=run_id, capture_metrics=True)
         if VariableExtractor.is_variables_present(prompt_text=prompt_text):
             prompt_text = VariableExtractor.replace_variables_in_prompt(
@@ -194,8 +246,7 @@ def prompt_processor() -> Any:
         try:
             usage_kwargs = {"run_id": run_id}
             adapter_instance_id = output[PSKeys.LLM]
-            llm = LLM(
-                tool=util,
+            llm = adapters.get_llm(
                 adapter_instance_id=adapter_instance_id,
                 usage_kwargs={
                     **usage_kwargs,
@@ -204,16 +255,10 @@ def prompt_processor() -> Any:
                 capture_metrics=True,
             )
 
-            embedding = Embedding(
-                tool=util,
-                adapter_instance_id=output[PSKeys.EMBEDDING],
-                usage_kwargs=usage_kwargs.copy(),
-            )
-
-            vector_db = VectorDB(
-                tool=util,
+            vector_db = adapters.get_vector_db(
                 adapter_instance_id=output[PSKeys.VECTOR_DB],
-                embedding=embedding,
+                embedding_instance_id=output[PSKeys.EMBEDDING],
+                usage_kwargs=usage_kwargs,
             )
         except SdkError as e:
             msg = f"Couldn't fetch adapter. {e}"
@@ -278,7 +323,7 @@ def prompt_processor() -> Any:
                     metadata=metadata,
                     execution_source=execution_source,
                 )
-                continue
+                return None
             except APIError as e:
                 app.logger.error(
                     "Failed to extract line-item for the prompt %s: %s",
@@ -352,7 +397,7 @@ def prompt_processor() -> Any:
                 retrieval_strategy = output.get(PSKeys.RETRIEVAL_STRATEGY)
 
                 if retrieval_strategy in {PSKeys.SIMPLE, PSKeys.SUBQUESTION}:
-                    vector_index = vector_db.get_vector_store_index()
+                    vector_index = adapters.get_vector_store_index(vector_db)
                     answer, context = run_retrieval(
                         tool_settings=tool_settings,
                         output=output,
@@ -396,7 +441,17 @@ def prompt_processor() -> Any:
                 f"Processing prompt type: {output[PSKeys.TYPE]}",
             )
 
-            if output[PSKeys.TYPE] == PSKeys.NUMBER:
+            # Clean answers are converted without asking the LLM to reformat
+            coerced_answer = None
+            if (
+                local_type_coercion.supports(output[PSKeys.TYPE])
+                and answer.lower() != "na"
+            ):
+                coerced_answer = local_type_coercion.coerce(answer, output[PSKeys.TYPE])
+                coerced_locally = coerced_answer is not None
+            if coerced_answer is not None:
+                structured_output[output[PSKeys.NAME]] = coerced_answer
+            elif output[PSKeys.TYPE] == PSKeys.NUMBER:
                 if answer.lower() == "na":
                     structured_output[output[PSKeys.NAME]] = None
                 else:
@@ -414,6 +469,7 @@ def prompt_processor() -> Any:
                     answer = run_completion(
                         llm=llm,
                         prompt=prompt,
+                        enable_cache=enable_completion_cache,
                     )
                     try:
                         structured_output[output[PSKeys.NAME]] = float(answer)
@@ -444,6 +500,7 @@ def prompt_processor() -> Any:
                     answer = run_completion(
                         llm=llm,
                         prompt=prompt,
+                        enable_cache=enable_completion_cache,
                     )
                     structured_output[output[PSKeys.NAME]] = answer
             elif output[PSKeys.TYPE] == PSKeys.DATE:
@@ -457,6 +514,7 @@ def prompt_processor() -> Any:
                     answer = run_completion(
                         llm=llm,
                         prompt=prompt,
+                        enable_cache=enable_completion_cache,
                     )
                     structured_output[output[PSKeys.NAME]] = answer
 
@@ -471,6 +529,7 @@ def prompt_processor() -> Any:
                     answer = run_completion(
                         llm=llm,
                         prompt=prompt,
+                        enable_cache=enable_completion_cache,
                     )
                     if answer.lower() == "yes":
                         structured_output[output[PSKeys.NAME]] = True
@@ -493,6 +552,7 @@ def prompt_processor() -> Any:
                                 llm=llm,
                                 prompt=prompt,
                                 prompt_type=PSKeys.JSON,
+                                enable_cache=enable_completion_cache,
                             )
                             structured_output[output[PSKeys.NAME]] = json.loads(answer)
                         except JSONDecodeError as e:
@@ -542,8 +602,7 @@ def prompt_processor() -> Any:
                             RunLevel.CHALLENGE,
                             "Challenging response",
                         )
-                        challenge_llm = LLM(
-                            tool=util,
+                        challenge_llm = adapters.get_llm(
                             adapter_instance_id=tool_settings[PSKeys.CHALLENGE_LLM],
                             usage_kwargs={
                                 **usage_kwargs,
@@ -658,14 +717,53 @@ def prompt_processor() -> Any:
                 if enable_challenge
                 else {}
             )
+            completion_cache_metrics = (
+                {
+                    PSKeys.COMPLETION_CACHE_HIT: metadata.get(
+                        PSKeys.COMPLETION_CACHE_HIT, {}
+                    ).get(prompt_name, False)
+                }
+                if enable_completion_cache
+                else {}
+            )
+            coercion_metrics = (
+                {"local_type_coercion": coerced_locally}
+                if coerced_locally is not None
+                else {}
+            )
             metrics.setdefault(prompt_name, {}).update(
                 {
                     "context_retrieval": index.get_metrics(),
                     f"{llm.get_usage_reason()}_llm": llm.get_metrics(),
                     **challenge_metrics,
+                    **completion_cache_metrics,
+                    **coercion_metrics,
                 }
             )
-            vector_db.close()
+        return None
+
+    # Tables and records end the run, keep them to running one at a time
+    run_concurrently = MAX_PARALLEL_PROMPTS_PER_LLM > 1 and not any(
+        output[PSKeys.TYPE] in {PSKeys.TABLE, PSKeys.RECORD} for output in prompts
+    )
+    try:
+        if run_concurrently:
+            response = run_prompts_concurrently(
+                prompts=prompts,
+                run_prompt=run_prompt,
+                structured_output=structured_output,
+                metadata=metadata,
+                metrics=metrics,
+            )
+            if response is not None:
+                return response
+        else:
+            for output in prompts:  # type:ignore
+                response = run_prompt(output, structured_output, metadata, metrics)
+                if response is not None:
+                    return response
+    finally:
+        adapters.close()
     publish_log(
         log_events_id,
         {"tool_id": tool_id, "doc_name": doc_name},
@@ -705,6 +803,83 @@ def prompt_processor() -> Any:
     return response
 
 
+def run_prompts_concurrently(
+    prompts: list[dict[str, Any]],
+    run_prompt: Callable[..., Optional[Any]],
+    structured_output: dict[str, Any],
+    metadata: dict[str, Any],
+    metrics: dict[str, Any],
+) -> Optional[Any]:
+    """Runs the prompts concurrently, each after the prompts it uses the
+    output of.
+
+    A prompt sees the output of the prompts it references only, which is
+    all it reads when run after every earlier prompt. Outputs, metadata
+    and metrics are merged in prompt order, so the results are the same as
+    running them one after another.
+
+    Returns:
+        Optional[Any]: Response to end the request with, if any
+    """
+    prompt_names = [output[PSKeys.NAME] for output in prompts]
+    dependencies = [
+        {
+            prompt_names.index(name)
+            for name in VariableExtractor.get_referenced_prompts(
+                prompt_text=output[PSKeys.PROMPT], prompt_names=prompt_names[:index]
+            )
+        }
+        for index, output in enumerate(prompts)
+    ]
+    # Outputs set by each prompt, read by the prompts depending on it
+    prompt_outputs: dict[int, dict[str, Any]] = {}
+
+    def run_scheduled_prompt(index: int) -> tuple[Optional[Any], dict, dict]:
+        inputs: dict[str, Any] = {}
+        for dependency in sorted(dependencies[index]):
+            inputs.update(prompt_outputs[dependency])
+        prompt_output = dict(inputs)
+        prompt_metadata = {**metadata, PSKeys.CONTEXT: {}}
+        prompt_metrics: dict[str, Any] = {}
+        with app.app_context():
+            try:
+                response = run_prompt(
+                    prompts[index], prompt_output, prompt_metadata, prompt_metrics
+                )
+            finally:
+                # Connections are per thread
+                if not db.is_closed():
+                    db.close()
+        prompt_outputs[index] = {
+            key: value
+            for key, value in prompt_output.items()
+            if key not in inputs or value is not inputs[key]
+        }
+        return response, prompt_metadata, prompt_metrics
+
+    scheduler = PromptScheduler(
+        dependencies=dependencies,
+        groups=[output[PSKeys.LLM] for output in prompts],
+        max_parallel_per_group=MAX_PARALLEL_PROMPTS_PER_LLM,
+    )
+    results = scheduler.run(
+        run_prompt=run_scheduled_prompt,
+        ends_run=lambda result: result[0] is not None,
+    )
+    for index, (response, prompt_metadata, prompt_metrics) in enumerate(results):
+        if response is not None:
+            return response
+        structured_output.update(prompt_outputs[index])
+        for key, value in prompt_metadata.items():
+            if isinstance(value, dict) and isinstance(metadata.get(key), dict):
+                metadata[key].update(value)
+            else:
+                metadata[key] = value
+        for prompt_name, prompt_metric in prompt_metrics.items():
+            metrics.setdefault(prompt_name, {}).update(prompt_metric)
+    return None
+
+
 def fetch_context_from_vector_db(
     index: Index,
     output: dict[str, Any],
@@ -734,12 +909,7 @@ def fetch_context_from_vector_db(
     """
     context: set[str] = set()
     try:
-        retrieved_context = index.query_index(
-            embedding_instance_id=output[PSKeys.EMBEDDING],
-            vector_db_instance_id=output[PSKeys.VECTOR_DB],
-            doc_id=doc_id,
-            usage_kwargs=usage_kwargs,
-        )
+        retrieved_context = _query_index(index, output, doc_id, usage_kwargs)
 
         if retrieved_context:
             context.add(retrieved_context)
@@ -757,12 +927,7 @@ def fetch_context_from_vector_db(
         else:
             # Handle lag in vector DB write (e.g., Pinecone issue)
             time.sleep(2)
-            retrieved_context = index.query_index(
-                embedding_instance_id=output[PSKeys.EMBEDDING],
-                vector_db_instance_id=output[PSKeys.VECTOR_DB],
-                doc_id=doc_id,
-                usage_kwargs=usage_kwargs,
-            )
+            retrieved_context = _query_index(index, output, doc_id, usage_kwargs)
 
             if retrieved_context is None:
                 msg = NO_CONTEXT_ERROR
@@ -801,6 +966,34 @@ def fetch_context_from_vector_db(
     return context
 
 
+def _query_index(
+    index: Index, output: dict[str, Any], doc_id: str, usage_kwargs: dict[str, Any]
+) -> Optional[str]:
+    """Whole text of the document as indexed, served from the retrieval
+    cache if enabled."""
+
+    def query() -> set[str]:
+        context = index.query_index(
+            embedding_instance_id=output[PSKeys.EMBEDDING],
+            vector_db_instance_id=output[PSKeys.VECTOR_DB],
+            doc_id=doc_id,
+            usage_kwargs=usage_kwargs,
+        )
+        return {context} if context else set()
+
+    if retrieval_cache:
+        key = RetrievalCache.get_key(
+            embedding_instance_id=output[PSKeys.EMBEDDING],
+            vector_db_instance_id=output[PSKeys.VECTOR_DB],
+            query="",
+            top_k=None,
+        )
+        context = retrieval_cache.get(doc_id=doc_id, key=key, fetch=query)
+    else:
+        context = query()
+    return next(iter(context), None)
+
+
 def run_retrieval(  # type:ignore
     tool_settings: dict[str, Any],
     output: dict[str, Any],
@@ -812,6 +1005,8 @@ def run_retrieval(  # type:ignore
     execution_source: Optional[str] = None,
 ) -> tuple[str, set[str]]:
     context: set[str] = set()
+    # Order of the context in the prompt, if it has to be kept
+    ordered_context: Optional[list[str]] = None
     prompt = output[PSKeys.PROMPTX]
     if retrieval_type == PSKeys.SUBQUESTION:
         subq_prompt: str = (
@@ -843,12 +1038,13 @@ def run_retrieval(  # type:ignore
             llm=llm,
             prompt=subq_prompt,
         )
-        subquestion_list = subquestions.split(",")
-        for each_subq in subquestion_list:
-            retrieved_context = _retrieve_context(
-                output, doc_id, vector_index, each_subq
-            )
-            context.update(retrieved_context)
+        subquestion_list = [
+            each_subq for each_subq in subquestions.split(",") if each_subq.strip()
+        ]
+        ordered_context = _retrieve_subquestion_context(
+            output, doc_id, vector_index, subquestion_list
+        )
+        context = set(ordered_context)
 
     if retrieval_type == PSKeys.SIMPLE:
 
@@ -869,7 +1065,7 @@ def run_retrieval(  # type:ignore
         tool_settings=tool_settings,
         output=output,
         llm=llm,
-        context="\n".join(context),
+        context="\n".join(ordered_context if ordered_context is not None else context),
         prompt="promptx",
         metadata=metadata,
         execution_source=execution_source,
@@ -879,6 +1075,90 @@ def run_retrieval(  # type:ignore
 
 
 def _retrieve_context(output, doc_id, vector_index, answer) -> set[str]:
+    if not retrieval_cache:
+        return _query_vector_index(output, doc_id, vector_index, answer)
+    key = RetrievalCache.get_key(
+        embedding_instance_id=output[PSKeys.EMBEDDING],
+        vector_db_instance_id=output[PSKeys.VECTOR_DB],
+        query=answer,
+        top_k=output[PSKeys.SIMILARITY_TOP_K],
+    )
+    return retrieval_cache.get(
+        doc_id=doc_id,
+        key=key,
+        fetch=lambda: _query_vector_index(output, doc_id, vector_index, answer),
+    )
+
+
+def _retrieve_subquestion_context(
+    output: dict[str, Any],
+    doc_id: str,
+    vector_index: VectorStoreIndex,
+    subquestions: list[str],
+) -> list[str]:
+    """Context retrieved for all subquestions of a prompt.
+
+    Subquestions not served from the retrieval cache are retrieved
+    concurrently. Their embeddings aren't batched, each retriever embeds
+    its subquestion as a query in a request of its own. Chunks are merged
+    in the order of the subquestions, so the same subquestions always give
+    the same context.
+
+    Returns:
+        list[str]: Distinct chunks retrieved
+    """
+    contexts: dict[str, set[str]] = {}
+    # Subquestions to retrieve, with their cache key and generation
+    pending: dict[str, Optional[tuple[str, int]]] = {}
+    for subquestion in dict.fromkeys(subquestions):
+        cache_entry = None
+        if retrieval_cache:
+            key = RetrievalCache.get_key(
+                embedding_instance_id=output[PSKeys.EMBEDDING],
+                vector_db_instance_id=output[PSKeys.VECTOR_DB],
+                query=subquestion,
+                top_k=output[PSKeys.SIMILARITY_TOP_K],
+            )
+            cached_context, generation = retrieval_cache.lookup(doc_id=doc_id, key=key)
+            if cached_context is not None:
+                contexts[subquestion] = cached_context
+                continue
+            cache_entry = (key, generation)
+        pending[subquestion] = cache_entry
+
+    if pending:
+        missing = list(pending)
+        # Query embeddings can differ from document ones (e.g. instruction
+        # prefixed models), so each retriever embeds its subquestion
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(len(missing), MAX_PARALLEL_SUBQUESTION_RETRIEVALS))
+        ) as executor:
+            retrieved = executor.map(
+                lambda subquestion: _query_vector_index(
+                    output, doc_id, vector_index, subquestion
+                ),
+                missing,
+            )
+            for subquestion, retrieved_context in zip(missing, retrieved):
+                contexts[subquestion] = retrieved_context
+                cache_entry = pending[subquestion]
+                if retrieval_cache and cache_entry:
+                    key, generation = cache_entry
+                    retrieval_cache.store(
+                        doc_id=doc_id,
+                        key=key,
+                        context=retrieved_context,
+                        generation=generation,
+                    )
+
+    merged: dict[str, None] = {}
+    for subquestion in subquestions:
+        # Chunks of a subquestion come unordered from the retriever
+        merged.update(dict.fromkeys(sorted(contexts[subquestion])))
+    return list(merged)
+
+
+def _query_vector_index(output, doc_id, vector_index, answer) -> set[str]:
     retriever = vector_index.as_retriever(
         similarity_top_k=output[PSKeys.SIMILARITY_TOP_K],
         filters=MetadataFilters(
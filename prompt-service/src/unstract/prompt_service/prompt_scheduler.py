@@ -0,0 +1,99 @@
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Optional
+
+
+class PromptScheduler:
+    """Runs prompts concurrently, each after the prompts it depends on.
+
+    Prompts sharing a group, e.g. an LLM adapter, run at most
+    `max_parallel_per_group` at a time. Results are returned in prompt
+    order. As when running them one after another, the first prompt in
+    order to fail or to end the run decides the outcome and no prompt
+    after it is started.
+    """
+
+    def __init__(
+        self,
+        dependencies: list[set[int]],
+        groups: list[str],
+        max_parallel_per_group: int,
+    ) -> None:
+        """
+        Args:
+            dependencies (list[set[int]]): Indexes of the earlier prompts
+                each prompt depends on
+            groups (list[str]): Group of each prompt
+            max_parallel_per_group (int): Prompts of a group to run at once
+        """
+        self.dependencies = dependencies
+        self.groups = groups
+        self.max_parallel_per_group = max_parallel_per_group
+
+    def run(
+        self,
+        run_prompt: Callable[[int], Any],
+        ends_run: Callable[[Any], bool],
+    ) -> list[Any]:
+        """Run all prompts.
+
+        Args:
+            run_prompt (Callable[[int], Any]): Runs the prompt of an index
+                and returns its result
+            ends_run (Callable[[Any], bool]): Whether a result ends the run,
+                prompts after it are not run
+
+        Returns:
+            list[Any]: Results in prompt order, up to the one ending the run
+
+        Raises:
+            Exception: Error of the first failed prompt
+        """
+        count = len(self.dependencies)
+        results: dict[int, Any] = {}
+        errors: dict[int, Exception] = {}
+        pending = list(range(count))
+        running: dict[Future, int] = {}
+        running_per_group: Counter = Counter()
+        # Index of the first prompt which failed or ended the run
+        stop_at: Optional[int] = None
+        max_workers = max(
+            1, min(count, self.max_parallel_per_group * len(set(self.groups)))
+        )
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="prompt"
+        ) as executor:
+            while True:
+                for index in list(pending):
+                    if stop_at is not None and index > stop_at:
+                        pending.remove(index)
+                        continue
+                    group = self.groups[index]
+                    if running_per_group[group] >= self.max_parallel_per_group:
+                        continue
+                    if not all(dep in results for dep in self.dependencies[index]):
+                        continue
+                    pending.remove(index)
+                    running_per_group[group] += 1
+                    running[executor.submit(run_prompt, index)] = index
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    running_per_group[self.groups[index]] -= 1
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        errors[index] = e
+                        stop_at = index if stop_at is None else min(stop_at, index)
+                        continue
+                    if ends_run(results[index]):
+                        stop_at = index if stop_at is None else min(stop_at, index)
+
+        if stop_at is not None and stop_at in errors:
+            raise errors[stop_at]
+        last = count - 1 if stop_at is None else stop_at
+        return [results[index] for index in range(last + 1)]
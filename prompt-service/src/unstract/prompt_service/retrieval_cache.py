@@ -0,0 +1,218 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Optional
+
+from unstract.prompt_service.env_manager import EnvLoader
+from unstract.prompt_service.utils.invalidation_listener import InvalidationListener
+from unstract.prompt_service.utils.redis_client import get_redis_client
+
+from unstract.core.constants import DocumentIndexEvent
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalCache:
+    """Context retrieved from vector DBs, reused for identical queries.
+
+    Retrievals are keyed by the embedding and vector DB adapters, the
+    doc_id, the query and the number of chunks retrieved, which saves
+    embedding the query as well as querying the vector DB. The most
+    recently used entries are kept in memory, up to `max_entries` and
+    `max_bytes` of context, and optionally in Redis to be shared by all
+    instances of the service. Entries expire after `ttl` seconds.
+
+    The backend publishes the doc_ids of documents it indexes, whose
+    entries are dropped from both tiers as soon as the message arrives.
+    Empty retrievals are not cached as they are retried, the vector DB
+    could still be catching up with the write of the document.
+    """
+
+    KEY_PREFIX = "retrieval_cache"
+
+    def __init__(
+        self, max_entries: int, max_bytes: int, ttl: int, use_redis: bool
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.redis = get_redis_client() if use_redis else None
+        # (doc_id, key) -> (expiry, context, size of the context in bytes)
+        self._entries: OrderedDict[
+            tuple[str, str], tuple[float, tuple[str, ...], int]
+        ] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, contexts retrieved across one are
+        # not cached as they could be stale already
+        self._generation = 0
+        self._memory_hits = 0
+        self._redis_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._listener = InvalidationListener(
+            channel=DocumentIndexEvent.INVALIDATION_CHANNEL,
+            on_message=self.invalidate,
+            on_reset=self.clear,
+        )
+
+    @staticmethod
+    def get_key(
+        embedding_instance_id: str,
+        vector_db_instance_id: str,
+        query: str,
+        top_k: Optional[int],
+    ) -> str:
+        """Key of a retrieval from a document.
+
+        Args:
+            embedding_instance_id (str): Embedding adapter embedding the query
+            vector_db_instance_id (str): Vector DB adapter queried
+            query (str): Text the context is retrieved for
+            top_k (Optional[int]): Number of chunks retrieved, None if the
+                whole document is retrieved
+        """
+        data = json.dumps([embedding_instance_id, vector_db_instance_id, query, top_k])
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _get_redis_key(self, doc_id: str) -> str:
+        # Entries of a document are kept in one hash to drop them at once
+        return f"{self.KEY_PREFIX}:{doc_id}"
+
+    def _store(self, entry_key: tuple[str, str], context: set[str]) -> None:
+        size = sum(len(chunk.encode("utf-8")) for chunk in context)
+        # Whole documents retrieved without chunking can exceed the bound
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        self._drop(entry_key)
+        self._entries[entry_key] = (time.monotonic() + self.ttl, tuple(context), size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def _drop(self, entry_key: tuple[str, str]) -> None:
+        entry = self._entries.pop(entry_key, None)
+        if entry:
+            self._bytes -= entry[2]
+
+    def lookup(self, doc_id: str, key: str) -> tuple[Optional[set[str]], int]:
+        """Cached context of `key` if any, along with the generation to
+        pass to `store()` once the context is retrieved on a miss.
+
+        Args:
+            doc_id (str): Document the context is retrieved from
+            key (str): Key of the retrieval, see `get_key()`
+        """
+        self._listener.ensure_started()
+        entry_key = (doc_id, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(entry_key)
+                self._memory_hits += 1
+                return set(entry[1]), self._generation
+            generation = self._generation
+
+        if self.redis:
+            try:
+                data = self.redis.hget(self._get_redis_key(doc_id), key)
+            except Exception as e:
+                logger.warning(f"Error reading cached retrieval: {e}")
+                data = None
+            if data:
+                context = set(json.loads(data))
+                with self._lock:
+                    self._redis_hits += 1
+                    if generation == self._generation:
+                        self._store(entry_key, context)
+                return context, generation
+
+        with self._lock:
+            self._misses += 1
+        return None, generation
+
+    def store(self, doc_id: str, key: str, context: set[str], generation: int) -> None:
+        """Cache the context retrieved for `key` unless it is empty or the
+        document was indexed again since `generation`."""
+        if not context:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._store((doc_id, key), context)
+        if self.redis:
+            try:
+                redis_key = self._get_redis_key(doc_id)
+                pipeline = self.redis.pipeline()
+                pipeline.hset(redis_key, key, json.dumps(list(context)))
+                pipeline.expire(redis_key, self.ttl)
+                pipeline.execute()
+            except Exception as e:
+                logger.warning(f"Error caching retrieval: {e}")
+
+    def get(self, doc_id: str, key: str, fetch: Callable[[], set[str]]) -> set[str]:
+        """Context retrieved for `key`, retrieved with `fetch` if not cached."""
+        context, generation = self.lookup(doc_id=doc_id, key=key)
+        if context is None:
+            context = fetch()
+            self.store(doc_id=doc_id, key=key, context=context, generation=generation)
+        return context
+
+    def invalidate(self, doc_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            for entry_key in [key for key in self._entries if key[0] == doc_id]:
+                self._drop(entry_key)
+        if self.redis:
+            try:
+                self.redis.delete(self._get_redis_key(doc_id))
+            except Exception as e:
+                logger.warning(f"Error dropping cached retrievals of {doc_id}: {e}")
+
+    def clear(self) -> None:
+        """Drop the entries in memory, those in Redis expire by themselves."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            hits = self._memory_hits + self._redis_hits
+            lookups = hits + self._misses
+            return {
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "memory_hits": self._memory_hits,
+                "redis_hits": self._redis_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else None,
+                "invalidations": self._invalidations,
+            }
+
+
+def create_retrieval_cache() -> Optional[RetrievalCache]:
+    """Retrieval cache configured through the `RETRIEVAL_CACHE_*` envs."""
+    max_entries = int(EnvLoader.get_env_or_die("RETRIEVAL_CACHE_MAX_ENTRIES", "1000"))
+    use_redis = (
+        EnvLoader.get_env_or_die("RETRIEVAL_CACHE_REDIS", "false").lower() == "true"
+    )
+    if max_entries <= 0 and not use_redis:
+        return None
+    return RetrievalCache(
+        max_entries=max_entries,
+        max_bytes=int(EnvLoader.get_env_or_die("RETRIEVAL_CACHE_MAX_MB", "64"))
+        * 1024
+        * 1024,
+        ttl=int(EnvLoader.get_env_or_die("RETRIEVAL_CACHE_TTL", "600")),
+        use_redis=use_redis,
+    )
+
+
+retrieval_cache = create_retrieval_cache()
@@ -0,0 +1,123 @@
+"""Local parsing of answers to typed prompts.
+
+Answers which are already a clean number, email, date or yes / no are
+converted here instead of asking the LLM to reformat them. Anything
+ambiguous, like day-first numeric dates or answers with surrounding text,
+is left to the LLM.
+"""
+
+import re
+import threading
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from unstract.prompt_service.constants import PromptServiceContants as PSKeys
+
+NUMBER_PATTERN = re.compile(
+    r"^(?P<sign>[-+])?[$€£¥₹]?\s*(?P<integer>\d{1,3}(?:,\d{3})+|\d+)"
+    r"(?P<fraction>\.\d+)?(?:\s*(?P<scale>thousand|million|billion|trillion))?$",
+    re.IGNORECASE,
+)
+NUMBER_SCALES = {
+    "thousand": 10**3,
+    "million": 10**6,
+    "billion": 10**9,
+    "trillion": 10**12,
+}
+# Addresses as validated by browsers, a practical subset of RFC 5322
+EMAIL_PATTERN = re.compile(
+    r"^[a-zA-Z0-9.!#$%&'*+/=?^_`{|}~-]+@[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}"
+    r"[a-zA-Z0-9])?(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)+$"
+)
+# Formats which can't be confused with each other
+DATE_FORMATS = (
+    "%Y/%m/%d",
+    "%B %d, %Y",
+    "%B %d %Y",
+    "%b %d, %Y",
+    "%b %d %Y",
+    "%d %B %Y",
+    "%d %b %Y",
+    "%d %B, %Y",
+    "%d-%b-%Y",
+)
+BOOLEANS = {"yes": True, "true": True, "no": False, "false": False}
+
+
+def parse_number(answer: str) -> Optional[float]:
+    match = NUMBER_PATTERN.match(answer.strip())
+    if not match:
+        return None
+    number = float(match["integer"].replace(",", "") + (match["fraction"] or ""))
+    if match["scale"]:
+        number *= NUMBER_SCALES[match["scale"].lower()]
+    return -number if match["sign"] == "-" else number
+
+
+def parse_email(answer: str) -> Optional[str]:
+    answer = answer.strip()
+    return answer if EMAIL_PATTERN.match(answer) else None
+
+
+def parse_date(answer: str) -> Optional[str]:
+    answer = answer.strip().rstrip(".")
+    try:
+        # Already in ISO format
+        datetime.fromisoformat(answer)
+        return answer
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(answer, date_format).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_boolean(answer: str) -> Optional[bool]:
+    return BOOLEANS.get(answer.strip().rstrip(".").lower())
+
+
+PARSERS: dict[str, Callable[[str], Optional[Any]]] = {
+    PSKeys.NUMBER: parse_number,
+    PSKeys.EMAIL: parse_email,
+    PSKeys.DATE: parse_date,
+    PSKeys.BOOLEAN: parse_boolean,
+}
+
+
+class LocalTypeCoercion:
+    """Parses answers of the types in `PARSERS`, counting how often
+    the LLM could be skipped."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def supports(prompt_type: str) -> bool:
+        return prompt_type in PARSERS
+
+    def coerce(self, answer: str, prompt_type: str) -> Optional[Any]:
+        """Value of the answer, None if it has to be reformatted by the LLM."""
+        value = PARSERS[prompt_type](answer)
+        with self._lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else None,
+            }
+
+
+local_type_coercion = LocalTypeCoercion()
@@ -0,0 +1,61 @@
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Optional
+
+from unstract.prompt_service.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before resubscribing to invalidations
+RECONNECT_INTERVAL = 5
+
+
+class InvalidationListener:
+    """Thread passing the messages of a Redis pub/sub channel to a cache.
+
+    `on_message` receives each message, `on_reset` is called whenever
+    messages could have been missed: when subscribing and once the
+    subscription is lost.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        on_message: Callable[[str], None],
+        on_reset: Callable[[], None],
+    ) -> None:
+        self.channel = channel
+        self.on_message = on_message
+        self.on_reset = on_reset
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def ensure_started(self) -> None:
+        with self._lock:
+            # Threads don't survive the fork of a gunicorn worker
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._listen, name=f"{self.channel}-listener", daemon=True
+            )
+            self._thread.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self.on_reset()
+                for message in pubsub.listen():
+                    data = message.get("data")
+                    if isinstance(data, bytes):
+                        self.on_message(data.decode("utf-8"))
+            except Exception as e:
+                logger.warning(f"Error listening to {self.channel}: {e}")
+            self.on_reset()
+            time.sleep(RECONNECT_INTERVAL)
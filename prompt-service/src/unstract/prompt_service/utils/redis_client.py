@@ -0,0 +1,14 @@
+import os
+
+from redis import Redis
+from unstract.prompt_service.env_manager import EnvLoader
+
+
+def get_redis_client() -> Redis:
+    """Client of the Redis configured through the `REDIS_*` envs."""
+    return Redis(
+        host=EnvLoader.get_env_or_die("REDIS_HOST", "unstract-redis"),
+        port=int(EnvLoader.get_env_or_die("REDIS_PORT", "6379")),
+        username=os.environ.get("REDIS_USER") or None,
+        password=os.environ.get("REDIS_PASSWORD") or None,
+    )
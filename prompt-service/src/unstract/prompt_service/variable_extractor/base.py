@@ -1,3 +1,4 @@
+import re
 from typing import Any
 
 from flask import current_app as app
@@ -6,7 +7,7 @@ from unstract.prompt_service.constants import RunLevel
 from unstract.prompt_service.utils.log import publish_log
 from unstract.sdk.constants import LogLevel
 
-from .constants import VariableType
+from .constants import VariableConstants, VariableType
 from .prompt_variable_service import VariableService
 
 
@@ -48,6 +49,32 @@ class VariableExtractor:
         """
         return bool(len(VariableService.extract_variables_from_prompt(prompt_text)))
 
+    @staticmethod
+    def get_referenced_prompts(prompt_text: str, prompt_names: list[str]) -> set[str]:
+        """Names of the prompts whose output is used in the prompt.
+
+        Both `{{variable}}` references, including the data of dynamic
+        variables, and `%variable%` references are considered.
+
+        Args:
+            prompt_text (str): Prompt to check
+            prompt_names (list[str]): Names of the prompts which can be used
+
+        Returns:
+            set[str]: Names of the referenced prompts
+        """
+        referenced: set[str] = set()
+        for variable in VariableService.extract_variables_from_prompt(prompt_text):
+            variable_type = VariableService.identify_variable_type(variable=variable)
+            if variable_type == VariableType.DYNAMIC:
+                referenced.update(
+                    re.findall(VariableConstants.DYNAMIC_VARIABLE_DATA_REGEX, variable)
+                )
+            else:
+                referenced.add(variable)
+        referenced.update(name for name in prompt_names if f"%{name}%" in prompt_text)
+        return referenced.intersection(prompt_names)
+
     @staticmethod
     def replace_variables_in_prompt(
         prompt: dict[str, Any],
@@ -0,0 +1,111 @@
+import pytest
+from unstract.prompt_service import adapter_config_cache
+from unstract.prompt_service.adapter_config_cache import (
+    AdapterConfigCache,
+    enable_adapter_config_cache,
+)
+from unstract.prompt_service.constants import PromptServiceContants as PSKeys
+
+
+@pytest.fixture
+def cache(mocker):
+    mocker.patch.object(adapter_config_cache.InvalidationListener, "ensure_started")
+    return AdapterConfigCache(ttl=60)
+
+
+def test_cached_config_is_copied(cache, mocker):
+    """Test configs are fetched once per platform key and adapter, and are
+    returned as copies."""
+    fetch = mocker.Mock(return_value={"api_key": "key"})
+    config = cache.get("org-1", "adapter-1", fetch)
+    config["api_key"] = "changed"
+
+    assert cache.get("org-1", "adapter-1", fetch) == {"api_key": "key"}
+    assert fetch.call_count == 1
+    cache.get("org-2", "adapter-1", fetch)
+    assert fetch.call_count == 2
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_expired_config_is_fetched(cache, mocker):
+    """Test configs are fetched again after the TTL."""
+    monotonic = mocker.patch.object(adapter_config_cache.time, "monotonic")
+    monotonic.return_value = 100
+    fetch = mocker.Mock(side_effect=[{"version": 1}, {"version": 2}])
+    cache.get("org-1", "adapter-1", fetch)
+    monotonic.return_value = 161
+
+    assert cache.get("org-1", "adapter-1", fetch) == {"version": 2}
+
+
+def test_invalidate_drops_adapter_of_all_orgs(cache, mocker):
+    """Test an invalidation drops the configs of its adapter only."""
+    fetch = mocker.Mock(return_value={})
+    for platform_key in ("org-1", "org-2"):
+        cache.get(platform_key, "adapter-1", fetch)
+    cache.get("org-1", "adapter-2", fetch)
+    cache.invalidate("adapter-1")
+
+    stats = cache.get_stats()
+    assert stats["size"] == 1
+    assert stats["invalidations"] == 1
+
+
+def test_config_fetched_across_invalidation_not_cached(cache):
+    """Test a config whose fetch raced an invalidation isn't cached, as it
+    could predate the update."""
+    versions = iter([1, 2])
+
+    def fetch():
+        version = next(versions)
+        if version == 1:
+            # The adapter is updated while its old config is fetched
+            cache.invalidate("adapter-1")
+        return {"version": version}
+
+    assert cache.get("org-1", "adapter-1", fetch) == {"version": 1}
+    assert cache.get("org-1", "adapter-1", fetch) == {"version": 2}
+
+
+def test_config_fetched_across_reset_not_cached(cache):
+    """Test a config fetched while invalidations could be missed isn't
+    cached."""
+    versions = iter([1, 2])
+
+    def fetch():
+        version = next(versions)
+        if version == 1:
+            # The subscription is lost
+            cache.clear()
+        return {"version": version}
+
+    cache.get("org-1", "adapter-1", fetch)
+
+    assert cache.get("org-1", "adapter-1", fetch) == {"version": 2}
+    assert cache.get_stats()["size"] == 1
+
+
+def test_enable_adapter_config_cache(cache, mocker):
+    """Test the SDK's adapter configs are served from the cache, except
+    the ones of public adapters."""
+
+    class ToolAdapter:
+        get_adapter_config = mocker.Mock(return_value={"api_key": "key"})
+
+    mocker.patch.object(adapter_config_cache, "ToolAdapter", ToolAdapter)
+    sdk_helper = mocker.patch.object(adapter_config_cache, "SdkHelper")
+    sdk_helper.is_public_adapter.side_effect = lambda adapter_id: (
+        adapter_id == "public"
+    )
+    get_adapter_config = ToolAdapter.get_adapter_config
+    enable_adapter_config_cache(cache)
+    tool = mocker.Mock()
+    tool.get_env_or_die.return_value = "org-1"
+
+    for _ in range(2):
+        assert ToolAdapter.get_adapter_config(tool, "adapter-1") == {"api_key": "key"}
+        ToolAdapter.get_adapter_config(tool, "public")
+
+    tool.get_env_or_die.assert_called_with(PSKeys.PLATFORM_SERVICE_API_KEY)
+    # Fetched once for the cached adapter, every time for the public one
+    assert get_adapter_config.call_count == 3
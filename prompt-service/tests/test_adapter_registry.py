@@ -0,0 +1,147 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+from unstract.prompt_service import adapter_registry
+from unstract.prompt_service.adapter_registry import AdapterRegistry
+
+
+class FakeAdapter:
+    """Records the adapters constructed, instead of fetching their config."""
+
+    created: list["FakeAdapter"] = []
+    delay = 0.0
+
+    def __init__(self, **kwargs):
+        time.sleep(self.delay)
+        self.kwargs = kwargs
+        self._metrics = {}
+        self.closed = False
+        self.created.append(self)
+
+    def get_vector_store_index(self):
+        return object()
+
+    def close(self):
+        self.closed = True
+
+
+class FakeLLM(FakeAdapter):
+    pass
+
+
+class FakeEmbedding(FakeAdapter):
+    pass
+
+
+class FakeVectorDB(FakeAdapter):
+    pass
+
+
+@pytest.fixture
+def registry(mocker):
+    FakeAdapter.created = []
+    FakeAdapter.delay = 0.0
+    mocker.patch.object(adapter_registry, "LLM", FakeLLM)
+    mocker.patch.object(adapter_registry, "Embedding", FakeEmbedding)
+    mocker.patch.object(adapter_registry, "VectorDB", FakeVectorDB)
+    return AdapterRegistry(tool=mocker.MagicMock())
+
+
+def test_llm_shared_with_own_metrics(registry):
+    """Test prompts get copies of one LLM, each with its own metrics."""
+    first = registry.get_llm("llm-1", {"run_id": "run"})
+    first._metrics["time_taken(s)"] = 1
+    second = registry.get_llm("llm-1", {"run_id": "run"})
+
+    assert len(FakeAdapter.created) == 1
+    assert first is not second
+    assert second._metrics == {}
+    assert first.kwargs is second.kwargs
+
+
+def test_adapters_keyed_by_usage(registry):
+    """Test adapters with other usage kwargs or metrics capture are apart,
+    so usage is attributed as if constructed per prompt."""
+    registry.get_llm("llm-1", {"run_id": "run-1"})
+    registry.get_llm("llm-1", {"run_id": "run-2"})
+    registry.get_llm("llm-1", {"run_id": "run-1"}, capture_metrics=True)
+    registry.get_embedding("embedding-1", {"run_id": "run-1"})
+    registry.get_embedding("embedding-1", {"run_id": "run-1"})
+
+    assert [type(adapter) for adapter in FakeAdapter.created] == [
+        FakeLLM,
+        FakeLLM,
+        FakeLLM,
+        FakeEmbedding,
+    ]
+
+
+def test_concurrent_prompts_construct_once(registry):
+    """Test prompts asking for the same adapter at once construct it once."""
+    FakeAdapter.delay = 0.05
+    embeddings = []
+
+    def get_embedding():
+        embeddings.append(registry.get_embedding("embedding-1", {}))
+
+    threads = [threading.Thread(target=get_embedding) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(FakeAdapter.created) == 1
+    assert all(embedding is embeddings[0] for embedding in embeddings)
+
+
+def test_different_adapters_construct_concurrently(registry):
+    """Test constructing an adapter doesn't hold back other adapters."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def create(adapter_instance_id):
+        return registry._get((FakeAdapter, adapter_instance_id), barrier.wait)
+
+    threads = [
+        threading.Thread(target=create, args=(adapter_instance_id,))
+        for adapter_instance_id in ("adapter-1", "adapter-2")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not barrier.broken
+
+
+def test_vector_db_shares_embedding(registry):
+    """Test a vector DB is constructed with the registry's embedding."""
+    embedding = registry.get_embedding("embedding-1", {"run_id": "run"})
+    vector_db = registry.get_vector_db("vector-db-1", "embedding-1", {"run_id": "run"})
+
+    assert vector_db.kwargs["embedding"] is embedding
+    assert registry.get_vector_store_index(vector_db) is (
+        registry.get_vector_store_index(vector_db)
+    )
+
+
+def test_close_vector_dbs(registry, mocker):
+    """Test closing the registry closes its vector DBs, errors are logged."""
+    registry.get_embedding("embedding-1", {})
+    first = registry.get_vector_db("vector-db-1", "embedding-1", {})
+    second = registry.get_vector_db("vector-db-2", "embedding-1", {})
+    mocker.patch.object(second, "close", side_effect=ConnectionError("closed"))
+
+    app = Flask(__name__)
+    with app.app_context():
+        warning = mocker.patch.object(app.logger, "warning")
+        registry.close()
+
+    assert first.closed
+    warning.assert_called_once()
+    assert all(
+        not adapter.closed
+        for adapter in FakeAdapter.created
+        if isinstance(adapter, FakeEmbedding)
+    )
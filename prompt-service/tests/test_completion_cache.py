@@ -0,0 +1,113 @@
+import json
+import os
+
+import pytest
+from unstract.prompt_service import completion_cache
+from unstract.prompt_service.completion_cache import (
+    CompletionCache,
+    DiskCompletionCache,
+    RedisCompletionCache,
+)
+
+# Size of a completion file, one more doesn't fit in the cache
+ENTRY_SIZE = len(json.dumps({"answer": "x" * 100}))
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    return DiskCompletionCache(directory=str(tmp_path), max_bytes=3 * ENTRY_SIZE)
+
+
+def _set(cache, key):
+    cache.set(key, {"answer": "x" * 100})
+
+
+def _age(cache, key, mtime):
+    os.utime(cache._get_path(key), (mtime, mtime))
+
+
+def test_disk_cache_evicts_least_recently_used(disk_cache):
+    """Test the least recently read or written entries are evicted once the
+    directory is full."""
+    for index, key in enumerate(["a", "b", "c"]):
+        _set(disk_cache, key)
+        _age(disk_cache, key, 1000 + index)
+    # Reading touches the entry
+    assert disk_cache.get("a") == {"answer": "x" * 100}
+    _set(disk_cache, "d")
+
+    assert disk_cache.get("b") is None
+    assert all(disk_cache.get(key) for key in ("a", "c", "d"))
+    assert len(os.listdir(disk_cache.directory)) == 3
+
+
+def test_disk_cache_keeps_other_files(disk_cache):
+    """Test files other than entries don't count and are never evicted."""
+    other = os.path.join(disk_cache.directory, "notes.txt")
+    with open(other, "w") as file:
+        file.write("x" * 10 * ENTRY_SIZE)
+    for key in ("a", "b", "c"):
+        _set(disk_cache, key)
+
+    assert os.path.exists(other)
+    assert all(disk_cache.get(key) for key in ("a", "b", "c"))
+
+
+def test_stats(disk_cache):
+    """Test hits and misses are counted."""
+    _set(disk_cache, "a")
+    disk_cache.get("a")
+    disk_cache.get("b")
+
+    assert disk_cache.get_stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_errors_are_misses(mocker):
+    """Test errors of the cache are treated as misses and never raised."""
+    redis = mocker.MagicMock()
+    redis.pipeline.return_value.execute.side_effect = ConnectionError("down")
+    mocker.patch.object(completion_cache, "get_redis_client", return_value=redis)
+    cache = RedisCompletionCache(max_entries=2, ttl=60)
+
+    assert cache.get("a") is None
+    cache.set("a", {"answer": "x"})
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_redis_cache_prunes_expired_and_evicts(mocker):
+    """Test index members older than the TTL are pruned before entries
+    beyond `max_entries` are evicted."""
+    redis = mocker.MagicMock()
+    pipeline = redis.pipeline.return_value
+    pipeline.execute.return_value = [True, 1, 0, 3]
+    redis.zpopmin.return_value = [(b"old", 1.0)]
+    mocker.patch.object(completion_cache, "get_redis_client", return_value=redis)
+    mocker.patch.object(completion_cache.time, "time", return_value=1000.0)
+    cache = RedisCompletionCache(max_entries=2, ttl=60)
+    cache.set("new", {"answer": "x"})
+
+    pipeline.zremrangebyscore.assert_called_once_with(
+        RedisCompletionCache.INDEX_KEY, "-inf", 940.0
+    )
+    redis.zpopmin.assert_called_once_with(RedisCompletionCache.INDEX_KEY, 1)
+    redis.delete.assert_called_once_with("completion_cache:old")
+
+
+def test_key_depends_on_scope_model_and_prompt(mocker):
+    """Test completions are keyed by organization, model params and prompt."""
+
+    def llm(model, temperature=0.0):
+        llm = mocker.Mock()
+        llm.get_class_name.return_value = "OpenAI"
+        llm.get_llm.return_value = mocker.Mock(
+            spec=["model", "temperature"], model=model, temperature=temperature
+        )
+        return llm
+
+    key = CompletionCache.get_key(llm("gpt-4o"), "prompt", "org-1")
+
+    assert key == CompletionCache.get_key(llm("gpt-4o"), "prompt", "org-1")
+    assert key != CompletionCache.get_key(llm("gpt-4o"), "prompt", "org-2")
+    assert key != CompletionCache.get_key(llm("gpt-4o-mini"), "prompt", "org-1")
+    assert key != CompletionCache.get_key(llm("gpt-4o", 0.7), "prompt", "org-1")
+    assert key != CompletionCache.get_key(llm("gpt-4o"), "other", "org-1")
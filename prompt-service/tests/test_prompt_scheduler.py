@@ -0,0 +1,159 @@
+import threading
+import time
+
+import pytest
+from unstract.prompt_service.prompt_scheduler import PromptScheduler
+
+
+def _never_ends(result):
+    return False
+
+
+def test_independent_prompts_run_concurrently():
+    """Test prompts without dependencies run at once and results keep the
+    prompt order."""
+    barrier = threading.Barrier(3, timeout=5)
+
+    def run_prompt(index):
+        barrier.wait()
+        # Later prompts finish first
+        time.sleep(0.01 * (3 - index))
+        return index
+
+    scheduler = PromptScheduler(
+        dependencies=[set(), set(), set()],
+        groups=["llm", "llm", "llm"],
+        max_parallel_per_group=3,
+    )
+
+    assert scheduler.run(run_prompt, _never_ends) == [0, 1, 2]
+
+
+def test_prompts_run_after_their_dependencies():
+    """Test a prompt starts only once the prompts it depends on finished."""
+    finished: list[int] = []
+    lock = threading.Lock()
+
+    def run_prompt(index):
+        with lock:
+            started_after = list(finished)
+        time.sleep(0.02 if index == 0 else 0)
+        with lock:
+            finished.append(index)
+        return started_after
+
+    scheduler = PromptScheduler(
+        dependencies=[set(), set(), {0, 1}],
+        groups=["llm", "llm", "llm"],
+        max_parallel_per_group=3,
+    )
+    results = scheduler.run(run_prompt, _never_ends)
+
+    assert sorted(results[2]) == [0, 1]
+
+
+def test_group_limit():
+    """Test no more than `max_parallel_per_group` prompts of a group run at
+    once, while other groups aren't held back."""
+    running = {"a": 0, "b": 0}
+    max_running = {"a": 0, "b": 0}
+    lock = threading.Lock()
+    groups = ["a", "a", "a", "b", "b"]
+
+    def run_prompt(index):
+        group = groups[index]
+        with lock:
+            running[group] += 1
+            max_running[group] = max(max_running[group], running[group])
+        time.sleep(0.02)
+        with lock:
+            running[group] -= 1
+        return index
+
+    scheduler = PromptScheduler(
+        dependencies=[set()] * 5, groups=groups, max_parallel_per_group=2
+    )
+
+    assert scheduler.run(run_prompt, _never_ends) == [0, 1, 2, 3, 4]
+    assert max_running == {"a": 2, "b": 2}
+
+
+def test_serial_mode_keeps_prompt_order():
+    """Test one prompt at a time runs the prompts one after another."""
+    started: list[int] = []
+
+    def run_prompt(index):
+        started.append(index)
+        return index
+
+    scheduler = PromptScheduler(
+        dependencies=[set()] * 4, groups=["llm"] * 4, max_parallel_per_group=1
+    )
+
+    assert scheduler.run(run_prompt, _never_ends) == [0, 1, 2, 3]
+    assert started == [0, 1, 2, 3]
+
+
+def test_first_failure_in_prompt_order_is_raised():
+    """Test the error of the first failed prompt in order is raised, like in
+    serial mode, even if a later prompt failed first."""
+
+    def run_prompt(index):
+        if index == 1:
+            time.sleep(0.05)
+            raise ValueError("first")
+        if index == 2:
+            raise ValueError("second")
+        return index
+
+    scheduler = PromptScheduler(
+        dependencies=[set()] * 3, groups=["llm"] * 3, max_parallel_per_group=3
+    )
+
+    with pytest.raises(ValueError, match="first"):
+        scheduler.run(run_prompt, _never_ends)
+
+
+def test_no_prompt_after_a_failure_is_started():
+    """Test prompts after a failed one are not started."""
+    started: list[int] = []
+
+    def run_prompt(index):
+        started.append(index)
+        if index == 1:
+            raise ValueError("failed")
+        return index
+
+    for max_parallel in (1, 3):
+        started.clear()
+        scheduler = PromptScheduler(
+            dependencies=[set(), {0}, {1}, {0}],
+            groups=["llm"] * 4,
+            max_parallel_per_group=max_parallel,
+        )
+        with pytest.raises(ValueError):
+            scheduler.run(run_prompt, _never_ends)
+
+        assert 2 not in started
+
+
+def test_result_ending_the_run():
+    """Test results are returned up to the prompt ending the run, the same
+    as in serial mode."""
+    started: list[int] = []
+
+    def run_prompt(index):
+        started.append(index)
+        return "stop" if index == 1 else index
+
+    for max_parallel in (1, 3):
+        started.clear()
+        scheduler = PromptScheduler(
+            dependencies=[set(), set(), {1}],
+            groups=["llm"] * 3,
+            max_parallel_per_group=max_parallel,
+        )
+        results = scheduler.run(run_prompt, lambda result: result == "stop")
+
+        assert results == [0, "stop"]
+        assert 2 not in started
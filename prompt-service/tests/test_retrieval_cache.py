@@ -0,0 +1,168 @@
+import json
+
+import pytest
+from unstract.prompt_service import retrieval_cache
+from unstract.prompt_service.retrieval_cache import RetrievalCache
+
+
+@pytest.fixture(autouse=True)
+def listener(mocker):
+    mocker.patch.object(retrieval_cache.InvalidationListener, "ensure_started")
+
+
+def _create_cache(max_entries=10, max_bytes=1024, redis=None, mocker=None):
+    if redis is not None:
+        mocker.patch.object(retrieval_cache, "get_redis_client", return_value=redis)
+    return RetrievalCache(
+        max_entries=max_entries,
+        max_bytes=max_bytes,
+        ttl=60,
+        use_redis=redis is not None,
+    )
+
+
+def test_cached_retrieval(mocker):
+    """Test a retrieval is fetched once per doc_id and key."""
+    cache = _create_cache()
+    fetch = mocker.Mock(return_value={"chunk"})
+
+    assert cache.get("doc-1", "key", fetch) == {"chunk"}
+    assert cache.get("doc-1", "key", fetch) == {"chunk"}
+    cache.get("doc-2", "key", fetch)
+    assert fetch.call_count == 2
+    assert cache.get_stats()["memory_hits"] == 1
+
+
+def test_empty_retrieval_not_cached(mocker):
+    """Test empty retrievals are retried, the vector DB could be lagging."""
+    cache = _create_cache()
+    fetch = mocker.Mock(side_effect=[set(), {"chunk"}])
+
+    assert cache.get("doc-1", "key", fetch) == set()
+    assert cache.get("doc-1", "key", fetch) == {"chunk"}
+
+
+def test_expired_retrieval_is_fetched(mocker):
+    """Test retrievals are fetched again after the TTL."""
+    monotonic = mocker.patch.object(retrieval_cache.time, "monotonic")
+    monotonic.return_value = 100
+    cache = _create_cache()
+    fetch = mocker.Mock(side_effect=[{"old"}, {"new"}])
+    cache.get("doc-1", "key", fetch)
+    monotonic.return_value = 161
+
+    assert cache.get("doc-1", "key", fetch) == {"new"}
+
+
+def test_invalidate_drops_document(mocker):
+    """Test indexing a document drops its retrievals only."""
+    cache = _create_cache()
+    fetch = mocker.Mock(return_value={"chunk"})
+    cache.get("doc-1", "key-1", fetch)
+    cache.get("doc-1", "key-2", fetch)
+    cache.get("doc-2", "key-1", fetch)
+    cache.invalidate("doc-1")
+
+    stats = cache.get_stats()
+    assert stats["size"] == 1
+    assert stats["bytes"] == len("chunk")
+    assert stats["invalidations"] == 1
+
+
+def test_retrieval_across_invalidation_not_cached():
+    """Test a retrieval which raced the indexing of its document isn't
+    cached, as it could come from the old chunks."""
+    cache = _create_cache()
+    contexts = iter([{"old"}, {"new"}])
+
+    def fetch():
+        context = next(contexts)
+        if context == {"old"}:
+            cache.invalidate("doc-1")
+        return context
+
+    assert cache.get("doc-1", "key", fetch) == {"old"}
+    assert cache.get("doc-1", "key", fetch) == {"new"}
+
+
+def test_retrieval_across_reset_not_cached():
+    """Test a retrieval while invalidations could be missed isn't cached."""
+    cache = _create_cache()
+    context, generation = cache.lookup("doc-1", "key")
+    # The subscription is lost
+    cache.clear()
+    cache.store("doc-1", "key", {"chunk"}, generation)
+
+    assert context is None
+    assert cache.lookup("doc-1", "key")[0] is None
+
+
+def test_least_recently_used_evicted_by_entries():
+    """Test the least recently used retrievals beyond `max_entries` are
+    evicted."""
+    cache = _create_cache(max_entries=2)
+    for key in ("a", "b"):
+        cache.get("doc-1", key, lambda: {"chunk"})
+    # Reading makes it the most recently used
+    cache.get("doc-1", "a", lambda: {"chunk"})
+    cache.get("doc-1", "c", lambda: {"chunk"})
+
+    assert cache.lookup("doc-1", "b")[0] is None
+    assert cache.lookup("doc-1", "a")[0] == {"chunk"}
+    assert cache.lookup("doc-1", "c")[0] == {"chunk"}
+
+
+def test_evicted_by_bytes():
+    """Test retrievals are evicted to keep the context within `max_bytes`,
+    and contexts larger than it are not cached."""
+    cache = _create_cache(max_bytes=10)
+    cache.get("doc-1", "a", lambda: {"x" * 4})
+    cache.get("doc-1", "b", lambda: {"y" * 4})
+    cache.get("doc-1", "c", lambda: {"z" * 4})
+
+    assert cache.get_stats()["bytes"] == 8
+    assert cache.lookup("doc-1", "a")[0] is None
+    cache.get("doc-1", "d", lambda: {"w" * 11})
+    assert cache.lookup("doc-1", "d")[0] is None
+    assert cache.get_stats()["bytes"] == 8
+
+
+def test_redis_hit_kept_in_memory(mocker):
+    """Test retrievals of other instances are read from Redis and kept in
+    memory."""
+    redis = mocker.MagicMock()
+    redis.hget.return_value = json.dumps(["chunk"]).encode()
+    cache = _create_cache(redis=redis, mocker=mocker)
+
+    assert cache.lookup("doc-1", "key")[0] == {"chunk"}
+    assert cache.lookup("doc-1", "key")[0] == {"chunk"}
+    redis.hget.assert_called_once_with("retrieval_cache:doc-1", "key")
+    assert cache.get_stats()["redis_hits"] == 1
+
+
+def test_redis_hit_across_invalidation_not_kept(mocker):
+    """Test a Redis hit read while its document is indexed again isn't
+    kept in memory."""
+    redis = mocker.MagicMock()
+    cache = _create_cache(redis=redis, mocker=mocker)
+
+    def hget(name, key):
+        cache.invalidate("doc-1")
+        return json.dumps(["old"]).encode()
+
+    redis.hget.side_effect = hget
+    cache.lookup("doc-1", "key")
+
+    assert cache.get_stats()["size"] == 0
+    redis.delete.assert_called_with("retrieval_cache:doc-1")
+
+
+def test_redis_errors_are_misses(mocker):
+    """Test errors of Redis are treated as misses."""
+    redis = mocker.MagicMock()
+    redis.hget.side_effect = ConnectionError("down")
+    redis.pipeline.return_value.execute.side_effect = ConnectionError("down")
+    cache = _create_cache(redis=redis, mocker=mocker)
+
+    assert cache.get("doc-1", "key", lambda: {"chunk"}) == {"chunk"}
+    assert cache.get_stats()["misses"] == 1
@@ -0,0 +1,101 @@
+import pytest
+from unstract.prompt_service.constants import PromptServiceContants as PSKeys
+from unstract.prompt_service.type_coercion import (
+    LocalTypeCoercion,
+    parse_boolean,
+    parse_date,
+    parse_email,
+    parse_number,
+)
+
+
+@pytest.mark.parametrize(
+    "answer, expected",
+    [
+        ("42", 42.0),
+        (" 1,234.5 ", 1234.5),
+        ("1,234.5 million", 1_234_500_000.0),
+        ("2 Billion", 2_000_000_000.0),
+        ("-$1,000", -1000.0),
+        ("+€ 3.25", 3.25),
+        ("0.5", 0.5),
+    ],
+)
+def test_parse_number(answer, expected):
+    assert parse_number(answer) == expected
+
+
+@pytest.mark.parametrize(
+    "answer",
+    [
+        # Digits grouped other than by thousands, e.g. Indian or decimal comma
+        "1,23,456",
+        "1.234,5",
+        "12 apples",
+        "about 40",
+        "1e6",
+        "million",
+        "",
+    ],
+)
+def test_parse_number_left_to_llm(answer):
+    assert parse_number(answer) is None
+
+
+@pytest.mark.parametrize(
+    "answer, expected",
+    [
+        ("2024-03-04", "2024-03-04"),
+        ("2024/03/04", "2024-03-04"),
+        ("March 4, 2024", "2024-03-04"),
+        ("Mar 4 2024", "2024-03-04"),
+        ("4 March 2024.", "2024-03-04"),
+        ("04-Mar-2024", "2024-03-04"),
+    ],
+)
+def test_parse_date(answer, expected):
+    assert parse_date(answer) == expected
+
+
+@pytest.mark.parametrize(
+    "answer",
+    [
+        # Day-first and month-first numeric dates can't be told apart
+        "03/04/2024",
+        "04.03.2024",
+        "4/3/24",
+        "February 30, 2024",
+        "The date is March 4, 2024",
+    ],
+)
+def test_parse_date_left_to_llm(answer):
+    assert parse_date(answer) is None
+
+
+@pytest.mark.parametrize(
+    "answer, expected",
+    [("Yes", True), ("true", True), ("No.", False), (" FALSE ", False)],
+)
+def test_parse_boolean(answer, expected):
+    assert parse_boolean(answer) is expected
+
+
+@pytest.mark.parametrize("answer", ["No, it is not", "N/A", "maybe", ""])
+def test_parse_boolean_left_to_llm(answer):
+    assert parse_boolean(answer) is None
+
+
+def test_parse_email():
+    assert parse_email(" jane.doe+tag@example.co.uk ") == "jane.doe+tag@example.co.uk"
+    assert parse_email("Email: jane@example.com") is None
+    assert parse_email("jane@localhost") is None
+
+
+def test_coercion_stats():
+    """Test answers converted locally and left to the LLM are counted."""
+    coercion = LocalTypeCoercion()
+
+    assert coercion.supports(PSKeys.NUMBER)
+    assert coercion.coerce("1,000", PSKeys.NUMBER) == 1000.0
+    assert coercion.coerce("03/04/2024", PSKeys.DATE) is None
+    assert coercion.get_stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
@@ -23,7 +23,7 @@ done
 # Configure Gunicorn based on --dev flag
 gunicorn_args=(
     --bind 0.0.0.0:5002
-    --workers 2
+    --workers "${RUNNER_WORKERS:-2}"
     --threads 2
     --worker-class gevent
     --log-level debug
@@ -1,15 +1,22 @@
+import atexit
 import logging
 import os
+import threading
+import time
 from collections.abc import Iterator
 from typing import Any, Optional
 
 from docker.errors import APIError, ImageNotFound
 from docker.models.containers import Container
+from unstract.runner.clients.image_manager import ImageManager
 from unstract.runner.clients.interface import (
     ContainerClientInterface,
     ContainerInterface,
 )
+from unstract.runner.clients.warm_pool import WarmContainerPool
 from unstract.runner.constants import Env
+from unstract.runner.exception import RegistryAuthError
+from unstract.runner.scheduler import ToolResources
 from unstract.runner.utils import Utils
 
 from docker import DockerClient
@@ -28,6 +35,9 @@ class DockerContainer(ContainerInterface):
         for line in self.container.logs(stream=True, follow=follow):
             yield line.decode().strip()
 
+    def stop(self) -> None:
+        self.container.stop(timeout=5)
+
     def cleanup(self) -> None:
         if not self.container or not Utils.remove_container_on_exit():
             return
@@ -37,20 +47,65 @@ class DockerContainer(ContainerInterface):
             self.logger.error(f"Failed to remove docker container: {remove_error}")
 
 
-class Client(ContainerClientInterface):
-    def __init__(self, image_name: str, image_tag: str, logger: logging.Logger) -> None:
-        self.image_name = image_name
-        # If no image_tag is provided will assume the `latest` tag
-        self.image_tag = image_tag or "latest"
-        self.logger = logger
+def _is_auth_error(message: str) -> bool:
+    message = message.lower()
+    return any(
+        marker in message
+        for marker in ("unauthorized", "authentication required", "denied")
+    )
+
+
+# Shared by all requests of the process
+image_manager = ImageManager()
+warm_pool = WarmContainerPool(
+    size=int(os.getenv(Env.TOOL_WARM_POOL_SIZE, 2)),
+    max_files=int(os.getenv(Env.TOOL_WARM_POOL_MAX_FILES, 50)),
+)
+atexit.register(warm_pool.shutdown)
+
+
+class DockerClientFactory:
+    """Process wide Docker client and private registry login.
+
+    Creating a client and logging in to the registry for every request adds
+    a credential file read and a registry round trip before a container is
+    even created. The client is created once with a connection pool sized
+    for concurrent requests, and the login is repeated only once it expired
+    or the registry rejected our credentials.
+    """
+
+    _client: Optional[DockerClient] = None
+    _login_expires_at: float = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls, logger: logging.Logger) -> DockerClient:
+        if cls._client is None:
+            with cls._lock:
+                if cls._client is None:
+                    # Create a Docker client that communicates with
+                    #   the Docker daemon in the host environment
+                    cls._client = DockerClient.from_env(
+                        max_pool_size=int(os.getenv(Env.DOCKER_CLIENT_POOL_SIZE, 50))
+                    )
+        cls.login(logger)
+        return cls._client
 
-        # Create a Docker client that communicates with
-        #   the Docker daemon in the host environment
-        self.client: DockerClient = DockerClient.from_env()
-        self.__private_login()
+    @classmethod
+    def reset(cls) -> None:
+        """Drops the shared client and the login state."""
+        with cls._lock:
+            cls._client = None
+            cls._login_expires_at = 0.0
 
-    def __private_login(self):
-        """Performs login for private registry if required."""
+    @classmethod
+    def login(cls, logger: logging.Logger, force: bool = False) -> None:
+        """Performs login for private registry if required.
+
+        Args:
+            logger (logging.Logger): Logger of the calling request
+            force (bool): Log in again even if the last login did not expire
+        """
         private_registry_credential_path = os.getenv(
             Env.PRIVATE_REGISTRY_CREDENTIAL_PATH
         )
@@ -62,36 +117,52 @@ class Client(ContainerClientInterface):
             and private_registry_url
         ):
             return
-        try:
-            self.logger.info(
-                "Performing private docker login for %s.", private_registry_url
-            )
-            with open(private_registry_credential_path, encoding="utf-8") as file:
-                password = file.read()
-            self.client.login(
-                username=private_registry_username,
-                password=password,
-                registry=private_registry_url,
-            )
-        except FileNotFoundError as file_err:
-            self.logger.error(
-                f"Service account key file is not mounted "
-                f"in {private_registry_credential_path}: {file_err}"
-                "Logging to private registry might fail, if private tool is used."
-            )
-        except APIError as api_err:
-            self.logger.error(
-                f"Exception occured while invoking docker client : {api_err}."
-                f"Authentication to artifact registry failed."
-            )
-        except OSError as os_err:
-            self.logger.error(
-                f"Exception in the file system used for authentication: {os_err}"
-            )
-        except Exception as exc:
-            self.logger.error(
-                f"Internal service error occured while authentication: {exc}"
-            )
+        with cls._lock:
+            if not force and time.monotonic() < cls._login_expires_at:
+                return
+            try:
+                logger.info(
+                    "Performing private docker login for %s.", private_registry_url
+                )
+                with open(private_registry_credential_path, encoding="utf-8") as file:
+                    password = file.read()
+                cls._client.login(
+                    username=private_registry_username,
+                    password=password,
+                    registry=private_registry_url,
+                    reauth=force,
+                )
+                cls._login_expires_at = time.monotonic() + int(
+                    os.getenv(Env.PRIVATE_REGISTRY_LOGIN_TTL, 3600)
+                )
+            except FileNotFoundError as file_err:
+                logger.error(
+                    f"Service account key file is not mounted "
+                    f"in {private_registry_credential_path}: {file_err}"
+                    "Logging to private registry might fail, if private tool is used."
+                )
+            except APIError as api_err:
+                logger.error(
+                    f"Exception occured while invoking docker client : {api_err}."
+                    f"Authentication to artifact registry failed."
+                )
+            except OSError as os_err:
+                logger.error(
+                    f"Exception in the file system used for authentication: {os_err}"
+                )
+            except Exception as exc:
+                logger.error(
+                    f"Internal service error occured while authentication: {exc}"
+                )
+
+
+class Client(ContainerClientInterface):
+    def __init__(self, image_name: str, image_tag: str, logger: logging.Logger) -> None:
+        self.image_name = image_name
+        # If no image_tag is provided will assume the `latest` tag
+        self.image_tag = image_tag or "latest"
+        self.logger = logger
+        self.client: DockerClient = DockerClientFactory.get_client(self.logger)
 
     def __image_exists(self, image_name_with_tag: str) -> bool:
         """Check if the container image exists in system.
@@ -127,33 +198,71 @@ class Client(ContainerClientInterface):
             str: image string combining repo name and tag like `ubuntu:22.04`
         """
         image_name_with_tag = f"{self.image_name}:{self.image_tag}"
+        image_manager.ensure(image_name_with_tag, fetch=self.__fetch_image)
+        return image_name_with_tag
+
+    def __fetch_image(self) -> None:
+        """Pulls `self.image_name`:`self.image_tag` unless it exists locally."""
+        image_name_with_tag = f"{self.image_name}:{self.image_tag}"
         if self.__image_exists(image_name_with_tag):
-            return image_name_with_tag
+            return
 
         self.logger.info("Pulling the container: %s", image_name_with_tag)
-        resp = self.client.api.pull(
-            repository=self.image_name,
-            tag=self.image_tag,
-            stream=True,
-            decode=True,
-        )
-        counter = 0
-        for line in resp:
-            # The counter is used to print status on every 100th status
-            # Otherwise the output logs will be polluted.
-            if counter < 100:
-                counter += 1
-                continue
-            counter = 0
-            self.logger.info(
-                "CONTAINER PULL STATUS: %s - %s : %s",
-                line.get("status"),
-                line.get("id"),
-                line.get("progress"),
-            )
+        try:
+            self.__pull_image()
+        except RegistryAuthError as auth_err:
+            # Credentials of the cached login might have been revoked
+            self.logger.warning(f"Registry rejected pull, logging in again: {auth_err}")
+            DockerClientFactory.login(self.logger, force=True)
+            self.__pull_image()
         self.logger.info("Finished pulling the container: %s", image_name_with_tag)
 
-        return image_name_with_tag
+    def __pull_image(self) -> None:
+        """Pulls `self.image_name`:`self.image_tag`.
+
+        Raises:
+            RegistryAuthError: If the registry denied access to the image
+        """
+        try:
+            resp = self.client.api.pull(
+                repository=self.image_name,
+                tag=self.image_tag,
+                stream=True,
+                decode=True,
+            )
+            counter = 0
+            for line in resp:
+                error = line.get("error")
+                if error:
+                    if _is_auth_error(error):
+                        raise RegistryAuthError(error)
+                    raise APIError(error)
+                # The counter is used to print status on every 100th status
+                # Otherwise the output logs will be polluted.
+                if counter < 100:
+                    counter += 1
+                    continue
+                counter = 0
+                self.logger.info(
+                    "CONTAINER PULL STATUS: %s - %s : %s",
+                    line.get("status"),
+                    line.get("id"),
+                    line.get("progress"),
+                )
+        except APIError as api_err:
+            if api_err.status_code in (401, 403) or _is_auth_error(str(api_err)):
+                raise RegistryAuthError(str(api_err)) from api_err
+            raise
+
+    def get_image_digest(self) -> Optional[str]:
+        image_name_with_tag = self.get_image()
+        try:
+            digest: str = self.client.images.get(image_name_with_tag).id
+            return digest
+        except (ImageNotFound, APIError) as e:  # type: ignore[attr-defined]
+            self.logger.warning(f"Unable to get digest of {image_name_with_tag}: {e}")
+            image_manager.discard(image_name_with_tag)
+            return None
 
     def get_container_run_config(
         self,
@@ -162,6 +271,7 @@ class Client(ContainerClientInterface):
         container_name: Optional[str] = None,
         envs: Optional[dict[str, Any]] = None,
         auto_remove: bool = False,
+        resources: Optional[ToolResources] = None,
     ) -> dict[str, Any]:
         if envs is None:
             envs = {}
@@ -186,8 +296,42 @@ class Client(ContainerClientInterface):
             "stdout": True,
             "network": os.getenv(Env.TOOL_CONTAINER_NETWORK, ""),
             "mounts": mounts,
+            **self.get_resource_limits(resources),
         }
 
+    @staticmethod
+    def get_resource_limits(resources: Optional[ToolResources]) -> dict[str, Any]:
+        """Container limits enforcing the resources declared by a tool."""
+        limits: dict[str, Any] = {}
+        if resources and resources.cpus:
+            limits["nano_cpus"] = int(resources.cpus * 1e9)
+        if resources and resources.memory:
+            limits["mem_limit"] = resources.memory
+        return limits
+
     def run_container(self, config: dict[Any, Any]) -> Any:
         self.logger.info(f"Docker config: {config}")
-        return DockerContainer(self.client.containers.run(**config))
+        try:
+            return DockerContainer(self.client.containers.run(**config))
+        except ImageNotFound:
+            # Removed from the host since it was pulled, fetch it next time
+            image_manager.discard(config["image"])
+            raise
+
+    def run_warm_container(
+        self,
+        command: list[str],
+        envs: dict[str, Any],
+        labels: Optional[list[str]] = None,
+        resources: Optional[ToolResources] = None,
+    ) -> Optional[ContainerInterface]:
+        if not Utils.is_warm_pool_enabled():
+            return None
+        return warm_pool.run(
+            client=self.client,
+            image=self.get_image(),
+            args=command,
+            envs=envs,
+            labels=labels,
+            limits=self.get_resource_limits(resources),
+        )
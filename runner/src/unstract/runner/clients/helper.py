@@ -1,6 +1,10 @@
+import json
 import logging
 import os
 from importlib import import_module
+from typing import Optional
+
+from unstract.runner.constants import Env, ProcessClientKey
 
 from .interface import ContainerClientInterface
 
@@ -9,9 +13,31 @@ logger = logging.getLogger(__name__)
 
 class ContainerClientHelper:
     @staticmethod
-    def get_container_client() -> ContainerClientInterface:
+    def get_container_client(
+        image_name: Optional[str] = None,
+    ) -> type[ContainerClientInterface]:
+        """Loads the client class running the tool of an image.
+
+        Tools configured in `TOOL_PROCESS_CONFIG` run as local processes,
+        all others with the client of `CONTAINER_CLIENT_PATH`.
+        """
         client_path = os.getenv(
             "CONTAINER_CLIENT_PATH", "unstract.runner.clients.docker"
         )
-        logger.info("Loading the container client from path:", client_path)
-        return import_module(client_path).Client
+        if image_name and image_name in ContainerClientHelper.get_process_config():
+            client_path = ProcessClientKey.CLIENT_PATH
+        logger.debug("Loading the container client from path: %s", client_path)
+        client_class: type[ContainerClientInterface] = import_module(client_path).Client
+        return client_class
+
+    @staticmethod
+    def get_process_config() -> dict[str, dict[str, str]]:
+        """Entry scripts of the tools run as processes, by image name."""
+        try:
+            config: dict[str, dict[str, str]] = json.loads(
+                os.getenv(Env.TOOL_PROCESS_CONFIG) or "{}"
+            )
+            return config
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid {Env.TOOL_PROCESS_CONFIG}: {e}")
+            return {}
@@ -0,0 +1,62 @@
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class ImageManager:
+    """Tracks the tool images present on the host.
+
+    Once an image is known to be present, container runs don't ask the
+    Docker daemon for it again. Concurrent requests for an image which is
+    not present share a single pull instead of each pulling it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._present: set[str] = set()
+        self._pulls: dict[str, Future] = {}
+
+    def ensure(self, image: str, fetch: Callable[[], None]) -> None:
+        """Make sure an image is present on the host.
+
+        Args:
+            image (str): Image name with tag
+            fetch (Callable[[], None]): Checks for the image and pulls it if
+                missing, only called when no other caller is doing so
+        """
+        with self._lock:
+            if image in self._present:
+                return
+            pull = self._pulls.get(image)
+            leader = pull is None
+            if leader:
+                pull = self._pulls[image] = Future()
+        if not leader:
+            logger.info(f"Waiting for the ongoing pull of {image}")
+            # Raises the error of the pull if it failed
+            pull.result()
+            return
+        try:
+            fetch()
+        except BaseException as e:
+            pull.set_exception(e)
+            raise
+        else:
+            pull.set_result(None)
+            with self._lock:
+                self._present.add(image)
+        finally:
+            with self._lock:
+                self._pulls.pop(image, None)
+
+    def discard(self, image: str) -> None:
+        """Forget an image, e.g. after it was found removed from the host."""
+        with self._lock:
+            self._present.discard(image)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._present.clear()
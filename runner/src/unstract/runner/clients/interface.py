@@ -3,6 +3,8 @@ from abc import ABC, abstractmethod
 from collections.abc import Iterator
 from typing import Any, Optional
 
+from unstract.runner.scheduler import ToolResources
+
 
 class ContainerInterface(ABC):
     @property
@@ -28,6 +30,14 @@ class ContainerInterface(ABC):
         """Stops and removes the running container."""
         pass
 
+    def stop(self) -> None:
+        """Stops the running container, ending its log stream.
+
+        Used to cancel a run. Clients which can't stop a container without
+        removing it may rely on this default.
+        """
+        self.cleanup()
+
 
 class ContainerClientInterface(ABC):
 
@@ -48,6 +58,29 @@ class ContainerClientInterface(ABC):
         """
         pass
 
+    def run_warm_container(
+        self,
+        command: list[str],
+        envs: dict[str, Any],
+        labels: Optional[list[str]] = None,
+        resources: Optional[ToolResources] = None,
+    ) -> Optional[ContainerInterface]:
+        """Runs a command in an already started container of the image.
+
+        Clients supporting long lived tool containers override this. Callers
+        fall back to `run_container` when it returns None.
+
+        Args:
+            command (list[str]): Arguments for the tool's entrypoint.
+            envs (dict[str, Any]): Environment for this run.
+            labels (Optional[list[str]]): Labels for containers started.
+            resources (Optional[ToolResources]): Limits of containers started.
+
+        Returns:
+            Optional[ContainerInterface]: The run, or None if not supported.
+        """
+        return None
+
     @abstractmethod
     def get_image(self) -> str:
         """Consturct image name with tag and repo name. Pulls the image if
@@ -58,6 +91,17 @@ class ContainerClientInterface(ABC):
         """
         pass
 
+    def get_image_digest(self) -> Optional[str]:
+        """Content digest of the image, pulling the image if needed.
+
+        Identifies the exact image behind a tag, so results which only
+        depend on the image can be cached by it.
+
+        Returns:
+            Optional[str]: The digest, or None if not supported.
+        """
+        return None
+
     @abstractmethod
     def get_container_run_config(
         self,
@@ -66,9 +110,12 @@ class ContainerClientInterface(ABC):
         container_name: Optional[str] = None,
         envs: Optional[dict[str, Any]] = None,
         auto_remove: bool = False,
+        resources: Optional[ToolResources] = None,
     ) -> dict[str, Any]:
         """Generate the configuration dictionary to run the container.
 
+        `resources` declared by the tool are applied as container limits.
+
         Returns:
             dict[str, Any]: Configuration for running the container.
         """
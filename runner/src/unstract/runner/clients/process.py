@@ -0,0 +1,265 @@
+"""Runs tools as local processes instead of containers.
+
+Meant for trusted first-party tools whose entry script and dependencies
+are installed on the runner host: a run costs a process start instead of
+a container start, and tools can be profiled without Docker. Tools are
+mapped to their entry script with `TOOL_PROCESS_CONFIG`, e.g.
+
+    {"unstract/tool-structure": {"script": "/tools/structure/src/main.py",
+                                 "python": "/tools/structure/.venv/bin/python"}}
+
+Runs are not isolated from the host, and resource limits are not applied.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import uuid
+from collections import deque
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Optional
+
+from unstract.runner.clients.helper import ContainerClientHelper
+from unstract.runner.clients.interface import (
+    ContainerClientInterface,
+    ContainerInterface,
+)
+from unstract.runner.constants import Env, ProcessClientKey, WarmPool
+from unstract.runner.scheduler import ToolResources
+from unstract.runner.utils import Utils
+
+logger = logging.getLogger(__name__)
+
+TOOL_SERVER_SOURCE = Path(__file__).with_name("tool_server.py").read_text()
+
+# Variables tool processes inherit from the runner, all others come from
+# the run request like they do for containers
+INHERITED_ENVS = ("PATH", "HOME", "LANG", "LC_ALL", "TMPDIR")
+
+
+def get_process_env(envs: dict[str, Any]) -> dict[str, str]:
+    env = {key: os.environ[key] for key in INHERITED_ENVS if key in os.environ}
+    env.update({key: str(value) for key, value in envs.items()})
+    return env
+
+
+class ProcessContainer(ContainerInterface):
+    """A tool run as a child process of the runner."""
+
+    def __init__(self, name: str, process: subprocess.Popen) -> None:
+        self._name = name
+        self.process = process
+
+    @property
+    def name(self):
+        return self._name
+
+    def logs(self, follow=True) -> Iterator[str]:
+        for line in self.process.stdout:
+            yield line.decode().strip()
+        self.process.wait()
+
+    def stop(self) -> None:
+        if self.process.poll() is None:
+            self.process.terminate()
+
+    def cleanup(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        self.process.stdout.close()
+
+
+def get_pool_key(script: str, envs: dict[str, Any]) -> str:
+    """Key of the fork servers interchangeable for a run of `script`."""
+    server_envs = {
+        key: value for key, value in envs.items() if key not in WarmPool.PER_RUN_ENVS
+    }
+    data = json.dumps([script, server_envs], sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class ForkServer:
+    """An interpreter with a tool imported, forking a child per run.
+
+    The server runs with the envs of the run it is started for, so they
+    apply to the tool's imports as well.
+    """
+
+    def __init__(self, python: str, script: str, envs: dict[str, Any]) -> None:
+        self.socket_path = os.path.join(
+            tempfile.gettempdir(), f"unstract-tool-{uuid.uuid4().hex[:12]}.sock"
+        )
+        self.process = subprocess.Popen(
+            [python, "-c", TOOL_SERVER_SOURCE, "serve", self.socket_path, script],
+            cwd=os.path.dirname(script),
+            env=get_process_env(envs),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def shutdown(self) -> None:
+        if self.is_alive():
+            os.killpg(self.process.pid, signal.SIGKILL)
+        self.process.wait()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class ForkServerContainer(ProcessContainer):
+    """A tool run forked from an idle `ForkServer`."""
+
+    def __init__(
+        self, name: str, process: subprocess.Popen, server: ForkServer, key: str
+    ) -> None:
+        super().__init__(name, process)
+        self.server = server
+        self.key = key
+
+    def stop(self) -> None:
+        # The forked child is only reachable through its server
+        self.server.shutdown()
+        super().stop()
+
+    def cleanup(self) -> None:
+        super().cleanup()
+        fork_servers.release(self.key, self.server, self.process.returncode == 0)
+
+
+class ForkServerPool:
+    """Keeps idle fork servers per tool entry script and envs.
+
+    Servers are only reused for runs with the same envs, apart from
+    `WarmPool.PER_RUN_ENVS`, as the tool was imported with them.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._lock = threading.Lock()
+        self._idle: dict[str, deque[ForkServer]] = {}
+
+    def acquire(
+        self, key: str, python: str, script: str, envs: dict[str, Any]
+    ) -> ForkServer:
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            while idle:
+                server = idle.popleft()
+                if server.is_alive():
+                    return server
+        return ForkServer(python, script, envs)
+
+    def release(self, key: str, server: ForkServer, healthy: bool) -> None:
+        if healthy and server.is_alive():
+            with self._lock:
+                idle = self._idle.setdefault(key, deque())
+                if len(idle) < self.size:
+                    idle.append(server)
+                    return
+        server.shutdown()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            servers = [server for idle in self._idle.values() for server in idle]
+            self._idle.clear()
+        for server in servers:
+            server.shutdown()
+
+
+# Shared by all requests of the process
+fork_servers = ForkServerPool(size=int(os.getenv(Env.TOOL_WARM_POOL_SIZE, 2)))
+atexit.register(fork_servers.shutdown)
+
+
+class Client(ContainerClientInterface):
+    def __init__(self, image_name: str, image_tag: str, logger: logging.Logger) -> None:
+        self.image_name = image_name
+        # If no image_tag is provided will assume the `latest` tag
+        self.image_tag = image_tag or "latest"
+        self.logger = logger
+        config = ContainerClientHelper.get_process_config().get(image_name, {})
+        self.script: str = config.get(ProcessClientKey.SCRIPT, "")
+        self.python: str = config.get(ProcessClientKey.PYTHON) or sys.executable
+        if not self.script:
+            raise ValueError(f"No entry script configured for tool {image_name}")
+
+    def get_image(self) -> str:
+        # Nothing to pull, the tool is installed on the host
+        return f"{self.image_name}:{self.image_tag}"
+
+    def get_container_run_config(
+        self,
+        command: list[str],
+        file_execution_id: str,
+        container_name: Optional[str] = None,
+        envs: Optional[dict[str, Any]] = None,
+        auto_remove: bool = False,
+        resources: Optional[ToolResources] = None,
+    ) -> dict[str, Any]:
+        if not container_name:
+            tool_name = self.image_name.split("/")[-1]
+            container_name = f"{tool_name}-{file_execution_id or uuid.uuid4().hex[:8]}"
+        return {
+            "name": container_name,
+            "image": self.get_image(),
+            "command": command,
+            "environment": envs or {},
+        }
+
+    def run_container(self, config: dict[Any, Any]) -> ContainerInterface:
+        self.logger.info(f"Running tool process {config['name']}: {self.script}")
+        process = subprocess.Popen(
+            [self.python, self.script, *config["command"]],
+            cwd=os.path.dirname(self.script),
+            env=get_process_env(config["environment"]),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        return ProcessContainer(config["name"], process)
+
+    def run_warm_container(
+        self,
+        command: list[str],
+        envs: dict[str, Any],
+        labels: Optional[list[str]] = None,
+        resources: Optional[ToolResources] = None,
+    ) -> Optional[ContainerInterface]:
+        if not Utils.is_warm_pool_enabled():
+            return None
+        key = get_pool_key(self.script, envs)
+        server = fork_servers.acquire(key, self.python, self.script, envs)
+        request = {"args": command, "envs": envs}
+        try:
+            process = subprocess.Popen(
+                [
+                    self.python,
+                    "-S",
+                    "-c",
+                    TOOL_SERVER_SOURCE,
+                    "request",
+                    server.socket_path,
+                ],
+                env={
+                    **get_process_env({}),
+                    WarmPool.REQUEST_ENV: json.dumps(request),
+                },
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+        except Exception:
+            fork_servers.release(key, server, healthy=False)
+            raise
+        name = f"{self.image_name.split('/')[-1]}-{uuid.uuid4().hex[:8]}"
+        return ForkServerContainer(name, process, server, key)
@@ -5,12 +5,23 @@ from unittest.mock import MagicMock
 import pytest
 from docker.errors import ImageNotFound
 from unstract.runner.constants import Env
+from unstract.runner.scheduler import ToolResources
 
-from .docker import Client, DockerContainer
+from .docker import Client, DockerClientFactory, DockerContainer, image_manager
 
 DOCKER_MODULE = "unstract.runner.clients.docker"
 
 
+@pytest.fixture(autouse=True)
+def reset_docker_client_factory():
+    """Clients are shared across requests, start each test without one."""
+    DockerClientFactory.reset()
+    image_manager.clear()
+    yield
+    DockerClientFactory.reset()
+    image_manager.clear()
+
+
 @pytest.fixture
 def docker_container():
     container = MagicMock()
@@ -61,6 +72,36 @@ def test_client_init(mocker):
     assert client_instance.client is not None
 
 
+def test_client_shared(mocker):
+    """Test the Docker client is created once and shared by clients."""
+    mock_from_env = mocker.patch(f"{DOCKER_MODULE}.DockerClient.from_env")
+    first = Client("test-image", "latest", logging.getLogger("test-logger"))
+    second = Client("other-image", "1.0", logging.getLogger("test-logger"))
+
+    mock_from_env.assert_called_once()
+    assert first.client is second.client
+
+
+def test_private_login_cached(mocker):
+    """Test the registry login is reused until it expires."""
+    mock_from_env = mocker.patch(f"{DOCKER_MODULE}.DockerClient.from_env")
+    mocker.patch.dict(
+        os.environ,
+        {
+            Env.PRIVATE_REGISTRY_CREDENTIAL_PATH: "/creds",
+            Env.PRIVATE_REGISTRY_USERNAME: "user",
+            Env.PRIVATE_REGISTRY_URL: "registry",
+        },
+    )
+    mocker.patch("builtins.open", mocker.mock_open(read_data="secret"))
+    Client("test-image", "latest", logging.getLogger("test-logger"))
+    Client("test-image", "latest", logging.getLogger("test-logger"))
+
+    mock_from_env.return_value.login.assert_called_once_with(
+        username="user", password="secret", registry="registry", reauth=False
+    )
+
+
 def test_get_image_exists(docker_client, mocker):
     """Test the __image_exists method."""
     # Mock the client object
@@ -89,7 +130,12 @@ def test_get_image(docker_client, mocker):
     assert docker_client.get_image() == "test-image:latest"
     mock_images.get.assert_called_once_with("test-image:latest")  # Ensure get is called
 
-    # Case 2: Image does not exist
+    # Case 2: Image is known to be present
+    assert docker_client.get_image() == "test-image:latest"
+    mock_images.get.assert_called_once()
+
+    # Case 3: Image does not exist
+    image_manager.clear()
     mock_images.get.side_effect = ImageNotFound(
         "Image not found"
     )  # Mock that image doesn't exist
@@ -159,6 +205,19 @@ def test_get_container_run_config_without_mount(docker_client, mocker):
     assert config["mounts"] == []
 
 
+def test_get_container_run_config_resources(docker_client, mocker):
+    """Test resources declared by the tool are applied as limits."""
+    mocker.patch.object(docker_client, "_Client__image_exists", return_value=True)
+    config = docker_client.get_container_run_config(
+        ["echo", "hello"],
+        "run123",
+        resources=ToolResources(cpus=1.5, memory=512 * 1024**2),
+    )
+
+    assert config["nano_cpus"] == 1_500_000_000
+    assert config["mem_limit"] == 512 * 1024**2
+
+
 def test_run_container(docker_client, mocker):
     """Test the run_container method."""
     # Patch the client object to control its behavior
@@ -0,0 +1,52 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from .image_manager import ImageManager
+
+
+@pytest.fixture
+def image_manager():
+    return ImageManager()
+
+
+def test_present_image_not_fetched_again(image_manager):
+    """Test an image is only fetched until it is known to be present."""
+    fetch = MagicMock()
+    image_manager.ensure("tool:1", fetch)
+    image_manager.ensure("tool:1", fetch)
+
+    fetch.assert_called_once()
+
+
+def test_concurrent_pulls_deduplicated(image_manager):
+    """Test concurrent requests for a missing image share one pull."""
+    started = threading.Event()
+    release = threading.Event()
+    fetch = MagicMock(side_effect=lambda: (started.set(), release.wait()))
+
+    leader = threading.Thread(target=image_manager.ensure, args=("tool:1", fetch))
+    leader.start()
+    started.wait()
+    followers = [
+        threading.Thread(target=image_manager.ensure, args=("tool:1", fetch))
+        for _ in range(3)
+    ]
+    for follower in followers:
+        follower.start()
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    fetch.assert_called_once()
+
+
+def test_failed_pull_retried(image_manager):
+    """Test a failed pull is not cached and is attempted again."""
+    fetch = MagicMock(side_effect=[RuntimeError("pull failed"), None])
+    with pytest.raises(RuntimeError):
+        image_manager.ensure("tool:1", fetch)
+    image_manager.ensure("tool:1", fetch)
+
+    assert fetch.call_count == 2
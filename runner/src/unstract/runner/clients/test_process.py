@@ -0,0 +1,103 @@
+import json
+import logging
+import sys
+
+import pytest
+from unstract.runner.constants import Env
+
+from .process import Client, fork_servers
+
+TOOL_SCRIPT = """
+import json
+import os
+import sys
+
+# Read at import, like tools configuring their clients
+IMPORT_ENV = os.environ.get("TOOL_ENV")
+
+if __name__ == "__main__":
+    print(
+        json.dumps(
+            {
+                "args": sys.argv[1:],
+                "env": os.environ.get("TOOL_ENV"),
+                "import_env": IMPORT_ENV,
+            }
+        )
+    )
+    sys.exit(int(os.environ.get("TOOL_EXIT_CODE", "0")))
+"""
+
+
+@pytest.fixture
+def process_client(tmp_path, monkeypatch):
+    script = tmp_path / "main.py"
+    script.write_text(TOOL_SCRIPT)
+    monkeypatch.setenv(
+        Env.TOOL_PROCESS_CONFIG,
+        json.dumps({"tool": {"script": str(script), "python": sys.executable}}),
+    )
+    yield Client("tool", "latest", logging.getLogger("test-logger"))
+    fork_servers.shutdown()
+
+
+def _run(container):
+    lines = [line for line in container.logs() if line]
+    container.cleanup()
+    return json.loads(lines[-1])
+
+
+def test_run_process(process_client):
+    """Test the tool runs with the command and envs of the request."""
+    config = process_client.get_container_run_config(
+        command=["--command", "SPEC"], file_execution_id="", envs={"TOOL_ENV": 1}
+    )
+    container = process_client.run_container(config)
+
+    assert _run(container) == {
+        "args": ["--command", "SPEC"],
+        "env": "1",
+        "import_env": "1",
+    }
+    assert container.process.returncode == 0
+
+
+def test_run_forked(process_client, monkeypatch):
+    """Test runs are forked from a reused server with the tool imported."""
+    monkeypatch.setenv(Env.TOOL_WARM_POOL_ENABLED, "true")
+    first = process_client.run_warm_container(
+        ["--command", "RUN"], {"TOOL_ENV": 1, Env.EXECUTION_DATA_DIR: "/data/1"}
+    )
+    assert _run(first) == {"args": ["--command", "RUN"], "env": "1", "import_env": "1"}
+    second = process_client.run_warm_container(
+        ["--command", "RUN"], {"TOOL_ENV": 1, Env.EXECUTION_DATA_DIR: "/data/2"}
+    )
+    assert _run(second) == {
+        "args": ["--command", "RUN"],
+        "env": "1",
+        "import_env": "1",
+    }
+
+    assert second.server is first.server
+
+
+def test_forked_runs_with_other_envs(process_client, monkeypatch):
+    """Test runs with other envs get a server which imported the tool with
+    their envs."""
+    monkeypatch.setenv(Env.TOOL_WARM_POOL_ENABLED, "true")
+    first = process_client.run_warm_container([], {"TOOL_ENV": 1})
+    assert _run(first)["import_env"] == "1"
+    second = process_client.run_warm_container([], {"TOOL_ENV": 2})
+
+    assert _run(second) == {"args": [], "env": "2", "import_env": "2"}
+    assert second.server is not first.server
+
+
+def test_failed_run_discards_server(process_client, monkeypatch):
+    """Test a server is not reused after a failed run."""
+    monkeypatch.setenv(Env.TOOL_WARM_POOL_ENABLED, "true")
+    container = process_client.run_warm_container([], {"TOOL_EXIT_CODE": 3})
+    _run(container)
+
+    assert container.process.returncode == 3
+    assert not container.server.is_alive()
@@ -0,0 +1,141 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from .warm_pool import WarmContainerPool
+
+
+@pytest.fixture
+def docker_client():
+    client = MagicMock()
+    client.images.get.return_value.attrs = {
+        "Config": {"Entrypoint": ["python", "main.py"], "WorkingDir": "/app/src"}
+    }
+    client.containers.run.side_effect = lambda **kwargs: MagicMock(
+        id=kwargs["name"], name=kwargs["name"], status="running"
+    )
+    return client
+
+
+@pytest.fixture
+def warm_pool(mocker):
+    pool = WarmContainerPool(size=1, max_files=2)
+    # Replenishing runs in a background thread, keep tests deterministic
+    mocker.patch.object(pool, "_request_replenish")
+    return pool
+
+
+def test_python_entrypoint(warm_pool, docker_client):
+    """Test the tool script is resolved from the image entrypoint."""
+    assert warm_pool.get_python_entrypoint(docker_client, "tool:1") == (
+        "python",
+        "/app/src/main.py",
+    )
+
+
+def test_unsupported_entrypoint(warm_pool, docker_client):
+    """Test images not running a python script are not served warm."""
+    docker_client.images.get.return_value.attrs = {
+        "Config": {"Entrypoint": ["/bin/sh", "-c", "run"]}
+    }
+    assert warm_pool.run(docker_client, "tool:1", args=[], envs={}) is None
+    docker_client.containers.run.assert_not_called()
+
+
+def test_container_reused(warm_pool, docker_client):
+    """Test a released container serves the next run of the image."""
+    first = warm_pool.run(docker_client, "tool:1", args=[], envs={})
+    first.exit_code = 0
+    first.cleanup()
+    second = warm_pool.run(docker_client, "tool:1", args=[], envs={})
+
+    assert second.container is first.container
+    docker_client.containers.run.assert_called_once()
+
+
+def test_container_recycled_after_max_files(warm_pool, docker_client):
+    """Test a container is removed after serving max_files runs."""
+    for _ in range(2):
+        run = warm_pool.run(docker_client, "tool:1", args=[], envs={})
+        run.exit_code = 0
+        run.cleanup()
+
+    run.container.remove.assert_called_once_with(force=True)
+
+
+def test_container_recycled_on_failure(warm_pool, docker_client):
+    """Test a container is removed when its run did not succeed."""
+    run = warm_pool.run(docker_client, "tool:1", args=[], envs={})
+    run.exit_code = 1
+    run.cleanup()
+
+    run.container.remove.assert_called_once_with(force=True)
+    assert not any(warm_pool._idle.values())
+
+
+def test_dead_container_falls_back_to_cold_start(warm_pool, docker_client):
+    """Test an idle container which stopped is replaced by a new one."""
+    first = warm_pool.run(docker_client, "tool:1", args=[], envs={})
+    first.exit_code = 0
+    first.cleanup()
+    first.container.status = "exited"
+    second = warm_pool.run(docker_client, "tool:1", args=[], envs={})
+
+    assert second.container is not first.container
+    first.container.remove.assert_called_once_with(force=True)
+    assert docker_client.containers.run.call_count == 2
+
+
+def test_container_started_with_run_envs(warm_pool, docker_client):
+    """Test containers are started with the envs of their run and only
+    reused for runs with the same envs."""
+    first = warm_pool.run(docker_client, "tool:1", args=[], envs={"KEY": "a"})
+    first.exit_code = 0
+    first.cleanup()
+    second = warm_pool.run(docker_client, "tool:1", args=[], envs={"KEY": "b"})
+
+    assert second.container is not first.container
+    environments = [
+        call.kwargs["environment"] for call in docker_client.containers.run.mock_calls
+    ]
+    assert environments == [{"KEY": "a"}, {"KEY": "b"}]
+
+
+def test_container_reused_across_executions(warm_pool, docker_client):
+    """Test envs differing per run don't prevent reusing a container."""
+    first = warm_pool.run(
+        docker_client, "tool:1", args=[], envs={"EXECUTION_DATA_DIR": "/a"}
+    )
+    first.exit_code = 0
+    first.cleanup()
+    second = warm_pool.run(
+        docker_client, "tool:1", args=[], envs={"EXECUTION_DATA_DIR": "/b"}
+    )
+
+    assert second.container is first.container
+
+
+def test_container_started_with_limits(warm_pool, docker_client):
+    """Test containers are started with the resource limits of their run
+    and only reused for runs with the same limits."""
+    limits = {"nano_cpus": 2 * 10**9, "mem_limit": 4 * 1024**3}
+    first = warm_pool.run(docker_client, "tool:1", args=[], envs={}, limits=limits)
+    first.exit_code = 0
+    first.cleanup()
+    second = warm_pool.run(docker_client, "tool:1", args=[], envs={})
+
+    assert second.container is not first.container
+    first_call, second_call = docker_client.containers.run.mock_calls
+    assert first_call.kwargs["nano_cpus"] == 2 * 10**9
+    assert first_call.kwargs["mem_limit"] == 4 * 1024**3
+    assert "mem_limit" not in second_call.kwargs
+
+
+def test_single_replenisher(mocker, docker_client):
+    """Test pools are replenished by one thread, once per pool at a time."""
+    pool = WarmContainerPool(size=1, max_files=2)
+    mocker.patch.object(pool, "_replenish_forever")
+    for _ in range(3):
+        pool.run(docker_client, "tool:1", args=[], envs={})
+
+    assert pool._replenish_queue.qsize() == 1
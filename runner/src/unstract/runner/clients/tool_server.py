@@ -0,0 +1,137 @@
+"""Fork server which runs inside a warm tool container.
+
+This module is not imported by the runner. Its source is passed to the
+tool image's python interpreter with `python -c`, so it must only depend on
+the standard library and stay compatible with the oldest python used by
+tool images.
+
+`serve` imports the tool's entry script once, without running it, and then
+forks a child per request which runs the script as `__main__`. Children
+start with the interpreter booted and the SDK imported, so a file only pays
+for the tool's own work. `request` is the client exec'd by the runner for
+every file. It streams the output of the child to stdout and exits with the
+child's exit code.
+"""
+
+import json
+import os
+import runpy
+import socket
+import sys
+import time
+import traceback
+
+EXIT_CODE_MARKER = "__UNSTRACT_TOOL_EXIT_CODE__"
+REQUEST_ENV = "UNSTRACT_TOOL_REQUEST"
+CONNECT_TIMEOUT = 120
+
+
+def _read_request(conn):
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return json.loads(b"".join(chunks).decode("utf-8"))
+
+
+def _run_child(conn, entry_script, request):
+    fd = conn.fileno()
+    os.dup2(fd, 1)
+    os.dup2(fd, 2)
+    os.environ.update({key: str(value) for key, value in request["envs"].items()})
+    sys.argv = [entry_script] + request["args"]
+    exit_code = 0
+    try:
+        runpy.run_path(entry_script, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(exit_code)
+
+
+def serve(socket_path, entry_script):
+    script_dir = os.path.dirname(os.path.abspath(entry_script))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+    # Executes the module level imports of the tool without launching it
+    runpy.run_path(entry_script, run_name="__unstract_preload__")
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(1)
+    while True:
+        conn, _ = server.accept()
+        try:
+            request = _read_request(conn)
+            pid = os.fork()
+            if pid == 0:
+                server.close()
+                _run_child(conn, entry_script, request)
+            _, status = os.waitpid(pid, 0)
+            if os.WIFEXITED(status):
+                exit_code = os.WEXITSTATUS(status)
+            else:
+                exit_code = 128 + os.WTERMSIG(status)
+            conn.sendall(f"\n{EXIT_CODE_MARKER}{exit_code}\n".encode("utf-8"))
+        except Exception:
+            traceback.print_exc()
+        finally:
+            conn.close()
+
+
+def request(socket_path):
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    deadline = time.monotonic() + CONNECT_TIMEOUT
+    # The server only listens once the tool's imports are done
+    while True:
+        try:
+            conn.connect(socket_path)
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+    conn.sendall(os.environ[REQUEST_ENV].encode("utf-8"))
+    conn.shutdown(socket.SHUT_WR)
+
+    out = sys.stdout.buffer
+    marker = EXIT_CODE_MARKER.encode("utf-8")
+    exit_code = 1
+    pending = b""
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.startswith(marker):
+                exit_code = int(line.split(marker, 1)[1])
+                continue
+            out.write(line + b"\n")
+        out.flush()
+    if pending:
+        out.write(pending)
+        out.flush()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    if sys.argv[1] == "serve":
+        serve(socket_path=sys.argv[2], entry_script=sys.argv[3])
+    else:
+        request(socket_path=sys.argv[2])
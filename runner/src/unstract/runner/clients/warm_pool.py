@@ -0,0 +1,339 @@
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import uuid
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from docker.models.containers import Container
+from unstract.runner.clients.interface import ContainerInterface
+from unstract.runner.constants import Env, WarmPool
+
+from docker import DockerClient
+
+logger = logging.getLogger(__name__)
+
+TOOL_SERVER_SOURCE = Path(__file__).with_name("tool_server.py").read_text()
+
+
+class WarmContainer(ContainerInterface):
+    """A file run inside a long lived tool container.
+
+    The file is handed to the fork server of the container through
+    `docker exec`. Cleaning up returns the container to its pool, or
+    discards it when the run did not complete successfully.
+    """
+
+    def __init__(
+        self,
+        pool: "WarmContainerPool",
+        container: Container,
+        python: str,
+        args: list[str],
+        envs: dict[str, Any],
+    ) -> None:
+        self.pool = pool
+        self.container = container
+        self.exit_code: Optional[int] = None
+        api = container.client.api
+        request = {"args": args, "envs": envs}
+        self._exec_id = api.exec_create(
+            container.id,
+            cmd=[
+                python,
+                "-S",
+                "-c",
+                TOOL_SERVER_SOURCE,
+                "request",
+                WarmPool.SOCKET_PATH,
+            ],
+            environment={WarmPool.REQUEST_ENV: json.dumps(request)},
+        )["Id"]
+
+    @property
+    def name(self):
+        return self.container.name
+
+    def logs(self, follow=True) -> Iterator[str]:
+        api = self.container.client.api
+        pending = b""
+        for chunk in api.exec_start(self._exec_id, stream=True):
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield line.decode().strip()
+        if pending:
+            yield pending.decode().strip()
+        self.exit_code = api.exec_inspect(self._exec_id).get("ExitCode")
+
+    def stop(self) -> None:
+        # The forked tool process can't be reached from outside the container
+        self.container.stop(timeout=5)
+
+    def cleanup(self) -> None:
+        # A run abandoned mid-stream may still be executing in the container
+        self.pool.release(self.container, healthy=self.exit_code == 0)
+
+
+# Pools waiting to be replenished at most
+REPLENISH_BACKLOG = 64
+
+
+@dataclass(frozen=True)
+class PoolKey:
+    """Identifies the containers interchangeable for a run."""
+
+    image: str
+    config_hash: str
+
+    @classmethod
+    def create(
+        cls, image: str, envs: dict[str, Any], limits: dict[str, Any]
+    ) -> "PoolKey":
+        container_envs = {
+            key: value
+            for key, value in envs.items()
+            if key not in WarmPool.PER_RUN_ENVS
+        }
+        data = json.dumps([container_envs, limits], sort_keys=True, default=str)
+        return cls(image=image, config_hash=hashlib.sha256(data.encode()).hexdigest())
+
+
+@dataclass
+class ContainerSpec:
+    """Everything needed to start a container of a pool."""
+
+    client: DockerClient
+    image: str
+    entrypoint: tuple[str, str]
+    envs: dict[str, Any]
+    labels: Optional[list[str]]
+    limits: dict[str, Any]
+
+
+class WarmContainerPool:
+    """Keeps idle tool containers per image to skip container cold starts.
+
+    Containers run the tool's entry script under a fork server which has
+    the tool and the SDK already imported. The envs of the run a container
+    is started for are set on the container, so they apply to the imports
+    as well. Containers are only reused for runs with the same image,
+    resource limits and envs, apart from `WarmPool.PER_RUN_ENVS`.
+
+    At most `size` idle containers are kept per pool, and a container is
+    recycled after `max_files` runs or as soon as a run fails. Idle
+    containers are checked to be running before they are handed out, a
+    run falls back to a new container otherwise. Pools are topped up by a
+    single background thread.
+    """
+
+    def __init__(self, size: int, max_files: int) -> None:
+        self.size = size
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._idle: dict[PoolKey, deque[Container]] = {}
+        self._uses: dict[str, int] = {}
+        self._pool_keys: dict[str, PoolKey] = {}
+        self._specs: dict[PoolKey, ContainerSpec] = {}
+        self._entrypoints: dict[str, Optional[tuple[str, str]]] = {}
+        self._replenish_queue: queue.Queue[PoolKey] = queue.Queue(
+            maxsize=REPLENISH_BACKLOG
+        )
+        # Pools queued for replenishing, each is queued once at a time
+        self._replenish_pending: set[PoolKey] = set()
+        self._replenisher: Optional[threading.Thread] = None
+
+    def get_python_entrypoint(
+        self, client: DockerClient, image: str
+    ) -> Optional[tuple[str, str]]:
+        """Interpreter and absolute script path an image runs, if any.
+
+        Only images whose entrypoint is `python <script>.py` can be served
+        from warm containers.
+        """
+        if image not in self._entrypoints:
+            config = client.images.get(image).attrs.get("Config", {})
+            entrypoint = config.get("Entrypoint") or []
+            python_entrypoint = None
+            if (
+                len(entrypoint) == 2
+                and os.path.basename(entrypoint[0]).startswith("python")
+                and entrypoint[1].endswith(".py")
+            ):
+                python_entrypoint = (
+                    entrypoint[0],
+                    os.path.join(config.get("WorkingDir") or "/", entrypoint[1]),
+                )
+            self._entrypoints[image] = python_entrypoint
+        return self._entrypoints[image]
+
+    def run(
+        self,
+        client: DockerClient,
+        image: str,
+        args: list[str],
+        envs: dict[str, Any],
+        labels: Optional[list[str]] = None,
+        limits: Optional[dict[str, Any]] = None,
+    ) -> Optional[WarmContainer]:
+        """Run a tool command in a warm container of the image.
+
+        `limits` are the resource limits (`nano_cpus`, `mem_limit`) set on
+        the containers started for the run.
+
+        Returns:
+            Optional[WarmContainer]: None if the image can't run warm
+        """
+        entrypoint = self.get_python_entrypoint(client, image)
+        if not entrypoint:
+            return None
+        limits = limits or {}
+        pool_key = PoolKey.create(image, envs, limits)
+        with self._lock:
+            self._specs[pool_key] = ContainerSpec(
+                client=client,
+                image=image,
+                entrypoint=entrypoint,
+                envs=envs,
+                labels=labels,
+                limits=limits,
+            )
+        container = self._acquire(pool_key)
+        self._request_replenish(pool_key)
+        if container:
+            try:
+                return WarmContainer(
+                    self, container, python=entrypoint[0], args=args, envs=envs
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Warm container {container.name} failed, starting a new "
+                    f"one: {e}"
+                )
+                self.release(container, healthy=False)
+        # Cold start, the container joins the pool once the run is done
+        container = self._start(pool_key)
+        try:
+            return WarmContainer(
+                self, container, python=entrypoint[0], args=args, envs=envs
+            )
+        except Exception:
+            self.release(container, healthy=False)
+            raise
+
+    def _acquire(self, pool_key: PoolKey) -> Optional[Container]:
+        """Idle container of the pool which is still running, if any."""
+        while True:
+            with self._lock:
+                idle = self._idle.get(pool_key)
+                container = idle.popleft() if idle else None
+            if container is None:
+                return None
+            try:
+                container.reload()
+                if container.status == "running":
+                    return container
+                logger.warning(f"Warm container {container.name} is {container.status}")
+            except Exception as e:
+                logger.warning(f"Failed to inspect warm container: {e}")
+            self._remove(container)
+
+    def _start(self, pool_key: PoolKey) -> Container:
+        with self._lock:
+            spec = self._specs[pool_key]
+        python, entry_script = spec.entrypoint
+        tool_name = spec.image.split("/")[-1].replace(":", "-")
+        container = spec.client.containers.run(
+            image=spec.image,
+            name=f"unstract-warm-{tool_name}-{uuid.uuid4().hex[:8]}",
+            entrypoint=[python, "-c", TOOL_SERVER_SOURCE],
+            command=["serve", WarmPool.SOCKET_PATH, entry_script],
+            detach=True,
+            environment=spec.envs,
+            network=os.getenv(Env.TOOL_CONTAINER_NETWORK, ""),
+            labels=spec.labels or [],
+            **spec.limits,
+        )
+        with self._lock:
+            self._uses[container.id] = 0
+            self._pool_keys[container.id] = pool_key
+        logger.info(f"Started warm container {container.name} for {spec.image}")
+        return container
+
+    def _request_replenish(self, pool_key: PoolKey) -> None:
+        with self._lock:
+            if pool_key in self._replenish_pending:
+                return
+            try:
+                self._replenish_queue.put_nowait(pool_key)
+            except queue.Full:
+                # Topped up on one of the next runs
+                return
+            self._replenish_pending.add(pool_key)
+            if self._replenisher is None or not self._replenisher.is_alive():
+                self._replenisher = threading.Thread(
+                    target=self._replenish_forever,
+                    name="warm-pool-replenisher",
+                    daemon=True,
+                )
+                self._replenisher.start()
+
+    def _replenish_forever(self) -> None:
+        while True:
+            pool_key = self._replenish_queue.get()
+            with self._lock:
+                self._replenish_pending.discard(pool_key)
+            self._replenish(pool_key)
+
+    def _replenish(self, pool_key: PoolKey) -> None:
+        with self._lock:
+            if len(self._idle.get(pool_key, ())) >= self.size:
+                return
+        try:
+            container = self._start(pool_key)
+        except Exception as e:
+            logger.warning(f"Failed to start warm container for {pool_key.image}: {e}")
+            return
+        self._add_idle(container)
+
+    def _add_idle(self, container: Container) -> None:
+        with self._lock:
+            pool_key = self._pool_keys[container.id]
+            idle = self._idle.setdefault(pool_key, deque())
+            if len(idle) < self.size:
+                idle.append(container)
+                return
+        self._remove(container)
+
+    def release(self, container: Container, healthy: bool) -> None:
+        """Return a container after a run, recycling it if needed."""
+        with self._lock:
+            self._uses[container.id] = self._uses.get(container.id, 0) + 1
+            recycle = not healthy or self._uses[container.id] >= self.max_files
+        if recycle:
+            self._remove(container)
+        else:
+            self._add_idle(container)
+
+    def _remove(self, container: Container) -> None:
+        with self._lock:
+            self._uses.pop(container.id, None)
+            self._pool_keys.pop(container.id, None)
+        try:
+            container.remove(force=True)
+        except Exception as e:
+            logger.warning(f"Failed to remove warm container {container.name}: {e}")
+
+    def shutdown(self) -> None:
+        """Remove all idle containers."""
+        with self._lock:
+            containers = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for container in containers:
+            self._remove(container)
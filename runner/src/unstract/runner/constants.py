@@ -17,12 +17,20 @@ class ToolKey:
     TOOL_INSTANCE_ID = "tool_instance_id"
 
 
+class ToolCommand:
+    PROPERTIES = "properties"
+    # Commands whose output only depends on the tool image
+    METADATA = (PROPERTIES, "spec", "variables", "icon")
+
+
 class Env:
     TOOL_CONTAINER_NETWORK = "TOOL_CONTAINER_NETWORK"
     TOOL_CONTAINER_LABELS = "TOOL_CONTAINER_LABELS"
     PRIVATE_REGISTRY_CREDENTIAL_PATH = "PRIVATE_REGISTRY_CREDENTIAL_PATH"
     PRIVATE_REGISTRY_USERNAME = "PRIVATE_REGISTRY_USERNAME"
     PRIVATE_REGISTRY_URL = "PRIVATE_REGISTRY_URL"
+    PRIVATE_REGISTRY_LOGIN_TTL = "PRIVATE_REGISTRY_LOGIN_TTL"
+    DOCKER_CLIENT_POOL_SIZE = "DOCKER_CLIENT_POOL_SIZE"
     LOG_LEVEL = "LOG_LEVEL"
     REMOVE_CONTAINER_ON_EXIT = "REMOVE_CONTAINER_ON_EXIT"
     WORKFLOW_EXECUTION_DIR_PREFIX = "WORKFLOW_EXECUTION_DIR_PREFIX"
@@ -31,3 +39,89 @@ class Env:
     )
     EXECUTION_DATA_DIR = "EXECUTION_DATA_DIR"
     FLIPT_SERVICE_AVAILABLE = "FLIPT_SERVICE_AVAILABLE"
+    TOOL_WARM_POOL_ENABLED = "TOOL_WARM_POOL_ENABLED"
+    TOOL_WARM_POOL_SIZE = "TOOL_WARM_POOL_SIZE"
+    TOOL_WARM_POOL_MAX_FILES = "TOOL_WARM_POOL_MAX_FILES"
+    RUNNER_MAX_CONCURRENT_JOBS = "RUNNER_MAX_CONCURRENT_JOBS"
+    RUNNER_JOB_RESULT_TTL = "RUNNER_JOB_RESULT_TTL"
+    TOOL_REGISTRY_CONFIG_PATH = "TOOL_REGISTRY_CONFIG_PATH"
+    TOOL_PREPULL_ENABLED = "TOOL_PREPULL_ENABLED"
+    TOOL_PREPULL_IMAGES = "TOOL_PREPULL_IMAGES"
+    TOOL_PREPULL_INTERVAL = "TOOL_PREPULL_INTERVAL"
+    TOOL_METADATA_CACHE_DIR = "TOOL_METADATA_CACHE_DIR"
+    TOOL_METADATA_CACHE_SIZE = "TOOL_METADATA_CACHE_SIZE"
+    LOG_BATCH_MAX_LINES = "LOG_BATCH_MAX_LINES"
+    LOG_BATCH_MAX_DELAY_MS = "LOG_BATCH_MAX_DELAY_MS"
+    RUNNER_SCHEDULER_ENABLED = "RUNNER_SCHEDULER_ENABLED"
+    RUNNER_WORKERS = "RUNNER_WORKERS"
+    RUNNER_CPU_CAPACITY = "RUNNER_CPU_CAPACITY"
+    RUNNER_MEMORY_CAPACITY = "RUNNER_MEMORY_CAPACITY"
+    TOOL_DEFAULT_CPUS = "TOOL_DEFAULT_CPUS"
+    TOOL_DEFAULT_MEMORY = "TOOL_DEFAULT_MEMORY"
+    TOOL_PROCESS_CONFIG = "TOOL_PROCESS_CONFIG"
+
+
+class ToolRegistry:
+    # Must match the files written by unstract-tool-registry
+    TOOL_FILES = ("public_tools.json", "private_tools.json")
+    IMAGE_NAME = "image_name"
+    IMAGE_TAG = "image_tag"
+
+
+class RunPhase:
+    IMAGE_CHECK = "image_check"
+    QUEUE = "queue"
+    CONTAINER_START = "container_start"
+    # From the container start until the tool printed its first line
+    TOOL_STARTUP = "tool_startup"
+    TOOL_RUN = "tool_run"
+    CLEANUP = "cleanup"
+
+
+class ToolResourceKey:
+    # Optional resource hints of a tool's properties
+    RESOURCES = "resources"
+    CPU = "cpu"
+    MEMORY = "memory"
+
+
+class WarmPool:
+    # Must match the constants of clients/tool_server.py
+    SOCKET_PATH = "/tmp/unstract-tool.sock"
+    REQUEST_ENV = "UNSTRACT_TOOL_REQUEST"
+    # Envs which differ between runs of a pooled tool, they are only read
+    # by the tool once a file is run and don't need a pool of their own
+    PER_RUN_ENVS = (Env.EXECUTION_DATA_DIR,)
+
+
+class ProcessClientKey:
+    CLIENT_PATH = "unstract.runner.clients.process"
+    SCRIPT = "script"
+    PYTHON = "python"
+
+
+class JobStatus:
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+    # The runner process supervising the job died before it finished
+    ORPHANED = "ORPHANED"
+    FINISHED = {COMPLETED, FAILED, CANCELLED, ORPHANED}
+
+
+class JobKey:
+    PREFIX = "runner:job"
+    CANCEL_CHANNEL = "runner:job:cancel"
+    POLL_INTERVAL = 0.25
+    # Upper bound for a single long-poll request, in seconds
+    MAX_WAIT = 60
+    # Seconds an unfinished job outlives the last heartbeat of its process
+    HEARTBEAT_TTL = 30
+    HEARTBEAT_INTERVAL = 10
+    JOB_ID = "job_id"
+    STATUS = "status"
+    RESULT = "result"
+    CREATED_AT = "created_at"
+    FINISHED_AT = "finished_at"
@@ -2,3 +2,9 @@ class ToolRunException(Exception):
     def __init__(self, message):
         self.message = message
         super().__init__(self.message)
+
+
+class RegistryAuthError(Exception):
+    """Raised when the registry denies access to an image."""
+
+    pass
@@ -0,0 +1,246 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+import redis
+from unstract.runner.constants import Env, JobKey, JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+class JobManager:
+    """Runs tool containers as background jobs.
+
+    Job state lives in Redis so that any worker process or runner replica
+    can answer status requests, while the container is supervised by the
+    process which accepted the job. Cancellation requests are broadcast
+    over a Redis channel and acted upon by that process.
+
+    Unfinished jobs are kept alive by heartbeats of their process, which
+    also renew the job's expiry, so a job never expires while it runs. A
+    job whose heartbeat stopped is reported as orphaned. Finished jobs
+    expire after `result_ttl` seconds.
+    """
+
+    def __init__(self, max_jobs: int, result_ttl: int) -> None:
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_jobs, thread_name_prefix="container-job"
+        )
+        self._redis = redis.Redis(
+            host=os.environ.get("REDIS_HOST", "localhost"),
+            port=int(os.environ.get("REDIS_PORT", 6379)),
+            username=os.environ.get("REDIS_USER"),
+            password=os.environ.get("REDIS_PASSWORD"),
+        )
+        self._lock = threading.Lock()
+        # Cancel callbacks of the jobs supervised by this process
+        self._cancel_callbacks: dict[str, Callable[[], None]] = {}
+        self._listener: Optional[threading.Thread] = None
+        # Unfinished jobs supervised by this process
+        self._active_jobs: set[str] = set()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _job_key(job_id: str) -> str:
+        return f"{JobKey.PREFIX}:{job_id}"
+
+    @staticmethod
+    def _cancel_key(job_id: str) -> str:
+        return f"{JobKey.PREFIX}:{job_id}:cancel"
+
+    @staticmethod
+    def _heartbeat_key(job_id: str) -> str:
+        return f"{JobKey.PREFIX}:{job_id}:heartbeat"
+
+    def _save(self, job: dict[str, Any]) -> None:
+        job_id = job[JobKey.JOB_ID]
+        pipeline = self._redis.pipeline()
+        pipeline.setex(self._job_key(job_id), self.result_ttl, json.dumps(job))
+        if job[JobKey.STATUS] in JobStatus.FINISHED:
+            pipeline.delete(self._heartbeat_key(job_id))
+        else:
+            pipeline.setex(self._heartbeat_key(job_id), JobKey.HEARTBEAT_TTL, 1)
+        pipeline.execute()
+
+    def _ensure_heartbeat(self) -> None:
+        with self._lock:
+            if self._heartbeat and self._heartbeat.is_alive():
+                return
+            self._heartbeat = threading.Thread(
+                target=self._send_heartbeats,
+                name="container-job-heartbeat",
+                daemon=True,
+            )
+            self._heartbeat.start()
+
+    def _send_heartbeats(self) -> None:
+        while True:
+            time.sleep(JobKey.HEARTBEAT_INTERVAL)
+            with self._lock:
+                job_ids = list(self._active_jobs)
+            if not job_ids:
+                continue
+            try:
+                pipeline = self._redis.pipeline()
+                for job_id in job_ids:
+                    pipeline.expire(self._job_key(job_id), self.result_ttl)
+                    pipeline.setex(self._heartbeat_key(job_id), JobKey.HEARTBEAT_TTL, 1)
+                pipeline.execute()
+            except Exception as e:
+                logger.warning(f"Failed to send job heartbeats: {e}")
+
+    def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        """Get the state of a job.
+
+        Args:
+            job_id (str): Id returned by `submit`
+
+        Returns:
+            Optional[dict[str, Any]]: The job, None if unknown or expired
+        """
+        pipeline = self._redis.pipeline()
+        pipeline.get(self._job_key(job_id))
+        pipeline.exists(self._heartbeat_key(job_id))
+        data, alive = pipeline.execute()
+        if data is None:
+            return None
+        job: dict[str, Any] = json.loads(data)
+        if job[JobKey.STATUS] not in JobStatus.FINISHED and not alive:
+            logger.warning(f"Job {job_id} lost its runner process")
+            self._finish(job, JobStatus.ORPHANED)
+        return job
+
+    def wait(self, job_id: str, timeout: float) -> Optional[dict[str, Any]]:
+        """Get the state of a job, waiting up to `timeout` for it to finish."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if (
+                job is None
+                or job[JobKey.STATUS] in JobStatus.FINISHED
+                or time.monotonic() >= deadline
+            ):
+                return job
+            time.sleep(JobKey.POLL_INTERVAL)
+
+    def submit(
+        self,
+        run: Callable[[], Optional[dict[str, Any]]],
+        cancel: Callable[[], None],
+    ) -> dict[str, Any]:
+        """Submit a job for background execution.
+
+        Args:
+            run (Callable[[], Optional[dict[str, Any]]]): Runs the container
+                and returns its RESULT payload
+            cancel (Callable[[], None]): Stops the container of a running job
+
+        Returns:
+            dict[str, Any]: The created job
+        """
+        self._ensure_listener()
+        self._ensure_heartbeat()
+        job = {
+            JobKey.JOB_ID: str(uuid.uuid4()),
+            JobKey.STATUS: JobStatus.PENDING,
+            JobKey.RESULT: None,
+            JobKey.CREATED_AT: datetime.now(timezone.utc).timestamp(),
+        }
+        with self._lock:
+            self._active_jobs.add(job[JobKey.JOB_ID])
+        self._save(job)
+        self._executor.submit(self._run, dict(job), run, cancel)
+        return job
+
+    def _run(
+        self,
+        job: dict[str, Any],
+        run: Callable[[], Optional[dict[str, Any]]],
+        cancel: Callable[[], None],
+    ) -> None:
+        job_id = job[JobKey.JOB_ID]
+        if self._redis.exists(self._cancel_key(job_id)):
+            self._finish(job, JobStatus.CANCELLED)
+            return
+        with self._lock:
+            self._cancel_callbacks[job_id] = cancel
+        job[JobKey.STATUS] = JobStatus.RUNNING
+        self._save(job)
+        try:
+            result = run()
+            status = JobStatus.COMPLETED
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            result = {"type": "RESULT", "result": None, "error": str(e)}
+            status = JobStatus.FAILED
+        finally:
+            with self._lock:
+                self._cancel_callbacks.pop(job_id, None)
+        if self._redis.exists(self._cancel_key(job_id)):
+            status = JobStatus.CANCELLED
+        self._finish(job, status, result)
+
+    def _finish(
+        self,
+        job: dict[str, Any],
+        status: str,
+        result: Optional[dict[str, Any]] = None,
+    ) -> None:
+        job[JobKey.STATUS] = status
+        job[JobKey.RESULT] = result
+        job[JobKey.FINISHED_AT] = datetime.now(timezone.utc).timestamp()
+        with self._lock:
+            self._active_jobs.discard(job[JobKey.JOB_ID])
+        self._save(job)
+
+    def cancel(self, job_id: str) -> Optional[dict[str, Any]]:
+        """Request cancellation of a job.
+
+        Returns:
+            Optional[dict[str, Any]]: The job, None if unknown or expired
+        """
+        job = self.get(job_id)
+        if job is None or job[JobKey.STATUS] in JobStatus.FINISHED:
+            return job
+        self._redis.setex(self._cancel_key(job_id), self.result_ttl, 1)
+        self._redis.publish(JobKey.CANCEL_CHANNEL, job_id)
+        return job
+
+    def _ensure_listener(self) -> None:
+        with self._lock:
+            if self._listener and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(
+                target=self._listen_for_cancellation,
+                name="container-job-cancel",
+                daemon=True,
+            )
+            self._listener.start()
+
+    def _listen_for_cancellation(self) -> None:
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(JobKey.CANCEL_CHANNEL)
+        for message in pubsub.listen():
+            job_id = message["data"].decode()
+            with self._lock:
+                cancel = self._cancel_callbacks.get(job_id)
+            if not cancel:
+                continue
+            logger.info(f"Cancelling job {job_id}")
+            try:
+                cancel()
+            except Exception as e:
+                logger.error(f"Failed to cancel job {job_id}: {e}")
+
+
+job_manager = JobManager(
+    max_jobs=int(os.getenv(Env.RUNNER_MAX_CONCURRENT_JOBS, 200)),
+    result_ttl=int(os.getenv(Env.RUNNER_JOB_RESULT_TTL, 3600)),
+)
@@ -0,0 +1,44 @@
+import threading
+from typing import Any, Optional
+
+from unstract.core.pubsub_helper import LogPublisher
+
+
+class LogBatcher:
+    """Publishes the logs of a container run in batches.
+
+    Logs are held for at most `max_delay` seconds or until `max_lines` are
+    collected, and are then published together in their original order.
+    """
+
+    def __init__(self, channel: str, max_lines: int, max_delay: float) -> None:
+        self.channel = channel
+        self.max_lines = max_lines
+        self.max_delay = max_delay
+        # Held while publishing too, so batches can't overtake each other
+        self._lock = threading.Lock()
+        self._logs: list[dict[str, Any]] = []
+        self._timer: Optional[threading.Timer] = None
+
+    def add(self, log: dict[str, Any]) -> None:
+        with self._lock:
+            self._logs.append(log)
+            if len(self._logs) >= self.max_lines:
+                self._flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Publish the collected logs."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        logs, self._logs = self._logs, []
+        if logs:
+            LogPublisher.publish_batch(self.channel, logs)
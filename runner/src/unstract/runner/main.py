@@ -2,6 +2,10 @@ from typing import Any, Optional
 
 from flask import Blueprint, Flask, Response, abort, jsonify, request
 from unstract.runner import UnstractRunner
+from unstract.runner.constants import JobKey, ToolCommand
+from unstract.runner.jobs import job_manager
+from unstract.runner.metrics import generate_metrics
+from unstract.runner.prepull import get_image_prepuller
 from unstract.runner.utils import Utils
 
 app = Flask(__name__)
@@ -9,6 +13,13 @@ app = Flask(__name__)
 log_level = Utils.get_log_level()
 app.logger.setLevel(log_level.value)
 
+if Utils.is_image_prepull_enabled():
+    get_image_prepuller(
+        on_pulled=lambda image_name, image_tag: UnstractRunner(
+            image_name, image_tag, app
+        ).cache_metadata()
+    ).start()
+
 # Define a Blueprint with a root URL path
 bp = Blueprint("v1", __name__, url_prefix="/v1/api")
 
@@ -22,6 +33,12 @@ def get_items() -> Response:
 # Run container
 @bp.route("container/run", methods=["POST"])
 def run_container() -> Optional[Any]:
+    """Starts a tool container as a background job.
+
+    Returns:
+        Response: The created job, its RESULT payload is available through
+            `GET container/job/<job_id>` once the container exits.
+    """
     data = request.get_json()
     image_name = data["image_name"]
     image_tag = data["image_tag"]
@@ -33,19 +50,48 @@ def run_container() -> Optional[Any]:
     settings = data["settings"]
     envs = data["envs"]
     messaging_channel = data["messaging_channel"]
+    priority = int(data.get("priority", 0))
 
     runner = UnstractRunner(image_name, image_tag, app)
-    result = runner.run_container(
-        container_name=container_name,
-        organization_id=organization_id,
-        workflow_id=workflow_id,
-        execution_id=execution_id,
-        file_execution_id=file_execution_id,
-        settings=settings,
-        envs=envs,
-        messaging_channel=messaging_channel,
+    job = job_manager.submit(
+        run=lambda: runner.run_container(
+            container_name=container_name,
+            organization_id=organization_id,
+            workflow_id=workflow_id,
+            execution_id=execution_id,
+            file_execution_id=file_execution_id,
+            settings=settings,
+            envs=envs,
+            messaging_channel=messaging_channel,
+            priority=priority,
+        ),
+        cancel=runner.stop,
     )
-    return result
+    return jsonify(job), 202
+
+
+@bp.route("container/job/<job_id>", methods=["GET"])
+def get_job(job_id: str) -> Optional[Any]:
+    """Gets a container job.
+
+    Query params:
+        wait (float): Seconds to wait for the job to finish before
+            responding, capped at `JobKey.MAX_WAIT`. Defaults to 0.
+    """
+    wait = min(request.args.get("wait", default=0, type=float), JobKey.MAX_WAIT)
+    job = job_manager.wait(job_id, timeout=wait)
+    if job is None:
+        abort(404)
+    return jsonify(job)
+
+
+@bp.route("container/job/<job_id>", methods=["DELETE"])
+def cancel_job(job_id: str) -> Optional[Any]:
+    """Cancels a container job, stopping its container if it is running."""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        abort(404)
+    return jsonify(job), 202
 
 
 @bp.route("container/<command>", methods=["GET"])
@@ -59,7 +105,7 @@ def run_command(command: str) -> Optional[Any]:
         Optional[Any]: Response from container for the specific command.
                        Returns None in case of error.
     """
-    if command not in {"properties", "spec", "variables", "icon"}:
+    if command not in ToolCommand.METADATA:
         abort(404)
     image_name = request.args.get("image_name")
     image_tag = request.args.get("image_tag")
@@ -68,6 +114,13 @@ def run_command(command: str) -> Optional[Any]:
     return runner.run_command(command)
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics() -> Response:
+    """Prometheus metrics of the runner."""
+    data, content_type = generate_metrics()
+    return Response(data, content_type=content_type)
+
+
 # Register the Blueprint with the Flask app
 app.register_blueprint(bp)
 
@@ -0,0 +1,79 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from unstract.runner.constants import Env
+
+logger = logging.getLogger(__name__)
+
+
+class ToolMetadataCache:
+    """Caches the spec, properties, variables and icon of tool images.
+
+    These are fixed for an image, so they are keyed by the image digest and
+    the command which produced them. Entries are kept in an in-memory LRU
+    and, when `cache_dir` is set, on disk so they survive restarts and are
+    shared by the worker processes of the runner.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int) -> None:
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+
+    def _get_path(self, digest: str, command: str) -> str:
+        return os.path.join(
+            self.cache_dir, digest.replace(":", "_"), f"{command.lower()}.json"
+        )
+
+    def get(self, digest: str, command: str) -> Optional[dict[str, Any]]:
+        key = (digest, command.lower())
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._get_path(digest, command), encoding="utf-8") as file:
+                value: dict[str, Any] = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable {command} cache of {digest}: {e}")
+            return None
+        self._remember(key, value)
+        return value
+
+    def set(self, digest: str, command: str, value: dict[str, Any]) -> None:
+        self._remember((digest, command.lower()), value)
+        if not self.cache_dir:
+            return
+        path = self._get_path(digest, command)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(value, file)
+            # Readers never see a partially written entry
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to persist {command} cache of {digest}: {e}")
+
+    def _remember(self, key: tuple[str, str], value: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Shared by all requests of the process
+metadata_cache = ToolMetadataCache(
+    cache_dir=os.getenv(Env.TOOL_METADATA_CACHE_DIR, ""),
+    max_entries=int(os.getenv(Env.TOOL_METADATA_CACHE_SIZE, 512)),
+)
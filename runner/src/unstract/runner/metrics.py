@@ -0,0 +1,53 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Gunicorn runs several worker processes. When PROMETHEUS_MULTIPROC_DIR is
+# set, metrics are written there and aggregated across the workers.
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+SCHEDULER_QUEUE_DEPTH = Gauge(
+    "runner_scheduler_queue_depth",
+    "Tool containers waiting for host resources",
+    ["priority"],
+    multiprocess_mode="livesum",
+)
+SCHEDULER_WAIT_SECONDS = Histogram(
+    "runner_scheduler_wait_seconds",
+    "Time tool containers waited for host resources",
+    ["priority"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+SCHEDULER_RESERVED_CPUS = Gauge(
+    "runner_scheduler_reserved_cpus",
+    "CPUs reserved by running tool containers",
+    multiprocess_mode="livesum",
+)
+SCHEDULER_RESERVED_MEMORY_BYTES = Gauge(
+    "runner_scheduler_reserved_memory_bytes",
+    "Memory reserved by running tool containers",
+    multiprocess_mode="livesum",
+)
+CONTAINER_PHASE_SECONDS = Histogram(
+    "runner_container_phase_seconds",
+    "Time spent in each phase of a tool container run",
+    ["phase"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900),
+)
+
+
+def generate_metrics() -> tuple[bytes, str]:
+    """Metrics in the Prometheus text format, with their content type."""
+    registry = REGISTRY
+    if os.getenv(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
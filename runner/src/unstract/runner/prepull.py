@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import threading
+from typing import Callable, Optional
+
+from unstract.runner.clients.helper import ContainerClientHelper
+from unstract.runner.constants import Env, ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class ImagePrePuller:
+    """Pulls the tool images of the tool registry ahead of their first run.
+
+    The registry files are checked every `interval` seconds and their
+    images are pulled again whenever a file changed, so newly registered
+    tools don't pay for the pull on their first execution either.
+    `on_pulled` is called with the name and tag of every pulled image.
+    """
+
+    def __init__(
+        self,
+        registry_path: str,
+        extra_images: list[str],
+        interval: int,
+        on_pulled: Optional[Callable[[str, str], None]] = None,
+    ) -> None:
+        self.registry_path = registry_path
+        self.extra_images = extra_images
+        self.interval = interval
+        self.on_pulled = on_pulled
+        self._mtimes: dict[str, Optional[float]] = {}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._watch, name="image-prepull", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _watch(self) -> None:
+        self.pull(self.extra_images)
+        while not self._stopped.is_set():
+            if self.registry_path and self._registry_changed():
+                self.pull(self.get_registry_images())
+            self._stopped.wait(self.interval)
+
+    def _registry_changed(self) -> bool:
+        mtimes = {}
+        for file_name in ToolRegistry.TOOL_FILES:
+            path = os.path.join(self.registry_path, file_name)
+            try:
+                mtimes[path] = os.path.getmtime(path)
+            except OSError:
+                mtimes[path] = None
+        changed = mtimes != self._mtimes
+        self._mtimes = mtimes
+        return changed
+
+    def get_registry_images(self) -> list[str]:
+        """Images referenced by the tool registry, as `name:tag`."""
+        images: list[str] = []
+        for file_name in ToolRegistry.TOOL_FILES:
+            path = os.path.join(self.registry_path, file_name)
+            try:
+                with open(path, encoding="utf-8") as file:
+                    tools = json.load(file)
+            except FileNotFoundError:
+                continue
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Unable to read tool registry file {path}: {e}")
+                continue
+            for tool in tools.values():
+                image_name = tool.get(ToolRegistry.IMAGE_NAME)
+                if not image_name:
+                    continue
+                image_tag = tool.get(ToolRegistry.IMAGE_TAG) or "latest"
+                image = f"{image_name}:{image_tag}"
+                if image not in images:
+                    images.append(image)
+        return images
+
+    def pull(self, images: list[str]) -> None:
+        for image in images:
+            if self._stopped.is_set():
+                return
+            image_name, _, image_tag = image.rpartition(":")
+            if not image_name or "/" in image_tag:
+                # No tag, the colon belongs to a registry host and port
+                image_name, image_tag = image, "latest"
+            client_class = ContainerClientHelper.get_container_client(image_name)
+            try:
+                client_class(image_name, image_tag, logger).get_image()
+                if self.on_pulled:
+                    self.on_pulled(image_name, image_tag)
+            except Exception as e:
+                logger.warning(f"Failed to pre-pull image {image}: {e}")
+
+
+def get_image_prepuller(
+    on_pulled: Optional[Callable[[str, str], None]] = None,
+) -> ImagePrePuller:
+    extra_images = os.getenv(Env.TOOL_PREPULL_IMAGES, "")
+    return ImagePrePuller(
+        registry_path=os.getenv(Env.TOOL_REGISTRY_CONFIG_PATH, ""),
+        extra_images=[i.strip() for i in extra_images.split(",") if i.strip()],
+        interval=int(os.getenv(Env.TOOL_PREPULL_INTERVAL, 300)),
+        on_pulled=on_pulled,
+    )
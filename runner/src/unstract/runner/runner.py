@@ -11,15 +11,25 @@ from unstract.runner.clients.interface import (
     ContainerClientInterface,
     ContainerInterface,
 )
-from unstract.runner.constants import Env, LogLevel, LogType, ToolKey
+from unstract.runner.constants import (
+    Env,
+    LogLevel,
+    LogType,
+    RunPhase,
+    ToolCommand,
+    ToolKey,
+)
 from unstract.runner.exception import ToolRunException
+from unstract.runner.log_batcher import LogBatcher
+from unstract.runner.metadata_cache import metadata_cache
+from unstract.runner.scheduler import ToolResources, scheduler
+from unstract.runner.timing import PhaseTimer
+from unstract.runner.utils import Utils
 
 from unstract.core.constants import LogFieldName
 from unstract.core.pubsub_helper import LogPublisher
 
 load_dotenv()
-# Loads the container clinet class.
-client_class = ContainerClientHelper.get_container_client()
 
 
 class UnstractRunner:
@@ -28,9 +38,14 @@ class UnstractRunner:
         # If no image_tag is provided will assume the `latest` tag
         self.image_tag = image_tag or "latest"
         self.logger = app.logger
+        # Loads the container client class of the tool
+        client_class = ContainerClientHelper.get_container_client(self.image_name)
         self.client: ContainerClientInterface = client_class(
             self.image_name, self.image_tag, self.logger
         )
+        # Container of the ongoing `run_container` call
+        self.container: Optional[ContainerInterface] = None
+        self._image_digest: Optional[str] = None
 
     # Function to stream logs
     def stream_logs(
@@ -41,18 +56,34 @@ class UnstractRunner:
         organization_id: str,
         file_execution_id: str,
         channel: Optional[str] = None,
+        timer: Optional[PhaseTimer] = None,
     ) -> None:
-        for line in container.logs(follow=True):
-            log_message = line
-            self.logger.debug(f"[{container.name}] - {log_message}")
-            self.process_log_message(
-                log_message=log_message,
-                tool_instance_id=tool_instance_id,
+        batcher = None
+        if channel:
+            batcher = LogBatcher(
                 channel=channel,
-                execution_id=execution_id,
-                organization_id=organization_id,
-                file_execution_id=file_execution_id,
+                max_lines=int(os.getenv(Env.LOG_BATCH_MAX_LINES, 200)),
+                max_delay=int(os.getenv(Env.LOG_BATCH_MAX_DELAY_MS, 100)) / 1000,
             )
+        try:
+            for line in container.logs(follow=True):
+                if timer and RunPhase.TOOL_STARTUP not in timer.timings:
+                    timer.mark(RunPhase.TOOL_STARTUP)
+                log_message = line
+                self.logger.debug("[%s] - %s", container.name, log_message)
+                self.process_log_message(
+                    log_message=log_message,
+                    tool_instance_id=tool_instance_id,
+                    channel=channel,
+                    execution_id=execution_id,
+                    organization_id=organization_id,
+                    file_execution_id=file_execution_id,
+                    batcher=batcher,
+                )
+        finally:
+            # Logs preceding an error are published before it is raised
+            if batcher:
+                batcher.flush()
 
     def get_valid_log_message(self, log_message: str) -> Optional[dict[str, Any]]:
         """Get a valid log message from the log message.
@@ -63,6 +94,9 @@ class UnstractRunner:
         Returns:
             Optional[dict[str, Any]]: json message
         """
+        # Tools print their messages as JSON objects, skip other output early
+        if not log_message.startswith("{"):
+            return None
         try:
             log_dict = json.loads(log_message)
             if isinstance(log_dict, dict):
@@ -78,6 +112,7 @@ class UnstractRunner:
         organization_id: str,
         file_execution_id: str,
         channel: Optional[str] = None,
+        batcher: Optional[LogBatcher] = None,
     ) -> Optional[dict[str, Any]]:
         log_dict = self.get_valid_log_message(log_message)
         if not log_dict:
@@ -102,7 +137,10 @@ class UnstractRunner:
             log_dict[LogFieldName.FILE_EXECUTION_ID] = file_execution_id
 
             # Publish to channel of socket io
-            LogPublisher.publish(channel, log_dict)
+            if batcher:
+                batcher.add(log_dict)
+            else:
+                LogPublisher.publish(channel, log_dict)
         return None
 
     def is_valid_log_type(self, log_type: Optional[str]) -> bool:
@@ -131,12 +169,51 @@ class UnstractRunner:
     def run_command(self, command: str) -> Optional[Any]:
         """Runs any given command on the container.
 
+        Results of the metadata commands (`ToolCommand.METADATA`) only
+        depend on the image, they are cached by image digest and a
+        container is started only the first time.
+
         Args:
             command (str): Command to be executed.
 
         Returns:
             Optional[Any]: Response from container or None if error occures.
         """
+        digest = None
+        if command.lower() in ToolCommand.METADATA:
+            digest = self.get_image_digest()
+        if digest:
+            cached = metadata_cache.get(digest, command)
+            if cached is not None:
+                return cached
+        result = self._run_command(command)
+        if digest and result is not None:
+            metadata_cache.set(digest, command, result)
+        return result
+
+    def get_image_digest(self) -> Optional[str]:
+        if self._image_digest is None:
+            self._image_digest = self.client.get_image_digest()
+        return self._image_digest
+
+    def get_tool_resources(self, priority: int = 0) -> ToolResources:
+        """Resources declared in the tool's properties.
+
+        Properties are only read for images with a digest, whose metadata
+        is cached, so this never starts a container per run.
+        """
+        properties = None
+        if self.get_image_digest():
+            response = self.run_command(ToolCommand.PROPERTIES)
+            properties = response.get(ToolCommand.PROPERTIES) if response else None
+        return ToolResources.from_properties(properties, priority=priority)
+
+    def cache_metadata(self) -> None:
+        """Fills the metadata cache of the image, pulling it if needed."""
+        for command in ToolCommand.METADATA:
+            self.run_command(command)
+
+    def _run_command(self, command: str) -> Optional[Any]:
         command = command.upper()
         container_config = self.client.get_container_run_config(
             command=["--command", command], file_execution_id="", auto_remove=True
@@ -168,6 +245,7 @@ class UnstractRunner:
         envs: dict[str, Any],
         messaging_channel: Optional[str] = None,
         container_name: Optional[str] = None,
+        priority: int = 0,
     ) -> Optional[Any]:
         """RUN container With RUN Command.
 
@@ -177,11 +255,14 @@ class UnstractRunner:
             settings (dict[str, Any]): Tool settings
             envs (dict[str, Any]): Tool env
             messaging_channel (Optional[str], optional): socket io channel
+            priority (int): Scheduling priority, higher starts first when
+                waiting for host resources
 
         Returns:
-            Optional[Any]: _description_
+            Optional[Any]: RESULT payload, with the seconds spent in each
+                `RunPhase` as `phase_timings`
         """
-
+        timer = PhaseTimer()
         envs[Env.EXECUTION_DATA_DIR] = os.path.join(
             os.getenv(Env.WORKFLOW_EXECUTION_DIR_PREFIX, ""),
             organization_id,
@@ -192,19 +273,23 @@ class UnstractRunner:
             Env.WORKFLOW_EXECUTION_FILE_STORAGE_CREDENTIALS, "{}"
         )
 
-        container_config = self.client.get_container_run_config(
-            command=[
-                "--command",
-                "RUN",
-                "--settings",
-                json.dumps(settings),
-                "--log-level",
-                "DEBUG",
-            ],
-            file_execution_id=file_execution_id,
-            container_name=container_name,
-            envs=envs,
-        )
+        command = [
+            "--command",
+            "RUN",
+            "--settings",
+            json.dumps(settings),
+            "--log-level",
+            "DEBUG",
+        ]
+        with timer.phase(RunPhase.IMAGE_CHECK):
+            resources = self.get_tool_resources(priority=priority)
+            container_config = self.client.get_container_run_config(
+                command=command,
+                file_execution_id=file_execution_id,
+                container_name=container_name,
+                envs=envs,
+                resources=resources,
+            )
         # Add labels to container for logging with Loki.
         # This only required for observability.
         try:
@@ -213,25 +298,43 @@ class UnstractRunner:
         except Exception as e:
             self.logger.info(f"Invalid labels for logging: {e}")
 
+        scheduled = Utils.is_scheduler_enabled()
+        acquired = False
+
         # Run the Docker container
         container = None
         result = {"type": "RESULT", "result": None}
         try:
+            if scheduled:
+                with timer.phase(RunPhase.QUEUE):
+                    scheduler.acquire(resources)
+                acquired = True
             self.logger.info(
                 f"Execution ID: {execution_id}, running docker "
                 f"container: {container_name}"
             )
-            container: ContainerInterface = self.client.run_container(container_config)
+            with timer.phase(RunPhase.CONTAINER_START):
+                container = self.client.run_warm_container(
+                    command=command,
+                    envs=envs,
+                    labels=container_config.get("labels"),
+                    resources=resources,
+                )
+                if not container:
+                    container = self.client.run_container(container_config)
+            self.container = container
             tool_instance_id = str(settings.get(ToolKey.TOOL_INSTANCE_ID))
             # Stream logs
-            self.stream_logs(
-                container=container,
-                tool_instance_id=tool_instance_id,
-                channel=messaging_channel,
-                execution_id=execution_id,
-                organization_id=organization_id,
-                file_execution_id=file_execution_id,
-            )
+            with timer.phase(RunPhase.TOOL_RUN):
+                self.stream_logs(
+                    container=container,
+                    tool_instance_id=tool_instance_id,
+                    channel=messaging_channel,
+                    execution_id=execution_id,
+                    organization_id=organization_id,
+                    file_execution_id=file_execution_id,
+                    timer=timer,
+                )
         except ToolRunException as te:
             self.logger.error(
                 "Error while running docker container"
@@ -245,6 +348,25 @@ class UnstractRunner:
                 f"Failed to run docker container: {e}", stack_info=True, exc_info=True
             )
             result = {"type": "RESULT", "result": None, "error": str(e)}
-        if container:
-            container.cleanup()
+        finally:
+            self.container = None
+            try:
+                if container:
+                    with timer.phase(RunPhase.CLEANUP):
+                        container.cleanup()
+            finally:
+                if acquired:
+                    scheduler.release(resources)
+        result["phase_timings"] = timer.finish()
+        self.logger.info(
+            f"Execution ID: {execution_id}, container phase timings: "
+            f"{result['phase_timings']}"
+        )
         return result
+
+    def stop(self) -> None:
+        """Stops the container of an ongoing `run_container` call."""
+        container = self.container
+        if container:
+            self.logger.info(f"Stopping container {container.name}")
+            container.stop()
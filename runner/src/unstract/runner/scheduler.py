@@ -0,0 +1,185 @@
+import heapq
+import itertools
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from unstract.runner.constants import Env, ToolResourceKey
+from unstract.runner.metrics import (
+    SCHEDULER_QUEUE_DEPTH,
+    SCHEDULER_RESERVED_CPUS,
+    SCHEDULER_RESERVED_MEMORY_BYTES,
+    SCHEDULER_WAIT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+MEMORY_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024**2, "g": 1024**3}
+
+
+def parse_memory(value: Any) -> Optional[int]:
+    """Parse a memory size like Docker does, e.g. `512m` or `2g`, to bytes."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([bkmg]?)i?b?\s*", str(value).lower())
+    if not match:
+        raise ValueError(f"Invalid memory size: {value}")
+    return int(float(match.group(1)) * MEMORY_UNITS[match.group(2)])
+
+
+@dataclass(frozen=True)
+class ToolResources:
+    """Resources a tool container may use.
+
+    `cpus` and `memory` (bytes) are enforced as container limits when
+    declared by the tool, and are reserved on the host while it runs.
+    """
+
+    cpus: Optional[float] = None
+    memory: Optional[int] = None
+    priority: int = 0
+
+    @classmethod
+    def from_properties(
+        cls, properties: Optional[dict[str, Any]], priority: int = 0
+    ) -> "ToolResources":
+        """Reads the `resources` hints of a tool's properties.
+
+        e.g. `"resources": {"cpu": 2, "memory": "4g"}`
+        """
+        hints = (properties or {}).get(ToolResourceKey.RESOURCES) or {}
+        try:
+            cpus = hints.get(ToolResourceKey.CPU)
+            return cls(
+                cpus=float(cpus) if cpus else None,
+                memory=parse_memory(hints.get(ToolResourceKey.MEMORY)),
+                priority=priority,
+            )
+        except (TypeError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring invalid resource hints {hints}: {e}")
+            return cls(priority=priority)
+
+
+def get_available_memory() -> Optional[int]:
+    """Memory currently available on the host, None if unknown."""
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class ResourceScheduler:
+    """Starts tool containers only while the host has headroom.
+
+    Each container reserves its declared resources, or the defaults when
+    the tool declares none, until it exits. A container is admitted when
+    its reservation fits the capacity and the host currently has the
+    memory available, which also accounts for containers of other runner
+    processes. Waiting containers are admitted by priority, first come
+    first served within a priority.
+    """
+
+    # Host memory is re-checked at this interval, in seconds
+    RECHECK_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        cpu_capacity: float,
+        memory_capacity: int,
+        default_cpus: float,
+        default_memory: int,
+    ) -> None:
+        self.cpu_capacity = cpu_capacity
+        self.memory_capacity = memory_capacity
+        self.default_cpus = default_cpus
+        self.default_memory = default_memory
+        self._cond = threading.Condition()
+        self._counter = itertools.count()
+        self._waiting: list[tuple[int, int]] = []
+        self._reserved_cpus = 0.0
+        self._reserved_memory = 0
+
+    def _get_reservation(self, resources: ToolResources) -> tuple[float, int]:
+        return (
+            resources.cpus or self.default_cpus,
+            resources.memory or self.default_memory,
+        )
+
+    def _fits(self, cpus: float, memory: int) -> bool:
+        if not self._reserved_cpus and not self._reserved_memory:
+            # Nothing else is running, even an oversized container may start
+            return True
+        if self._reserved_cpus + cpus > self.cpu_capacity:
+            return False
+        if self._reserved_memory + memory > self.memory_capacity:
+            return False
+        available = get_available_memory()
+        return available is None or available >= memory
+
+    def acquire(self, resources: ToolResources) -> None:
+        """Wait until the container can be started and reserve its resources."""
+        cpus, memory = self._get_reservation(resources)
+        priority = str(resources.priority)
+        entry = (-resources.priority, next(self._counter))
+        started_at = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            SCHEDULER_QUEUE_DEPTH.labels(priority).inc()
+            try:
+                while not (self._waiting[0] == entry and self._fits(cpus, memory)):
+                    self._cond.wait(timeout=self.RECHECK_INTERVAL)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                SCHEDULER_QUEUE_DEPTH.labels(priority).dec()
+                # The next waiter might fit now
+                self._cond.notify_all()
+            self._reserved_cpus += cpus
+            self._reserved_memory += memory
+            self._update_reserved()
+        waited = time.monotonic() - started_at
+        SCHEDULER_WAIT_SECONDS.labels(priority).observe(waited)
+        if waited > self.RECHECK_INTERVAL:
+            logger.info(f"Container waited {waited:.1f}s for host resources")
+
+    def release(self, resources: ToolResources) -> None:
+        """Free the reservation of an exited container."""
+        cpus, memory = self._get_reservation(resources)
+        with self._cond:
+            self._reserved_cpus = max(self._reserved_cpus - cpus, 0.0)
+            self._reserved_memory = max(self._reserved_memory - memory, 0)
+            self._update_reserved()
+            self._cond.notify_all()
+
+    def _update_reserved(self) -> None:
+        SCHEDULER_RESERVED_CPUS.set(self._reserved_cpus)
+        SCHEDULER_RESERVED_MEMORY_BYTES.set(self._reserved_memory)
+
+
+def get_total_memory() -> int:
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+# Shared by all requests of the process. Each gunicorn worker schedules
+# independently, so the host's capacity is split between them.
+_workers = max(int(os.getenv(Env.RUNNER_WORKERS, 2)), 1)
+_cpu_capacity = float(os.getenv(Env.RUNNER_CPU_CAPACITY) or os.cpu_count() or 1)
+_memory_capacity = (
+    parse_memory(os.getenv(Env.RUNNER_MEMORY_CAPACITY)) or get_total_memory()
+)
+scheduler = ResourceScheduler(
+    cpu_capacity=_cpu_capacity / _workers,
+    memory_capacity=_memory_capacity // _workers,
+    default_cpus=float(os.getenv(Env.TOOL_DEFAULT_CPUS, 1)),
+    default_memory=parse_memory(os.getenv(Env.TOOL_DEFAULT_MEMORY, "1g")),
+)
@@ -0,0 +1,35 @@
+import time
+
+import pytest
+
+from .log_batcher import LogBatcher
+
+
+@pytest.fixture
+def publish_batch(mocker):
+    return mocker.patch(
+        "unstract.runner.log_batcher.LogPublisher.publish_batch", return_value=True
+    )
+
+
+def test_published_when_full(publish_batch):
+    """Test logs are published in order once max_lines are collected."""
+    batcher = LogBatcher(channel="channel", max_lines=2, max_delay=60)
+    for i in range(5):
+        batcher.add({"log": i})
+    batcher.flush()
+
+    assert [call.args for call in publish_batch.call_args_list] == [
+        ("channel", [{"log": 0}, {"log": 1}]),
+        ("channel", [{"log": 2}, {"log": 3}]),
+        ("channel", [{"log": 4}]),
+    ]
+
+
+def test_published_after_delay(publish_batch):
+    """Test a partial batch is published once max_delay elapsed."""
+    batcher = LogBatcher(channel="channel", max_lines=200, max_delay=0.01)
+    batcher.add({"log": 0})
+    time.sleep(0.2)
+
+    publish_batch.assert_called_once_with("channel", [{"log": 0}])
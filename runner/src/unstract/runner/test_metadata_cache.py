@@ -0,0 +1,25 @@
+from .metadata_cache import ToolMetadataCache
+
+DIGEST = "sha256:abc"
+SPEC = {"type": "SPEC", "spec": {"title": "Tool"}}
+
+
+def test_lru_eviction():
+    """Test the least recently used entry is evicted from memory."""
+    cache = ToolMetadataCache(cache_dir="", max_entries=2)
+    cache.set(DIGEST, "spec", SPEC)
+    cache.set(DIGEST, "properties", {"type": "PROPERTIES"})
+    cache.get(DIGEST, "spec")
+    cache.set(DIGEST, "icon", {"type": "ICON"})
+
+    assert cache.get(DIGEST, "spec") == SPEC
+    assert cache.get(DIGEST, "properties") is None
+
+
+def test_persisted_on_disk(tmp_path):
+    """Test entries are read back from disk by another cache instance."""
+    ToolMetadataCache(cache_dir=str(tmp_path), max_entries=2).set(DIGEST, "SPEC", SPEC)
+    cache = ToolMetadataCache(cache_dir=str(tmp_path), max_entries=2)
+
+    assert cache.get(DIGEST, "spec") == SPEC
+    assert cache.get("sha256:other", "spec") is None
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from .scheduler import ResourceScheduler, ToolResources, parse_memory
+
+
+@pytest.fixture
+def scheduler(mocker):
+    mocker.patch("unstract.runner.scheduler.get_available_memory", return_value=None)
+    return ResourceScheduler(
+        cpu_capacity=2,
+        memory_capacity=parse_memory("4g"),
+        default_cpus=1,
+        default_memory=parse_memory("1g"),
+    )
+
+
+def test_resources_from_properties():
+    """Test resource hints are read from the tool's properties."""
+    resources = ToolResources.from_properties(
+        {"resources": {"cpu": "1.5", "memory": "512m"}}, priority=1
+    )
+    assert resources == ToolResources(cpus=1.5, memory=512 * 1024**2, priority=1)
+    assert ToolResources.from_properties({"resources": {"memory": "lots"}}) == (
+        ToolResources()
+    )
+
+
+def _acquire_in_thread(scheduler, resources, admitted, name):
+    def acquire():
+        scheduler.acquire(resources)
+        admitted.append(name)
+
+    thread = threading.Thread(target=acquire, daemon=True)
+    thread.start()
+    # Let the thread enqueue before the next one
+    time.sleep(0.05)
+    return thread
+
+
+def test_waits_for_headroom_by_priority(scheduler):
+    """Test containers wait for capacity and start by priority, then FIFO."""
+    running = ToolResources(cpus=2)
+    scheduler.acquire(running)
+    admitted: list[str] = []
+    threads = [
+        _acquire_in_thread(scheduler, ToolResources(), admitted, "low-1"),
+        _acquire_in_thread(scheduler, ToolResources(), admitted, "low-2"),
+        _acquire_in_thread(scheduler, ToolResources(priority=1), admitted, "high"),
+    ]
+    assert admitted == []
+
+    scheduler.release(running)
+    for thread in (threads[0], threads[2]):
+        thread.join(timeout=2)
+    assert admitted == ["high", "low-1"]
+
+    scheduler.release(ToolResources())
+    threads[1].join(timeout=2)
+    assert admitted == ["high", "low-1", "low-2"]
+
+
+def test_oversized_container_starts_alone(scheduler):
+    """Test a container larger than the capacity isn't blocked forever."""
+    scheduler.acquire(ToolResources(cpus=8))
+    scheduler.release(ToolResources(cpus=8))
@@ -0,0 +1,22 @@
+import pytest
+
+from .timing import PhaseTimer
+
+
+def test_phase_timings(mocker):
+    """Test each phase is timed from the end of the previous one."""
+    clock = mocker.patch("unstract.runner.timing.time.monotonic")
+    clock.side_effect = [10.0, 11.0, 13.5, 14.0, 14.0]
+    timer = PhaseTimer()
+    timer.mark("image_check")
+    with pytest.raises(RuntimeError):
+        with timer.phase("container_start"):
+            raise RuntimeError("Failed to start")
+    timer.mark("cleanup")
+
+    assert timer.finish() == {
+        "image_check": 1.0,
+        "container_start": 2.5,
+        "cleanup": 0.5,
+        "total": 4.0,
+    }
@@ -0,0 +1,44 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from unstract.runner.metrics import CONTAINER_PHASE_SECONDS
+
+
+class PhaseTimer:
+    """Records how long each phase of a container run took.
+
+    `mark` ends the ongoing phase, which started when the previous one
+    ended. Durations are in seconds, measured with a monotonic clock.
+    """
+
+    TOTAL = "total"
+
+    def __init__(self) -> None:
+        self._started_at = time.monotonic()
+        self._last_mark = self._started_at
+        self.timings: dict[str, float] = {}
+
+    def mark(self, phase: str) -> None:
+        now = time.monotonic()
+        self.timings[phase] = self.timings.get(phase, 0.0) + now - self._last_mark
+        self._last_mark = now
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """Ends `phase` once the block exits, even if it failed."""
+        try:
+            yield
+        finally:
+            self.mark(phase)
+
+    def finish(self) -> dict[str, float]:
+        """Records the timings as metrics.
+
+        Returns:
+            dict[str, float]: Seconds per phase, including the total
+        """
+        self.timings[self.TOTAL] = time.monotonic() - self._started_at
+        for phase, seconds in self.timings.items():
+            CONTAINER_PHASE_SECONDS.labels(phase).observe(seconds)
+        return {phase: round(seconds, 4) for phase, seconds in self.timings.items()}
@@ -46,3 +46,30 @@ class Utils:
             bool
         """
         return Utils.str_to_bool(os.getenv(Env.REMOVE_CONTAINER_ON_EXIT, "true"))
+
+    @staticmethod
+    def is_warm_pool_enabled() -> bool:
+        """Get whether tools should run in warm containers.
+
+        Returns:
+            bool
+        """
+        return Utils.str_to_bool(os.getenv(Env.TOOL_WARM_POOL_ENABLED, "false"))
+
+    @staticmethod
+    def is_image_prepull_enabled() -> bool:
+        """Get whether tool images should be pulled ahead of their first run.
+
+        Returns:
+            bool
+        """
+        return Utils.str_to_bool(os.getenv(Env.TOOL_PREPULL_ENABLED, "false"))
+
+    @staticmethod
+    def is_scheduler_enabled() -> bool:
+        """Get whether containers wait for host resources before starting.
+
+        Returns:
+            bool
+        """
+        return Utils.str_to_bool(os.getenv(Env.RUNNER_SCHEDULER_ENABLED, "false"))
@@ -6,6 +6,7 @@ class LogFieldName:
     DATA = "data"
     EVENT_TIME = "event_time"
     FILE_EXECUTION_ID = "file_execution_id"
+    LEVEL = "level"
 
 
 class LogEventArgument:
@@ -17,3 +18,26 @@ class LogEventArgument:
 class LogProcessingTask:
     TASK_NAME = "logs_consumer"
     QUEUE_NAME = "celery_log_task_queue"
+
+
+class LogPublisherEnv:
+    # Deliver published messages in batches from a background thread
+    ASYNC = "LOG_PUBLISHER_ASYNC"
+    QUEUE_SIZE = "LOG_PUBLISHER_QUEUE_SIZE"
+    BATCH_SIZE = "LOG_PUBLISHER_BATCH_SIZE"
+    FLUSH_INTERVAL_MS = "LOG_PUBLISHER_FLUSH_INTERVAL_MS"
+    # Longest a message waits for room in a full queue before it is dropped
+    PUT_TIMEOUT_MS = "LOG_PUBLISHER_PUT_TIMEOUT_MS"
+    REDIS_MAX_CONNECTIONS = "LOG_PUBLISHER_REDIS_MAX_CONNECTIONS"
+    # Most recent logs kept per channel for the session logs view
+    SESSION_LOGS_MAX_ENTRIES = "SESSION_LOGS_MAX_ENTRIES"
+
+
+class AdapterInstanceEvent:
+    # Redis pub/sub channel of the ids of updated or deleted adapter instances
+    INVALIDATION_CHANNEL = "adapter_instance_invalidation"
+
+
+class DocumentIndexEvent:
+    # Redis pub/sub channel of the doc_ids of (re-)indexed documents
+    INVALIDATION_CHANNEL = "document_index_invalidation"
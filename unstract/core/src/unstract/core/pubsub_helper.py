@@ -1,23 +1,135 @@
+import atexit
 import json
 import logging
 import os
+import threading
+from collections import deque
 from datetime import datetime, timezone
 from typing import Any, Optional
 
 import redis
-from kombu import Connection
+from kombu import Connection, pools
 
-from unstract.core.constants import LogEventArgument, LogProcessingTask
+from unstract.core.constants import LogEventArgument, LogProcessingTask, LogPublisherEnv
+
+
+class LogDeliveryQueue:
+    """Delivers published messages from a background thread in batches.
+
+    Messages wait in a bounded queue for at most `flush_interval` seconds
+    and are then published together, in order per channel. When the queue
+    is full DEBUG messages are dropped, others wait up to `put_timeout`
+    seconds for the queue to be flushed and are dropped if it is still
+    full. Messages never bypass the queue, which would reorder them.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        put_timeout: float,
+    ) -> None:
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._cond = threading.Condition()
+        # Held while publishing, so flushes can't overtake each other
+        self._flush_lock = threading.Lock()
+        self._messages: deque[tuple[str, dict[str, Any]]] = deque()
+        self._dropped = 0
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def _ensure_thread(self) -> None:
+        # Threads don't survive a fork, e.g. of a celery worker process
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        if self._pid != os.getpid():
+            self._messages.clear()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(
+            target=self._run, name="log-publisher", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, channel_id: str, payload: dict[str, Any]) -> bool:
+        """Queue a message.
+
+        Returns:
+            bool: False if the queue was full and the message was dropped
+        """
+        with self._cond:
+            self._ensure_thread()
+            if len(self._messages) >= self.max_size:
+                if payload.get("level") != "DEBUG":
+                    self._cond.notify_all()
+                    self._cond.wait_for(
+                        lambda: len(self._messages) < self.max_size,
+                        timeout=self.put_timeout,
+                    )
+                if len(self._messages) >= self.max_size:
+                    self._dropped += 1
+                    return False
+            self._messages.append((channel_id, payload))
+            if len(self._messages) >= min(self.batch_size, self.max_size):
+                self._cond.notify_all()
+        return True
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                # A full queue has producers waiting for room
+                self._cond.wait_for(
+                    lambda: len(self._messages) >= min(self.batch_size, self.max_size),
+                    timeout=self.flush_interval,
+                )
+            self.flush()
+
+    def flush(self) -> None:
+        """Publish all queued messages."""
+        with self._flush_lock:
+            with self._cond:
+                messages = list(self._messages)
+                self._messages.clear()
+                dropped, self._dropped = self._dropped, 0
+                # Wakes up producers waiting for room
+                self._cond.notify_all()
+            if dropped:
+                logging.warning(f"Dropped {dropped} logs, log queue was full")
+            batches: dict[str, list[dict[str, Any]]] = {}
+            for channel_id, payload in messages:
+                batches.setdefault(channel_id, []).append(payload)
+            for channel_id, payloads in batches.items():
+                LogPublisher.publish_batch(channel_id, payloads)
 
 
 class LogPublisher:
     kombu_conn = Connection(os.environ.get("CELERY_BROKER_URL"))
     r = redis.Redis(
-        host=os.environ.get("REDIS_HOST"),
-        port=os.environ.get("REDIS_PORT"),
-        username=os.environ.get("REDIS_USER"),
-        password=os.environ.get("REDIS_PASSWORD"),
+        connection_pool=redis.ConnectionPool(
+            host=os.environ.get("REDIS_HOST"),
+            port=os.environ.get("REDIS_PORT"),
+            username=os.environ.get("REDIS_USER"),
+            password=os.environ.get("REDIS_PASSWORD"),
+            max_connections=int(
+                os.environ.get(LogPublisherEnv.REDIS_MAX_CONNECTIONS, 50)
+            ),
+        )
     )
+    # Set when messages are delivered in the background
+    delivery_queue: Optional[LogDeliveryQueue] = None
+    if os.environ.get(LogPublisherEnv.ASYNC, "false").lower() == "true":
+        delivery_queue = LogDeliveryQueue(
+            max_size=int(os.environ.get(LogPublisherEnv.QUEUE_SIZE, 10000)),
+            batch_size=int(os.environ.get(LogPublisherEnv.BATCH_SIZE, 200)),
+            flush_interval=int(os.environ.get(LogPublisherEnv.FLUSH_INTERVAL_MS, 100))
+            / 1000,
+            put_timeout=int(os.environ.get(LogPublisherEnv.PUT_TIMEOUT_MS, 1000))
+            / 1000,
+        )
+        atexit.register(delivery_queue.flush)
 
     @staticmethod
     def log_usage(
@@ -123,40 +235,89 @@ class LogPublisher:
             "task": task_name,
         }
 
+    @classmethod
+    def _publish_to_queue(
+        cls, producer: Any, channel_id: str, payload: dict[str, Any]
+    ) -> None:
+        task_message = cls._get_task_message(
+            user_session_id=channel_id,
+            event=f"logs:{channel_id}",
+            message=payload,
+        )
+        headers = cls._get_task_header(LogProcessingTask.TASK_NAME)
+        # Publish the message to the queue
+        producer.publish(
+            body=task_message,
+            exchange="",
+            headers=headers,
+            routing_key=LogProcessingTask.QUEUE_NAME,
+            compression=None,
+            retry=True,
+            serializer="json",
+        )
+
+    @classmethod
+    def _store_log(
+        cls, redis_client: Any, channel_id: str, payload: dict[str, Any]
+    ) -> None:
+        # Only payloads of type "LOG" are kept
+        if payload["type"] != "LOG":
+            return
+        logs_expiration = os.environ.get(
+            "LOGS_EXPIRATION_TIME_IN_SECOND", 86400
+        )  # Defaults to 1 day
+        max_entries = int(
+            os.environ.get(LogPublisherEnv.SESSION_LOGS_MAX_ENTRIES, 1000)
+        )
+        # Logs of a channel are kept in one capped list, oldest first
+        redis_key = cls.get_logs_key(channel_id)
+        redis_client.rpush(redis_key, json.dumps(payload))
+        redis_client.ltrim(redis_key, -max_entries, -1)
+        redis_client.expire(redis_key, logs_expiration)
+
+    @staticmethod
+    def get_logs_key(channel_id: str) -> str:
+        """Redis list holding the stored logs of a channel."""
+        return f"logs:{channel_id}"
+
     @classmethod
     def publish(cls, channel_id: str, payload: dict[str, Any]) -> bool:
-        channel = f"logs:{channel_id}"
-        """Publish a message to the queue."""
-        try:
+        """Publish a message to the queue.
 
-            with cls.kombu_conn.Producer(serializer="json") as producer:
-                event = f"logs:{channel_id}"
-                task_message = cls._get_task_message(
-                    user_session_id=channel_id,
-                    event=event,
-                    message=payload,
-                )
-                headers = cls._get_task_header(LogProcessingTask.TASK_NAME)
-                # Publish the message to the queue
-                producer.publish(
-                    body=task_message,
-                    exchange="",
-                    headers=headers,
-                    routing_key=LogProcessingTask.QUEUE_NAME,
-                    compression=None,
-                    retry=True,
-                )
-                logging.debug(f"Published '{channel_id}' <= {payload}")
-            log_data = json.dumps(payload)
-            # Check if the payload type is "LOG"
-            if payload["type"] == "LOG":
-                logs_expiration = os.environ.get(
-                    "LOGS_EXPIRATION_TIME_IN_SECOND", 86400
-                )  # Defaults to 1 day
-                timestamp = payload["timestamp"]
-                redis_key = f"{channel}:{timestamp}"
-                cls.r.setex(redis_key, logs_expiration, log_data)
+        With `LOG_PUBLISHER_ASYNC` the message is only queued here and is
+        delivered by a background thread.
+        """
+        if cls.delivery_queue:
+            return cls.delivery_queue.put(channel_id, payload)
+        return cls.publish_batch(channel_id, [payload])
+
+    @classmethod
+    def publish_batch(cls, channel_id: str, payloads: list[dict[str, Any]]) -> bool:
+        """Publish messages of a channel in order.
+
+        The messages are published with a pooled, long lived producer and
+        their logs are stored with a single Redis round trip.
+        """
+        if not payloads:
+            return True
+        try:
+            with pools.producers[cls.kombu_conn].acquire(block=True) as producer:
+                for payload in payloads:
+                    cls._publish_to_queue(producer, channel_id, payload)
+            logging.debug(f"Published {len(payloads)} messages to '{channel_id}'")
+            pipeline = cls.r.pipeline(transaction=False)
+            for payload in payloads:
+                cls._store_log(pipeline, channel_id, payload)
+            pipeline.execute()
         except Exception as e:
-            logging.error(f"Failed to publish '{channel_id}' <= {payload}: {e}")
+            logging.error(
+                f"Failed to publish {len(payloads)} messages to '{channel_id}': {e}"
+            )
             return False
         return True
+
+    @classmethod
+    def flush(cls) -> None:
+        """Deliver the messages queued for background delivery."""
+        if cls.delivery_queue:
+            cls.delivery_queue.flush()
@@ -0,0 +1,71 @@
+import unittest
+from unittest.mock import call, patch
+
+from unstract.core.pubsub_helper import LogDeliveryQueue, LogPublisher
+
+
+class LogDeliveryQueueTestCase(unittest.TestCase):
+    def setUp(self):
+        # Keep the background thread from flushing during the tests
+        self.queue = LogDeliveryQueue(
+            max_size=3, batch_size=100, flush_interval=60, put_timeout=0.05
+        )
+
+    @patch.object(LogPublisher, "publish_batch")
+    def test_flush_in_order_per_channel(self, publish_batch):
+        self.queue.put("a", {"level": "INFO", "log": 1})
+        self.queue.put("b", {"level": "INFO", "log": 2})
+        self.queue.put("a", {"level": "INFO", "log": 3})
+        self.queue.flush()
+
+        publish_batch.assert_any_call(
+            "a", [{"level": "INFO", "log": 1}, {"level": "INFO", "log": 3}]
+        )
+        publish_batch.assert_any_call("b", [{"level": "INFO", "log": 2}])
+
+    @patch.object(LogPublisher, "publish_batch")
+    def test_full_queue_drops_debug(self, publish_batch):
+        # A flush still publishing keeps the queue from being emptied
+        with self.queue._flush_lock:
+            for i in range(3):
+                self.queue.put("a", {"level": "INFO", "log": i})
+            self.assertFalse(self.queue.put("a", {"level": "DEBUG", "log": 3}))
+        self.queue.flush()
+
+        publish_batch.assert_called_once_with(
+            "a", [{"level": "INFO", "log": i} for i in range(3)]
+        )
+
+    @patch.object(LogPublisher, "publish_batch")
+    def test_full_queue_waits_for_flush(self, publish_batch):
+        self.queue.put_timeout = 5
+        for i in range(3):
+            self.queue.put("a", {"level": "INFO", "log": i})
+        # Wakes up the background thread to flush the queue
+        self.assertTrue(self.queue.put("a", {"level": "INFO", "log": 3}))
+        self.queue.flush()
+
+        self.assertEqual(
+            publish_batch.call_args_list,
+            [
+                call("a", [{"level": "INFO", "log": i} for i in range(3)]),
+                call("a", [{"level": "INFO", "log": 3}]),
+            ],
+        )
+
+    @patch.object(LogPublisher, "publish_batch")
+    def test_full_queue_drops_after_timeout(self, publish_batch):
+        with self.queue._flush_lock:
+            for i in range(3):
+                self.queue.put("a", {"level": "INFO", "log": i})
+            self.assertFalse(self.queue.put("a", {"level": "INFO", "log": 3}))
+        self.queue.flush()
+
+        # Dropped messages are never published out of order
+        publish_batch.assert_called_once_with(
+            "a", [{"level": "INFO", "log": i} for i in range(3)]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,11 @@
 class UnstractRunner:
     BASE_API_ENDPOINT = "/v1/api"
     RUN_API_ENDPOINT = "/container/run"
+    JOB_API_ENDPOINT = "/container/job"
+    # Seconds a single job status request waits for the job to finish
+    JOB_WAIT_SECONDS = 30
+    # Seconds to wait for a job to finish overall before cancelling it
+    JOB_TIMEOUT_SECONDS = 6 * 60 * 60
     SPEC_API_ENDPOINT = "/container/spec"
     PROPERTIES_API_ENDPOINT = "/container/properties"
     ICON_API_ENDPOINT = "/container/icon"
@@ -12,3 +17,10 @@ class ToolCommandKey:
     SPEC = "spec"
     VARIABLES = "variables"
     ICON = "icon"
+
+
+class RunnerJobKey:
+    JOB_ID = "job_id"
+    STATUS = "status"
+    RESULT = "result"
+    FINISHED_STATUSES = {"COMPLETED", "FAILED", "CANCELLED", "ORPHANED"}
@@ -1,10 +1,11 @@
 import json
 import logging
 import os
+import time
 from typing import Any, Optional, Union
 
 import requests
-from unstract.tool_sandbox.constants import UnstractRunner
+from unstract.tool_sandbox.constants import RunnerJobKey, UnstractRunner
 
 from unstract.core.utilities import UnstractUtils
 
@@ -28,6 +29,11 @@ class ToolSandboxHelper:
         self.execution_id = str(execution_id)
         self.envs = environment_variables
         self.messaging_channel = str(messaging_channel)
+        self.job_timeout = int(
+            os.environ.get(
+                "UNSTRACT_RUNNER_JOB_TIMEOUT", UnstractRunner.JOB_TIMEOUT_SECONDS
+            )
+        )
 
     def convert_str_to_dict(self, data: Union[str, dict[str, Any]]) -> dict[str, Any]:
         if isinstance(data, str):
@@ -94,10 +100,48 @@ class ToolSandboxHelper:
         )
 
         response = requests.post(url, json=data)
-        result: Optional[dict[str, Any]] = None
-        if response.status_code == 200:
-            result = response.json()
-        elif response.status_code == 404:
+        if response.status_code not in (200, 202):
+            self._log_error_response(image_name, response)
+            return None
+        job_id = response.json()[RunnerJobKey.JOB_ID]
+        return self.wait_for_job(image_name, job_id)
+
+    def wait_for_job(self, image_name: str, job_id: str) -> Optional[dict[str, Any]]:
+        """Long-polls the runner until a container job finishes.
+
+        The job is cancelled if it doesn't finish within `job_timeout`
+        seconds.
+
+        Args:
+            image_name (str): image name, used for reporting
+            job_id (str): id of the runner job
+
+        Returns:
+            Optional[dict[str, Any]]: tool response
+        """
+        url = f"{self.base_url}{UnstractRunner.JOB_API_ENDPOINT}/{job_id}"
+        deadline = time.monotonic() + self.job_timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error(
+                    f"Tool {image_name} did not finish within "
+                    f"{self.job_timeout}s, cancelling job {job_id}"
+                )
+                requests.delete(url)
+                return None
+            params = {"wait": min(UnstractRunner.JOB_WAIT_SECONDS, remaining)}
+            response = requests.get(url, params=params)
+            if response.status_code != 200:
+                self._log_error_response(image_name, response)
+                return None
+            job = response.json()
+            if job[RunnerJobKey.STATUS] in RunnerJobKey.FINISHED_STATUSES:
+                result: Optional[dict[str, Any]] = job[RunnerJobKey.RESULT]
+                return result
+
+    def _log_error_response(self, image_name: str, response: requests.Response) -> None:
+        if response.status_code == 404:
             logger.error(
                 f"Error while calling tool {image_name}: "
                 f"for tool instance status code {response.status_code}"
@@ -106,7 +150,6 @@ class ToolSandboxHelper:
             logger.error(
                 f"Error while calling tool {image_name} " f" reason: {response.reason}"
             )
-        return result
 
     def create_tool_request_data(
         self,
@@ -8,6 +8,8 @@ class ToolExecution:
     # Offset for step adjustment: Converts zero-based indexing to one-based
     # for readability
     STEP_ADJUSTMENT_OFFSET: int = 1
+    # Seconds per phase of a tool run, in the runner's RESULT payload
+    PHASE_TIMINGS = "phase_timings"
 
 
 class ToolRuntimeVariable:
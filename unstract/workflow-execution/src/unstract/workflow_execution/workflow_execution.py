@@ -64,6 +64,8 @@ class WorkflowExecutionService:
         self.messaging_channel: Optional[str] = None
         self.input_files: list[str] = []
         self.log_stage: LogStage = LogStage.COMPILE
+        # Seconds spent in each phase of the tool runs of the current file
+        self.phase_timings: dict[str, float] = {}
 
     def set_messaging_channel(self, messaging_channel: str) -> None:
         self.messaging_channel = messaging_channel
@@ -162,6 +164,7 @@ class WorkflowExecutionService:
         total_steps = len(self.tool_sandboxes)
         self.total_steps = total_steps
         self.file_execution_id = file_execution_id
+        self.phase_timings = {}
         # Currently each tool is run serially for files and workflows contain 1 tool
         # only. While supporting more tools in a workflow, correct the tool container
         # name to avoid conflicts.
@@ -172,6 +175,12 @@ class WorkflowExecutionService:
             )
         self._finalize_execution(execution_type)
 
+    def _add_phase_timings(self, result: Optional[dict[str, Any]]) -> None:
+        """Adds the phase timings reported by the runner for a tool run."""
+        timings = (result or {}).get(ToolExecution.PHASE_TIMINGS) or {}
+        for phase, seconds in timings.items():
+            self.phase_timings[phase] = self.phase_timings.get(phase, 0.0) + seconds
+
     def _execute_step(
         self,
         step: int,
@@ -212,6 +221,7 @@ class WorkflowExecutionService:
             result = self.tool_utils.run_tool(
                 file_execution_id=self.file_execution_id, tool_sandbox=sandbox
             )
+            self._add_phase_timings(result)
             if result and result.get("error"):
                 raise ToolOutputNotFoundException(result.get("error"))
             if not self.validate_execution_result(step + 1):